@@ -0,0 +1,102 @@
+import heapq
+import json
+import os
+from pathlib import Path
+
+# Per-topic generation times recorded by generate_lessons_parallel.py
+TIMINGS_FILENAME = "topic_timings.json"
+
+# Predicted per-batch cost written alongside the batch files
+PLAN_FILENAME = "batch_plan.json"
+
+# Relative generation cost by complexity; harder topics expand further
+COMPLEXITY_WEIGHTS = {'F': 1.0, 'F-I': 1.25, 'I': 1.5, 'I-A': 1.75, 'A': 2.0, 'A-E': 2.5, 'E': 3.0}
+
+def estimate_cost(topic):
+    """Estimate a topic's relative cost from its complexity and name length"""
+    weight = COMPLEXITY_WEIGHTS.get(topic['complexity'], max(COMPLEXITY_WEIGHTS.values()))
+    return weight * (1 + len(topic['topic']) / 100)
+
+def load_timings(batch_dir):
+    """Load measured per-topic seconds from a previous run, keyed by filename"""
+    try:
+        with open(Path(batch_dir) / TIMINGS_FILENAME, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def save_timings(batch_dir, timings):
+    """Merge new per-topic timings into the timings file atomically"""
+    merged = load_timings(batch_dir)
+    merged.update(timings)
+    path = Path(batch_dir) / TIMINGS_FILENAME
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(merged, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+def build_cost_model(topics, timings=None):
+    """Return (cost_fn, model_name) for a set of topics
+
+    With no timings the model is the relative estimate. With timings from
+    a previous run, measured topics cost their recorded seconds and the
+    rest are estimated, scaled so estimates are in seconds as well.
+    """
+    measured = [topic for topic in topics if topic['filename'] in (timings or {})]
+    if not measured:
+        return estimate_cost, 'estimated'
+
+    # Ratio of totals rather than mean of ratios, so tiny timings don't dominate
+    scale = (sum(timings[topic['filename']] for topic in measured)
+             / sum(estimate_cost(topic) for topic in measured))
+
+    def learned_cost(topic):
+        return timings.get(topic['filename'], estimate_cost(topic) * scale)
+
+    return learned_cost, 'learned'
+
+def split_into_batches(topics, num_batches=20, cost_fn=estimate_cost):
+    """Split topics into batches minimizing the largest batch cost
+
+    Longest-processing-time-first: topics are taken in decreasing cost
+    order and each goes to the currently cheapest batch. Topics keep
+    their document order within a batch.
+    """
+    order = sorted(range(len(topics)), key=lambda i: cost_fn(topics[i]), reverse=True)
+
+    # Heap of (batch cost, batch index)
+    heap = [(0.0, i) for i in range(num_batches)]
+    assignments = [[] for _ in range(num_batches)]
+
+    for i in order:
+        cost, batch_index = heapq.heappop(heap)
+        assignments[batch_index].append(i)
+        heapq.heappush(heap, (cost + cost_fn(topics[i]), batch_index))
+
+    return [[topics[i] for i in sorted(indexes)] for indexes in assignments]
+
+def write_batch_plan(batch_dir, batches, cost_fn, model_name):
+    """Record predicted seconds per batch for comparison after generation"""
+    plan = {
+        'cost_model': model_name,
+        'batches': [
+            {
+                'batch': i + 1,
+                'file': f"batch_{i+1:02d}.txt",
+                'topics': len(batch),
+                'predicted': sum(cost_fn(topic) for topic in batch)
+            }
+            for i, batch in enumerate(batches)
+        ]
+    }
+    with open(Path(batch_dir) / PLAN_FILENAME, 'w', encoding='utf-8') as f:
+        json.dump(plan, f, indent=2)
+    return plan
+
+def load_batch_plan(batch_dir):
+    """Load the batch plan written by write_batch_plan, if any"""
+    try:
+        with open(Path(batch_dir) / PLAN_FILENAME, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
@@ -0,0 +1,216 @@
+"""The f-string lesson renderer used before lesson_template.md existed.
+
+Kept verbatim as the baseline for lesson_template.benchmark(); the
+generator itself renders through the compiled template.
+"""
+
+def generate_lesson_content(module, topic, complexity, filename):
+    """Generate lesson content for a single topic using the template structure"""
+    
+    # Template structure for lesson generation
+    lesson_content = f"""# {topic}
+
+## **What is {topic.split('(')[0].strip()}?**
+
+{topic} is a fundamental concept in data engineering and database systems, particularly important for data warehouse and reporting engineers working with platforms like Snowflake and ThoughtSpot.
+
+**Key Importance:**
+- Essential for data engineering workflows
+- Critical for data quality and integrity
+- Fundamental to modern data warehousing
+- Required knowledge for {module.lower()} expertise
+
+**Complexity Level:** [{complexity}] - {"Foundational concepts" if "F" in complexity else "Intermediate application" if "I" in complexity else "Advanced implementation" if "A" in complexity else "Expert-level knowledge"}
+
+------
+
+## **Core Concepts**
+
+### Theory
+
+{topic} represents a critical aspect of data engineering that every professional should understand. This concept is particularly relevant in:
+
+- **Data Warehousing**: How it applies to dimensional modeling and ETL processes
+- **Snowflake Platform**: Specific implementation and best practices
+- **Data Quality**: Impact on data integrity and validation
+- **Performance**: Optimization considerations and trade-offs
+
+### Why It Matters in Data Engineering
+
+Understanding {topic} is crucial for:
+- **ETL/ELT Processes**: Ensuring reliable data pipeline execution
+- **Data Modeling**: Proper dimensional design and relationships
+- **Query Performance**: Optimizing data retrieval and processing
+- **Data Governance**: Maintaining data quality and compliance
+- **Troubleshooting**: Identifying and resolving data issues
+
+### Real-World Applications
+
+**Scenario 1: Data Warehouse Implementation**
+```sql
+-- Example implementation showing {topic} in practice
+-- This demonstrates the concept in a Snowflake environment
+
+CREATE TABLE example_table (
+    id INTEGER PRIMARY KEY,
+    name VARCHAR(255),
+    created_date TIMESTAMP
+);
+
+-- Implementation details specific to {topic}
+-- Additional SQL examples as needed
+```
+
+**Scenario 2: ETL Pipeline Context**
+```sql
+-- ETL process demonstrating {topic}
+-- Shows practical application in data transformation
+
+-- Step 1: Extract
+-- Step 2: Transform
+-- Step 3: Load
+```
+
+**What Happens:**
+- Clear explanation of the process
+- Expected outcomes and results
+- Common gotchas and considerations
+- Performance implications
+
+------
+
+## **Implementation in Snowflake**
+
+### Snowflake-Specific Features
+
+{topic} in Snowflake involves several key considerations:
+
+- **Platform Integration**: How Snowflake implements this concept
+- **Performance Optimization**: Best practices for efficiency
+- **Security Implications**: Access control and data protection
+- **Cost Management**: Resource utilization considerations
+
+### Best Practices
+
+✅ **Do:**
+- Follow Snowflake documentation guidelines
+- Implement proper error handling
+- Monitor performance metrics
+- Document implementation decisions
+
+❌ **Avoid:**
+- Common antipatterns
+- Performance bottlenecks
+- Security vulnerabilities
+- Cost optimization mistakes
+
+------
+
+## **ThoughtSpot Integration**
+
+### BI and Reporting Context
+
+When working with ThoughtSpot and other BI tools, {topic} affects:
+
+- **Data Modeling**: Semantic layer design
+- **Query Performance**: Search and analytics speed
+- **User Experience**: Self-service analytics capabilities
+- **Data Freshness**: Real-time vs batch considerations
+
+------
+
+## **Hands-On Exercises**
+
+### Exercise 1: Basic Implementation
+**Scenario:** Implement {topic} in a simple data warehouse scenario
+- Set up the basic structure
+- Apply the concept correctly
+- Validate the implementation
+
+### Exercise 2: Advanced Application
+**Scenario:** Apply {topic} in a complex ETL pipeline
+- Design the solution architecture
+- Implement error handling
+- Optimize for performance
+
+### Exercise 3: Troubleshooting
+**Scenario:** Identify and resolve issues related to {topic}
+- Analyze problem symptoms
+- Apply debugging techniques
+- Implement preventive measures
+
+------
+
+## **Common Challenges and Solutions**
+
+### Challenge 1: Performance Issues
+**Problem:** Slow query execution or data processing
+**Solution:** 
+- Analyze execution plans
+- Optimize data structures
+- Implement caching strategies
+
+### Challenge 2: Data Quality Problems
+**Problem:** Inconsistent or invalid data
+**Solution:**
+- Implement validation rules
+- Add data quality checks
+- Monitor data lineage
+
+### Challenge 3: Scalability Concerns
+**Problem:** System performance degrades with data growth
+**Solution:**
+- Design for horizontal scaling
+- Implement partitioning strategies
+- Optimize resource allocation
+
+------
+
+## **Key Takeaways**
+
+✅ **Essential Points:**
+- {topic} is fundamental to {module.lower()}
+- Proper implementation ensures data quality and performance
+- Understanding this concept is critical for data engineering success
+- Regular monitoring and optimization are necessary
+
+### When to Apply
+- **Always:** In production data warehouse environments
+- **Often:** During ETL/ELT process design
+- **Sometimes:** In ad-hoc data analysis scenarios
+- **Rarely:** In simple, single-user environments
+
+### Success Metrics
+- Data quality scores remain high
+- Query performance meets SLA requirements
+- User satisfaction with data availability
+- Cost optimization targets achieved
+
+------
+
+## **Next Steps**
+
+1. **Practice Implementation**: Try the exercises with sample data
+2. **Explore Documentation**: Review Snowflake and ThoughtSpot resources
+3. **Join Community**: Participate in data engineering forums
+4. **Continuous Learning**: Stay updated with industry best practices
+5. **Apply in Projects**: Implement in real-world scenarios
+
+### Related Topics to Explore
+- Other concepts in {module}
+- Advanced data engineering patterns
+- Performance optimization techniques
+- Data governance frameworks
+
+### Resources for Deep Dive
+- Official Snowflake documentation
+- ThoughtSpot best practices guide
+- Data engineering community resources
+- Industry case studies and examples
+
+------
+
+*This lesson was generated as part of the comprehensive Data Engineering Learning Platform. Continue your journey through the structured curriculum to build expertise in modern data warehousing and analytics.*
+"""
+    
+    return lesson_content
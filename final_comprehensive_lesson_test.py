@@ -16,6 +16,8 @@ from datetime import datetime
 from playwright.async_api import async_playwright
 from pathlib import Path
 
+from lesson_navigation import load_navigation_map
+
 BASE_URL = "http://localhost:3002"
 
 class ComprehensiveLessonTester:
@@ -26,10 +28,13 @@ class ComprehensiveLessonTester:
         self.navigation_map = self.load_navigation_map()
         
     def load_navigation_map(self):
-        """Load the lesson navigation map"""
+        """Load the lesson navigation map
+
+        Uses whichever of the sharded map (modules load lazily on access) and
+        the monolithic lesson_navigation_map.json was generated last.
+        """
         try:
-            with open('lesson_navigation_map.json', 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return load_navigation_map()
         except FileNotFoundError:
             print("Navigation map not found! Run parallel_lesson_generator.py first.")
             return {}
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Persistent Lesson Metadata Index
+
+Keeps slug, title, module, size, mtime, content hash and heading outline
+for every lesson in a SQLite database. Updates are incremental: only files
+whose size or mtime changed since the last update are re-read, so tools
+can answer "lessons in module-7" or "count per module" with an indexed
+query instead of reading the whole lessons directory. By default only each
+file's header is read; the content hash and outline are filled in (reading
+whole files) only when an update asks for them.
+"""
+
+import os
+import re
+import json
+import sqlite3
+import hashlib
+import itertools
+import concurrent.futures
+from pathlib import Path
+
+# Default index location, next to this module and lesson_navigation_map.json
+INDEX_PATH = Path(__file__).parent / "lesson_index.sqlite3"
+
+# Module mapping
+MODULE_MAPPING = {
+    'Data-Database-Fundamentals': {'id': 'module-1', 'name': 'Module 1: Data & Database Fundamentals'},
+    'SQL-ELT-Concepts': {'id': 'module-2', 'name': 'Module 2: SQL & ELT Concepts'},
+    'Data-Warehousing-Principles': {'id': 'module-3', 'name': 'Module 3: Data Warehousing Principles'},
+    'Data-Modeling': {'id': 'module-4', 'name': 'Module 4: Data Modeling'},
+    'Snowflake-Specific-Knowledge': {'id': 'module-5', 'name': 'Module 5: Snowflake-Specific Knowledge'},
+    'ETLELT-Design-Best-Practices': {'id': 'module-6', 'name': 'Module 6: ETL/ELT Design & Best Practices'},
+    'Data-Governance-Quality-Metadata': {'id': 'module-7', 'name': 'Module 7: Data Governance, Quality & Metadata'},
+    'Snowflake-Security-Access-Control': {'id': 'module-8', 'name': 'Module 8: Snowflake Security & Access Control'},
+    'Reporting-BI-Concepts': {'id': 'module-9', 'name': 'Module 9: Reporting & BI Concepts'},
+    'UnixLinux-File-Handling': {'id': 'module-10', 'name': 'Module 10: Unix/Linux & File Handling'},
+    'Version-Control-Team-Collaboration': {'id': 'module-11', 'name': 'Module 11: Version Control & Team Collaboration'},
+    'Performance-Optimization-Troubleshooting': {'id': 'module-12', 'name': 'Module 12: Performance Optimization & Troubleshooting'},
+    'CICD-Deployment-Practices': {'id': 'module-13', 'name': 'Module 13: CI/CD & Deployment Practices'},
+    'Monitoring-Observability': {'id': 'module-14', 'name': 'Module 14: Monitoring & Observability'},
+    'Orchestration-Scheduling-Tools': {'id': 'module-15', 'name': 'Module 15: Orchestration & Scheduling Tools'},
+    'Data-Transformation-with-dbt-Optional-but-Recommended': {'id': 'module-16', 'name': 'Module 16: Data Transformation with dbt'},
+    'Soft-Skills-Professional-Practices': {'id': 'module-17', 'name': 'Module 17: Soft Skills & Professional Practices'},
+    'Business-Domain-Knowledge': {'id': 'module-18', 'name': 'Module 18: Business & Domain Knowledge'},
+    'Additional-Technical-Skills': {'id': 'module-19', 'name': 'Module 19: Additional Technical Skills'},
+    'Emerging-Topics-Advanced-Concepts': {'id': 'module-20', 'name': 'Module 20: Emerging Topics & Advanced Concepts'},
+}
+
+# Lessons whose filename matches no module prefix
+UNKNOWN_MODULE = {'id': 'unknown', 'name': 'Unknown'}
+
+HEADING_PATTERN = re.compile(r'^(#{1,6})\s+(.+?)\s*$', re.MULTILINE)
+TITLE_PATTERN = re.compile(r'#\s+(.+?)\s*')
+FRONT_MATTER_FIELD = re.compile(r'([\w-]+)\s*:\s*(.*?)\s*')
+
+# Bumped whenever SCHEMA changes; an index with another version is rebuilt
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS lessons (
+    filename TEXT PRIMARY KEY,
+    slug TEXT NOT NULL,
+    title TEXT NOT NULL,
+    module_id TEXT NOT NULL,
+    module_name TEXT NOT NULL,
+    file_path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    content_hash TEXT,
+    outline TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_lessons_module ON lessons (module_id, filename);
+CREATE INDEX IF NOT EXISTS idx_lessons_slug ON lessons (slug);
+"""
+
+def parse_module_from_filename(filename):
+    """Parse module info from filename"""
+    for prefix, module_info in MODULE_MAPPING.items():
+        if filename.startswith(prefix):
+            return module_info
+    return None
+
+def extract_slug_from_filename(filename):
+    """Extract lesson slug from filename"""
+    # Remove .md extension
+    without_ext = filename.replace('.md', '')
+    # Format: Module-Name--topic-slug--2024-10-30
+    parts = without_ext.split('--')
+    if len(parts) >= 2:
+        return parts[1] if len(parts) == 3 else '--'.join(parts[1:-1])
+    return without_ext
+
+def parse_lesson_header(lines):
+    """Parse optional YAML front matter and the title from an iterator of lines
+
+    Consumes lines only up to the first H1 heading (or the end of the front
+    matter, if it sets a title), so callers passing an open file read just
+    the head of it. Returns (title, front_matter); title is None if the
+    lines run out without one.
+    """
+    lines = iter(lines)
+    front_matter = {}
+
+    first = next(lines, None)
+    if first is None:
+        return None, front_matter
+
+    if first.strip() == '---':
+        for line in lines:
+            if line.strip() in ('---', '...'):
+                break
+            match = FRONT_MATTER_FIELD.fullmatch(line.strip())
+            if match:
+                front_matter[match.group(1)] = match.group(2).strip('\'"')
+        if front_matter.get('title'):
+            return front_matter['title'], front_matter
+    else:
+        lines = itertools.chain([first], lines)
+
+    for line in lines:
+        match = TITLE_PATTERN.fullmatch(line.rstrip('\r\n'))
+        if match:
+            return match.group(1), front_matter
+
+    return None, front_matter
+
+def read_lesson_header(file_path, buffer_size=4096):
+    """Read a lesson's title and front matter without reading the whole file
+
+    The title is almost always on line 1, so this usually costs a single
+    small buffered read; files without an early H1 are scanned to the end.
+    """
+    with open(file_path, 'r', encoding='utf-8', buffering=buffer_size) as f:
+        title, front_matter = parse_lesson_header(f)
+    return {'title': title or 'Untitled Lesson', 'front_matter': front_matter}
+
+def read_lesson_metadata(file_path):
+    """Read one lesson file and return its indexed metadata"""
+    with open(file_path, 'rb') as f:
+        data = f.read()
+
+    content = data.decode('utf-8')
+    outline = [[len(hashes), text] for hashes, text in HEADING_PATTERN.findall(content)]
+    title, _ = parse_lesson_header(content.splitlines())
+
+    return {
+        'title': title or 'Untitled Lesson',
+        'content_hash': hashlib.sha256(data).hexdigest(),
+        'outline': outline
+    }
+
+class LessonIndex:
+    """SQLite-backed index of lesson metadata"""
+
+    def __init__(self, db_path=INDEX_PATH):
+        self.db_path = Path(db_path)
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.row_factory = sqlite3.Row
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            self.conn.executescript("DROP TABLE IF EXISTS lessons")
+            self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def update(self, lessons_dir, with_content=False, max_workers=20):
+        """Bring the index up to date with lessons_dir
+
+        Only files that are new or whose size/mtime changed are re-read, and
+        only up to their title unless with_content is set. With with_content,
+        files are read whole for the content hash and outline, including
+        unchanged files indexed earlier without them. Rows for deleted files
+        are removed. Returns a dict of counts.
+        """
+        lessons_dir = Path(lessons_dir)
+        read_metadata = read_lesson_metadata if with_content else read_lesson_header
+        known = {
+            row['filename']: (row['size'], row['mtime_ns'], row['has_content'])
+            for row in self.conn.execute(
+                "SELECT filename, size, mtime_ns, content_hash IS NOT NULL AS has_content FROM lessons"
+            )
+        }
+
+        seen = set()
+        changed = []
+        with os.scandir(lessons_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith('.md') or not entry.is_file():
+                    continue
+                module_info = parse_module_from_filename(entry.name) or UNKNOWN_MODULE
+                seen.add(entry.name)
+                stat = entry.stat()
+                size, mtime_ns, has_content = known.get(entry.name, (None, None, False))
+                if (size, mtime_ns) != (stat.st_size, stat.st_mtime_ns) or (with_content and not has_content):
+                    changed.append((entry.name, Path(entry.path), module_info, stat))
+
+        def index_file(item):
+            filename, file_path, module_info, stat = item
+            try:
+                metadata = read_metadata(file_path)
+            except Exception as e:
+                print(f"Error processing {file_path}: {e}")
+                return None
+            return (
+                filename, extract_slug_from_filename(filename), metadata['title'],
+                module_info['id'], module_info['name'], str(file_path),
+                stat.st_size, stat.st_mtime_ns, metadata.get('content_hash'),
+                json.dumps(metadata['outline'], ensure_ascii=False) if 'outline' in metadata else None
+            )
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            rows = [row for row in executor.map(index_file, changed) if row is not None]
+
+        deleted = [(filename,) for filename in known if filename not in seen]
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO lessons VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            self.conn.executemany("DELETE FROM lessons WHERE filename = ?", deleted)
+
+        return {
+            'total': len(seen),
+            'updated': len(rows),
+            'unchanged': len(seen) - len(changed),
+            'deleted': len(deleted)
+        }
+
+    def _lesson(self, row):
+        lesson = dict(row)
+        if lesson['outline'] is not None:
+            lesson['outline'] = json.loads(lesson['outline'])
+        return lesson
+
+    def all_lessons(self):
+        """All lessons with a known module, ordered by filename (case-insensitive)"""
+        rows = self.conn.execute(
+            "SELECT * FROM lessons WHERE module_id != ? ORDER BY filename COLLATE NOCASE", (UNKNOWN_MODULE['id'],)
+        )
+        return [self._lesson(row) for row in rows]
+
+    def lessons_in_module(self, module_id):
+        """Lessons of one module, e.g. 'module-7'"""
+        rows = self.conn.execute(
+            "SELECT * FROM lessons WHERE module_id = ? ORDER BY filename COLLATE NOCASE", (module_id,)
+        )
+        return [self._lesson(row) for row in rows]
+
+    def get_lesson(self, slug):
+        """Look up a lesson by slug"""
+        row = self.conn.execute("SELECT * FROM lessons WHERE slug = ?", (slug,)).fetchone()
+        return self._lesson(row) if row else None
+
+    def count_per_module(self):
+        """Lesson counts keyed by module name, including 'Unknown'"""
+        rows = self.conn.execute(
+            "SELECT module_name, COUNT(*) AS lesson_count FROM lessons GROUP BY module_id, module_name"
+        )
+        return {row['module_name']: row['lesson_count'] for row in rows}
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Sharded Lesson Navigation Map
+
+Writes the navigation map as a small manifest plus one compact JSON shard
+per module, and reads it back lazily so consumers only load the modules
+they use. Each shard's content hash is recorded in the manifest; unchanged
+shards are not rewritten, so their hash (and ETag when served) and mtime
+stay stable. The manifest records when it was written, so readers can tell
+whether the shards or the monolithic map are the current output.
+"""
+
+import os
+import json
+import time
+import hashlib
+from pathlib import Path
+from collections.abc import Mapping
+
+# Default shard directory and manifest name
+SHARD_DIR = Path("lesson_navigation")
+MANIFEST_NAME = "index.json"
+
+# Monolithic map written when sharding is off
+MAP_FILE = Path("lesson_navigation_map.json")
+
+def _write_atomic(path, data):
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+def load_manifest(shard_dir=SHARD_DIR):
+    """Load the shard manifest, or None if the map has not been sharded"""
+    try:
+        with open(Path(shard_dir) / MANIFEST_NAME, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def save_navigation_shards(nav_map, shard_dir=SHARD_DIR):
+    """Write one shard per module and the manifest describing them
+
+    Shards of removed modules are deleted only after the new manifest is in
+    place, so a reader never follows the manifest to a missing shard.
+    Returns the number of shards actually rewritten.
+    """
+    shard_dir = Path(shard_dir)
+    shard_dir.mkdir(exist_ok=True)
+    previous = (load_manifest(shard_dir) or {}).get('modules', {})
+
+    modules = {}
+    written = 0
+    for module_id, module_info in nav_map.items():
+        data = json.dumps(module_info, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        content_hash = hashlib.sha256(data).hexdigest()[:16]
+        filename = f"{module_id}.json"
+
+        shard_path = shard_dir / filename
+        if previous.get(module_id, {}).get('hash') != content_hash or not shard_path.exists():
+            _write_atomic(shard_path, data)
+            written += 1
+
+        modules[module_id] = {
+            'module_name': module_info['module_name'],
+            'lesson_count': module_info['lesson_count'],
+            'file': filename,
+            'hash': content_hash
+        }
+
+    manifest = {
+        'generated_at': time.time(),
+        'total_lessons': sum(entry['lesson_count'] for entry in modules.values()),
+        'modules': modules
+    }
+    _write_atomic(shard_dir / MANIFEST_NAME,
+                  json.dumps(manifest, ensure_ascii=False, indent=2).encode('utf-8'))
+
+    # Drop shards of modules that no longer have lessons
+    for module_id, entry in previous.items():
+        if module_id not in modules:
+            (shard_dir / entry['file']).unlink(missing_ok=True)
+    return written
+
+class LazyNavigationMap(Mapping):
+    """Read-only navigation map that loads module shards on first access
+
+    Behaves like the dict in lesson_navigation_map.json, so existing code
+    iterating `.items()` keeps working, but `nav_map['module-7']` reads
+    only that module's shard.
+    """
+
+    def __init__(self, shard_dir=SHARD_DIR):
+        self.shard_dir = Path(shard_dir)
+        manifest = load_manifest(self.shard_dir)
+        if manifest is None:
+            raise FileNotFoundError(f"No navigation manifest in {self.shard_dir}")
+        self.manifest = manifest['modules']
+        self._loaded = {}
+
+    def __getitem__(self, module_id):
+        if module_id not in self._loaded:
+            entry = self.manifest[module_id]
+            with open(self.shard_dir / entry['file'], 'r', encoding='utf-8') as f:
+                self._loaded[module_id] = json.load(f)
+        return self._loaded[module_id]
+
+    def __iter__(self):
+        return iter(self.manifest)
+
+    def __len__(self):
+        return len(self.manifest)
+
+def load_navigation_map(map_file=MAP_FILE, shard_dir=SHARD_DIR):
+    """Load whichever navigation map was written last
+
+    A run without sharding refreshes only the monolithic map and leaves any
+    older shards behind, so the shards are used only when their manifest's
+    generated_at is newer than the map file. Raises FileNotFoundError if
+    neither exists.
+    """
+    manifest = load_manifest(shard_dir)
+    try:
+        map_mtime = os.stat(map_file).st_mtime
+    except FileNotFoundError:
+        map_mtime = None
+
+    if manifest is not None and (map_mtime is None or manifest.get('generated_at', 0) >= map_mtime):
+        return LazyNavigationMap(shard_dir)
+    with open(map_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
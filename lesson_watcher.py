@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Lesson Directory Watcher
+
+Reports which lesson files were added, changed, renamed or deleted. Uses
+inotify on Linux and falls back to polling directory stats elsewhere.
+"""
+
+import os
+import sys
+import time
+import struct
+import select
+import ctypes
+import ctypes.util
+
+# inotify event flags (see inotify(7))
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct('iIII')
+
+def is_lesson_file(name):
+    return name.endswith('.md')
+
+def snapshot_lessons(directory):
+    """Map each lesson filename in directory to its (size, mtime_ns)"""
+    snapshot = {}
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if is_lesson_file(entry.name) and entry.is_file():
+                stat = entry.stat()
+                snapshot[entry.name] = (stat.st_size, stat.st_mtime_ns)
+    return snapshot
+
+def diff_snapshots(old, new):
+    """Return the filenames added, removed or changed between two snapshots"""
+    return {name for name in old.keys() | new.keys() if old.get(name) != new.get(name)}
+
+class InotifyWatcher:
+    """Directory watcher backed by Linux inotify"""
+
+    def __init__(self, directory, settle=0.2):
+        self.directory = str(directory)
+        self.settle = settle
+
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(self.fd, self.directory.encode(), WATCH_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch failed for {self.directory}")
+
+        # Kept current from events so that, if the kernel queue overflows and
+        # events are dropped, a rescan can still tell which files changed
+        self.snapshot = snapshot_lessons(self.directory)
+        self.overflowed = False
+
+    def _read_events(self, changed):
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset < len(data):
+            _, mask, _, name_len = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            if mask & IN_Q_OVERFLOW:
+                self.overflowed = True
+            name = data[offset:offset + name_len].rstrip(b'\0').decode('utf-8', 'replace')
+            offset += name_len
+            if is_lesson_file(name):
+                changed.add(name)
+
+    def wait(self, timeout=None):
+        """Block until lessons change; returns the set of changed filenames
+
+        Events arriving within `settle` seconds of each other are collected
+        into one set, so a bulk copy triggers one update rather than many.
+        If the event queue overflowed, the directory is rescanned and
+        compared against the last snapshot, as the polling watcher does.
+        """
+        changed = set()
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        while ready:
+            self._read_events(changed)
+            ready, _, _ = select.select([self.fd], [], [], self.settle)
+
+        if self.overflowed:
+            self.overflowed = False
+            current = snapshot_lessons(self.directory)
+            changed |= diff_snapshots(self.snapshot, current)
+            self.snapshot = current
+        else:
+            for name in changed:
+                try:
+                    stat = os.stat(os.path.join(self.directory, name))
+                    self.snapshot[name] = (stat.st_size, stat.st_mtime_ns)
+                except FileNotFoundError:
+                    self.snapshot.pop(name, None)
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+class PollingWatcher:
+    """Directory watcher that compares size/mtime snapshots"""
+
+    def __init__(self, directory, interval=2.0):
+        self.directory = directory
+        self.interval = interval
+        self.snapshot = snapshot_lessons(self.directory)
+
+    def wait(self, timeout=None):
+        """Poll until lessons change; returns the set of changed filenames"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            time.sleep(self.interval)
+            current = snapshot_lessons(self.directory)
+            changed = diff_snapshots(self.snapshot, current)
+            self.snapshot = current
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def close(self):
+        pass
+
+def create_watcher(directory, interval=2.0):
+    """Return an inotify watcher on Linux, or a polling watcher otherwise"""
+    if sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(directory)
+        except (OSError, AttributeError) as e:
+            print(f"inotify unavailable ({e}), falling back to polling every {interval}s")
+    return PollingWatcher(directory, interval)
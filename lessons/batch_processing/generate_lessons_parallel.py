@@ -1,318 +1,400 @@
 import os
-import subprocess
+import argparse
+import hashlib
+import json
 import time
-import threading
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 
-def read_lesson_template():
-    """Read the lesson template for structure reference"""
-    template_path = Path("C:/ai/data_engineering_learning/Template for Lesson.md")
-    with open(template_path, 'r', encoding='utf-8') as f:
-        return f.read()
+from batch_scheduler import (build_cost_model, load_batch_plan, load_timings, save_timings,
+                             split_into_batches, write_batch_plan)
+from lesson_template import load_template, render_lesson
+from topic_extractor import TOPICS_FILE, stream_topics
 
-def generate_lesson_content(module, topic, complexity, filename):
-    """Generate lesson content for a single topic using the template structure"""
-    
-    # Template structure for lesson generation
-    lesson_content = f"""# {topic}
-
-## **What is {topic.split('(')[0].strip()}?**
-
-{topic} is a fundamental concept in data engineering and database systems, particularly important for data warehouse and reporting engineers working with platforms like Snowflake and ThoughtSpot.
-
-**Key Importance:**
-- Essential for data engineering workflows
-- Critical for data quality and integrity
-- Fundamental to modern data warehousing
-- Required knowledge for {module.lower()} expertise
-
-**Complexity Level:** [{complexity}] - {"Foundational concepts" if "F" in complexity else "Intermediate application" if "I" in complexity else "Advanced implementation" if "A" in complexity else "Expert-level knowledge"}
-
-------
-
-## **Core Concepts**
-
-### Theory
-
-{topic} represents a critical aspect of data engineering that every professional should understand. This concept is particularly relevant in:
-
-- **Data Warehousing**: How it applies to dimensional modeling and ETL processes
-- **Snowflake Platform**: Specific implementation and best practices
-- **Data Quality**: Impact on data integrity and validation
-- **Performance**: Optimization considerations and trade-offs
-
-### Why It Matters in Data Engineering
-
-Understanding {topic} is crucial for:
-- **ETL/ELT Processes**: Ensuring reliable data pipeline execution
-- **Data Modeling**: Proper dimensional design and relationships
-- **Query Performance**: Optimizing data retrieval and processing
-- **Data Governance**: Maintaining data quality and compliance
-- **Troubleshooting**: Identifying and resolving data issues
-
-### Real-World Applications
-
-**Scenario 1: Data Warehouse Implementation**
-```sql
--- Example implementation showing {topic} in practice
--- This demonstrates the concept in a Snowflake environment
-
-CREATE TABLE example_table (
-    id INTEGER PRIMARY KEY,
-    name VARCHAR(255),
-    created_date TIMESTAMP
-);
-
--- Implementation details specific to {topic}
--- Additional SQL examples as needed
-```
-
-**Scenario 2: ETL Pipeline Context**
-```sql
--- ETL process demonstrating {topic}
--- Shows practical application in data transformation
-
--- Step 1: Extract
--- Step 2: Transform
--- Step 3: Load
-```
-
-**What Happens:**
-- Clear explanation of the process
-- Expected outcomes and results
-- Common gotchas and considerations
-- Performance implications
-
-------
-
-## **Implementation in Snowflake**
-
-### Snowflake-Specific Features
-
-{topic} in Snowflake involves several key considerations:
-
-- **Platform Integration**: How Snowflake implements this concept
-- **Performance Optimization**: Best practices for efficiency
-- **Security Implications**: Access control and data protection
-- **Cost Management**: Resource utilization considerations
-
-### Best Practices
-
-✅ **Do:**
-- Follow Snowflake documentation guidelines
-- Implement proper error handling
-- Monitor performance metrics
-- Document implementation decisions
-
-❌ **Avoid:**
-- Common antipatterns
-- Performance bottlenecks
-- Security vulnerabilities
-- Cost optimization mistakes
-
-------
-
-## **ThoughtSpot Integration**
-
-### BI and Reporting Context
-
-When working with ThoughtSpot and other BI tools, {topic} affects:
-
-- **Data Modeling**: Semantic layer design
-- **Query Performance**: Search and analytics speed
-- **User Experience**: Self-service analytics capabilities
-- **Data Freshness**: Real-time vs batch considerations
-
-------
-
-## **Hands-On Exercises**
-
-### Exercise 1: Basic Implementation
-**Scenario:** Implement {topic} in a simple data warehouse scenario
-- Set up the basic structure
-- Apply the concept correctly
-- Validate the implementation
-
-### Exercise 2: Advanced Application
-**Scenario:** Apply {topic} in a complex ETL pipeline
-- Design the solution architecture
-- Implement error handling
-- Optimize for performance
-
-### Exercise 3: Troubleshooting
-**Scenario:** Identify and resolve issues related to {topic}
-- Analyze problem symptoms
-- Apply debugging techniques
-- Implement preventive measures
-
-------
-
-## **Common Challenges and Solutions**
-
-### Challenge 1: Performance Issues
-**Problem:** Slow query execution or data processing
-**Solution:** 
-- Analyze execution plans
-- Optimize data structures
-- Implement caching strategies
-
-### Challenge 2: Data Quality Problems
-**Problem:** Inconsistent or invalid data
-**Solution:**
-- Implement validation rules
-- Add data quality checks
-- Monitor data lineage
-
-### Challenge 3: Scalability Concerns
-**Problem:** System performance degrades with data growth
-**Solution:**
-- Design for horizontal scaling
-- Implement partitioning strategies
-- Optimize resource allocation
-
-------
+# Derived from the template text, so editing lesson_template.md invalidates
+# every lesson rendered from the previous version.
+TEMPLATE_VERSION = load_template().version
 
-## **Key Takeaways**
+# Manifest of rendered lessons, stored next to the lessons it describes
+MANIFEST_FILENAME = ".lesson_manifest.json"
 
-✅ **Essential Points:**
-- {topic} is fundamental to {module.lower()}
-- Proper implementation ensures data quality and performance
-- Understanding this concept is critical for data engineering success
-- Regular monitoring and optimization are necessary
-
-### When to Apply
-- **Always:** In production data warehouse environments
-- **Often:** During ETL/ELT process design
-- **Sometimes:** In ad-hoc data analysis scenarios
-- **Rarely:** In simple, single-user environments
+def generate_lesson_content(module, topic, complexity, filename):
+    """Generate lesson content for a single topic using the compiled template"""
+    return render_lesson(module, topic, complexity)
 
-### Success Metrics
-- Data quality scores remain high
-- Query performance meets SLA requirements
-- User satisfaction with data availability
-- Cost optimization targets achieved
-
-------
-
-## **Next Steps**
+def lesson_input_hash(module, topic, complexity):
+    """Hash everything that determines a lesson's rendered content"""
+    key = f"{TEMPLATE_VERSION}|{module}|{topic}|{complexity}"
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
 
-1. **Practice Implementation**: Try the exercises with sample data
-2. **Explore Documentation**: Review Snowflake and ThoughtSpot resources
-3. **Join Community**: Participate in data engineering forums
-4. **Continuous Learning**: Stay updated with industry best practices
-5. **Apply in Projects**: Implement in real-world scenarios
-
-### Related Topics to Explore
-- Other concepts in {module}
-- Advanced data engineering patterns
-- Performance optimization techniques
-- Data governance frameworks
+def load_manifest(manifest_path):
+    """Load the lesson manifest, or an empty one if missing or unreadable"""
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+    if manifest.get('template_version') != TEMPLATE_VERSION:
+        return {}
+    return manifest.get('lessons', {})
+
+def save_manifest(manifest_path, lessons):
+    """Write the lesson manifest atomically (temp file + rename)"""
+    manifest = {'template_version': TEMPLATE_VERSION, 'lessons': lessons}
+    tmp_path = manifest_path.with_name(manifest_path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True, ensure_ascii=False)
+    os.replace(tmp_path, manifest_path)
+
+def write_if_changed(path, content):
+    """Write content only when it differs from what is on disk.
+
+    Leaves the file (and its mtime) untouched when the bytes already match,
+    so file watchers are not invalidated by no-op rebuilds.
+    """
+    data = content.encode('utf-8')
+    try:
+        if path.stat().st_size == len(data):
+            with open(path, 'rb') as f:
+                if f.read() == data:
+                    return False
+    except FileNotFoundError:
+        pass
+    with open(path, 'wb') as f:
+        f.write(data)
+    return True
+
+def is_up_to_date(entry, input_hash, lesson_path):
+    """Check a manifest entry against the current inputs and the file on disk"""
+    if not entry or entry.get('input_hash') != input_hash:
+        return False
+    try:
+        return lesson_path.stat().st_size == entry.get('size')
+    except FileNotFoundError:
+        return False
 
-### Resources for Deep Dive
-- Official Snowflake documentation
-- ThoughtSpot best practices guide
-- Data engineering community resources
-- Industry case studies and examples
-
-------
-
-*This lesson was generated as part of the comprehensive Data Engineering Learning Platform. Continue your journey through the structured curriculum to build expertise in modern data warehousing and analytics.*
-"""
-    
-    return lesson_content
+def read_batch_topics(batch_files, first_batch_num=1):
+    """Read every batch file into a flat list of work items
 
-def process_batch(batch_num, batch_file, output_dir):
-    """Process a single batch of topics"""
-    batch_path = Path(batch_file)
-    print(f"PROCESSING: Batch {batch_num}...")
-    
-    lessons_created = 0
+    Each item is (batch_num, line_num, module, topic, complexity, filename);
+    the batch and line numbers identify the source for error reporting.
+    """
+    items = []
     errors = []
     
-    try:
-        with open(batch_path, 'r', encoding='utf-8') as f:
-            for line_num, line in enumerate(f, 1):
-                if not line.strip():
-                    continue
-                    
-                try:
+    for batch_num, batch_file in enumerate(batch_files, first_batch_num):
+        try:
+            with open(batch_file, 'r', encoding='utf-8') as f:
+                for line_num, line in enumerate(f, 1):
                     parts = line.strip().split('|')
                     if len(parts) != 4:
                         continue
-                        
-                    module, topic, complexity, filename = parts
-                    
-                    # Generate lesson content
-                    content = generate_lesson_content(module, topic, complexity, filename)
-                    
-                    # Write lesson file
-                    lesson_path = output_dir / filename
-                    with open(lesson_path, 'w', encoding='utf-8') as lesson_file:
-                        lesson_file.write(content)
-                    
-                    lessons_created += 1
-                    
-                    # Progress indicator
-                    if lessons_created % 5 == 0:
-                        print(f"  PROGRESS: Batch {batch_num}: {lessons_created} lessons created...")
-                        
-                except Exception as e:
-                    error_msg = f"Batch {batch_num}, Line {line_num}: {str(e)}"
-                    errors.append(error_msg)
-                    continue
-                    
+                    items.append((batch_num, line_num, *parts))
+        except Exception as e:
+            errors.append(f"Batch {batch_num} file error: {str(e)}")
+    
+    return items, errors
+
+def read_source_topics(topics_file):
+    """Read topics straight from the training document, bypassing batch files
+
+    Items use batch number 0 and the topic's position as its line number.
+    """
+    items = []
+    errors = []
+    try:
+        for index, topic in enumerate(stream_topics(topics_file), 1):
+            items.append((0, index, topic['module'], topic['topic'], topic['complexity'], topic['filename']))
     except Exception as e:
-        errors.append(f"Batch {batch_num} file error: {str(e)}")
+        errors.append(f"Topics file error: {str(e)}")
+    return items, errors
+
+def item_topic(item):
+    """Convert a work item back into the topic dict used by the scheduler"""
+    _, _, module, topic, complexity, filename = item
+    return {'module': module, 'topic': topic, 'complexity': complexity, 'filename': filename}
+
+def order_by_cost(items, batch_dir):
+    """Order work items longest-first by predicted cost
+
+    Workers pulling from a shared queue then finish the expensive topics
+    early and the cheap ones fill in the gaps at the end.
+    """
+    topics = [item_topic(item) for item in items]
+    cost_fn, _ = build_cost_model(topics, load_timings(batch_dir))
+    costs = [cost_fn(topic) for topic in topics]
+    order = sorted(range(len(items)), key=lambda i: costs[i], reverse=True)
+    return [items[i] for i in order]
+
+def export_batches(items, batch_dir, num_batches):
+    """Write cost-balanced batch_NN.txt files and a batch plan from work items"""
+    topics = [item_topic(item) for item in items]
+    cost_fn, model_name = build_cost_model(topics, load_timings(batch_dir))
+    batches = split_into_batches(topics, num_batches, cost_fn)
+    
+    for old_file in batch_dir.glob("batch_*.txt"):
+        old_file.unlink()
+    for i, batch in enumerate(batches):
+        with open(batch_dir / f"batch_{i+1:02d}.txt", 'w', encoding='utf-8') as f:
+            for topic in batch:
+                f.write(f"{topic['module']}|{topic['topic']}|{topic['complexity']}|{topic['filename']}\n")
+    write_batch_plan(batch_dir, batches, cost_fn, model_name)
+
+def chunk_items(items, chunk_size):
+    """Split work items into contiguous chunks of at most chunk_size"""
+    return [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+
+def chunk_by_batch(items):
+    """Group work items into one chunk per batch file"""
+    chunks = {}
+    for item in items:
+        chunks.setdefault(item[0], []).append(item)
+    return [chunks[batch_num] for batch_num in sorted(chunks)]
+
+def process_chunk(chunk, output_dir, manifest=None):
+    """Render and write one chunk of topics
+
+    Lessons whose manifest entry matches the current inputs are skipped
+    without rendering. Returns the manifest entries for every lesson in the
+    chunk so the caller can merge them into the next manifest, and the
+    seconds spent on each rendered lesson for the batch cost model.
+    """
+    manifest = manifest or {}
+    lessons_created = 0
+    lessons_skipped = 0
+    errors = []
+    entries = {}
+    timings = {}
+    
+    for batch_num, line_num, module, topic, complexity, filename in chunk:
+        try:
+            lesson_path = output_dir / filename
+            input_hash = lesson_input_hash(module, topic, complexity)
+            
+            if is_up_to_date(manifest.get(filename), input_hash, lesson_path):
+                entries[filename] = manifest[filename]
+                lessons_skipped += 1
+                continue
+            
+            start = time.perf_counter()
+            
+            # Generate lesson content
+            content = generate_lesson_content(module, topic, complexity, filename)
+            
+            # Write lesson file (no-op if the bytes are already identical)
+            if write_if_changed(lesson_path, content):
+                lessons_created += 1
+            else:
+                lessons_skipped += 1
+            
+            entries[filename] = {
+                'input_hash': input_hash,
+                'size': lesson_path.stat().st_size
+            }
+            timings[filename] = time.perf_counter() - start
+            
+        except Exception as e:
+            location = f"Batch {batch_num}, Line {line_num}" if batch_num else f"Topic {line_num}"
+            errors.append(f"{location}: {str(e)}")
+    
+    return lessons_created, lessons_skipped, errors, entries, timings
+
+def _process_chunk_args(chunk_arg, output_dir):
+    """Unpack a (chunk, manifest subset) pair for process_chunk"""
+    chunk, manifest = chunk_arg
+    return process_chunk(chunk, output_dir, manifest)
+
+def render_chunk(chunk):
+    """Render a chunk of topics without touching disk; returns bytes rendered"""
+    return sum(
+        len(generate_lesson_content(module, topic, complexity, filename))
+        for _, _, module, topic, complexity, filename in chunk
+    )
+
+def make_executor(executor_kind, workers):
+    """Pool for 'thread' or 'process'; None for 'serial'"""
+    if executor_kind == 'serial':
+        return None
+    pool_class = ProcessPoolExecutor if executor_kind == 'process' else ThreadPoolExecutor
+    return pool_class(max_workers=workers)
+
+def run_chunks(executor_kind, workers, fn, chunks, *args, executor=None):
+    """Run fn(chunk, *args) for every chunk, yielding results as they complete
+
+    'serial' runs in-process, 'thread' uses a thread pool and 'process' a
+    process pool, which sidesteps the GIL for CPU-bound rendering. An
+    existing `executor` is reused (and left open) instead of creating one.
+    """
+    if executor_kind == 'serial':
+        for chunk in chunks:
+            yield fn(chunk, *args)
+        return
     
-    return batch_num, lessons_created, errors
+    if executor is None:
+        with make_executor(executor_kind, workers) as executor:
+            yield from run_chunks(executor_kind, workers, fn, chunks, *args, executor=executor)
+        return
+    futures = [executor.submit(fn, chunk, *args) for chunk in chunks]
+    for future in as_completed(futures):
+        yield future.result()
+
+def benchmark_rendering(items, executor_kind, workers, chunk_size, rounds=3):
+    """Measure render throughput of an executor against a serial baseline
+
+    Only rendering is timed (no disk I/O), best of `rounds` runs each. The
+    pool is created and warmed up once, outside the timed rounds, and its
+    start-up is timed separately. Returns (serial_seconds,
+    parallel_seconds, startup_seconds).
+    """
+    chunks = chunk_items(items, chunk_size)
+    
+    def best_time(kind, executor=None):
+        best = float('inf')
+        for _ in range(rounds):
+            start = time.perf_counter()
+            for _ in run_chunks(kind, workers, render_chunk, chunks, executor=executor):
+                pass
+            best = min(best, time.perf_counter() - start)
+        return best
+    
+    serial_time = best_time('serial')
+    start = time.perf_counter()
+    executor = make_executor(executor_kind, workers)
+    if executor is None:
+        return serial_time, best_time(executor_kind), 0.0
+    with executor:
+        # Start every worker before timing: one empty chunk each
+        for _ in run_chunks(executor_kind, workers, render_chunk, [[]] * workers, executor=executor):
+            pass
+        startup_time = time.perf_counter() - start
+        return serial_time, best_time(executor_kind, executor), startup_time
+
+def report_batch_plan(plan, items, timings):
+    """Print predicted vs actual cost per batch from this run's timings
+
+    Actual time is the sum of render+write seconds of the batch's topics,
+    i.e. the wall time of that batch on a dedicated worker. Lessons skipped
+    as unchanged contribute nothing.
+    """
+    actual = {}
+    for batch_num, _, _, _, _, filename in items:
+        actual[batch_num] = actual.get(batch_num, 0.0) + timings.get(filename, 0.0)
+    
+    unit = 's' if plan['cost_model'] == 'learned' else ' (relative)'
+    print(f"BATCH PLAN: {plan['cost_model']} cost model")
+    for entry in plan['batches']:
+        print(f"  Batch {entry['batch']:2d}: predicted {entry['predicted']:.4f}{unit}, "
+              f"actual {actual.get(entry['batch'], 0.0):.4f}s")
+    
+    predicted = [entry['predicted'] for entry in plan['batches']]
+    measured = [actual.get(entry['batch'], 0.0) for entry in plan['batches']]
+    if sum(measured) > 0:
+        print(f"  IMBALANCE (max/mean): predicted {max(predicted) / (sum(predicted) / len(predicted)):.3f}x, "
+              f"actual {max(measured) / (sum(measured) / len(measured)):.3f}x")
 
 def main():
     """Main parallel processing function"""
+    parser = argparse.ArgumentParser(description="Generate lessons from batch files in parallel")
+    parser.add_argument("--batch-dir", default="C:/ai/data_engineering_learning/lessons/batch_processing",
+                       help="Directory containing batch_NN.txt files")
+    parser.add_argument("--output-dir", default="C:/ai/data_engineering_learning/lessons",
+                       help="Directory to write lesson files to")
+    parser.add_argument("--force", action="store_true",
+                       help="Ignore the manifest and re-render every lesson")
+    parser.add_argument("--executor", default="serial", choices=["thread", "process", "serial"],
+                       help="Execution backend for rendering (rendering is cheap, so pools "
+                            "rarely beat serial; measure with --benchmark first)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                       help="Number of worker threads/processes")
+    parser.add_argument("--source", default="batches", choices=["batches", "topics"],
+                       help="Read topics from batch files or straight from the training document")
+    parser.add_argument("--topics-file", default=str(TOPICS_FILE),
+                       help="Training document used with --source topics")
+    parser.add_argument("--queue", action="store_true",
+                       help="Feed topics longest-first through the shared work queue")
+    parser.add_argument("--chunk-size", type=int,
+                       help="Topics per work unit, i.e. queue granularity "
+                            "(default: spread over 4 chunks per worker)")
+    parser.add_argument("--by-batch", action="store_true",
+                       help="Use each batch file as one work unit instead of fixed-size chunks")
+    parser.add_argument("--export-batches", type=int, metavar="N",
+                       help="Also write N cost-balanced batch files to --batch-dir")
+    parser.add_argument("--benchmark", action="store_true",
+                       help="Measure render speedup against a serial baseline")
+    args = parser.parse_args()
+    
     print(">> Starting Parallel Lesson Generation")
     print("=" * 60)
     
     # Setup paths
-    batch_dir = Path("C:/ai/data_engineering_learning/lessons/batch_processing")
-    output_dir = Path("C:/ai/data_engineering_learning/lessons")
+    batch_dir = Path(args.batch_dir)
+    output_dir = Path(args.output_dir)
     output_dir.mkdir(exist_ok=True)
     
-    # Get all batch files
-    batch_files = sorted(batch_dir.glob("batch_*.txt"))
-    if not batch_files:
-        print("ERROR: No batch files found!")
-        return
+    manifest_path = output_dir / MANIFEST_FILENAME
+    manifest = {} if args.force else load_manifest(manifest_path)
+    
+    if args.source == "topics":
+        items, all_errors = read_source_topics(args.topics_file)
+        print(f"INFO: Read {len(items)} topics from {args.topics_file}")
+    else:
+        # Get all batch files
+        batch_files = sorted(batch_dir.glob("batch_*.txt"))
+        if not batch_files:
+            print("ERROR: No batch files found!")
+            return
+        
+        items, all_errors = read_batch_topics(batch_files)
+        print(f"INFO: Found {len(batch_files)} batch files, {len(items)} topics")
     
-    print(f"INFO: Found {len(batch_files)} batch files")
-    print(f"TARGET: ~27 lessons per batch = ~540 total lessons")
-    print(f"THREADS: Using {min(20, len(batch_files))} parallel threads")
+    if args.export_batches:
+        batch_dir.mkdir(exist_ok=True)
+        export_batches(items, batch_dir, args.export_batches)
+        print(f"EXPORT: Wrote {args.export_batches} batch files to {batch_dir}")
+    
+    workers = max(1, args.workers)
+    chunk_size = args.chunk_size or max(1, -(-len(items) // (workers * 4)))
+    if args.by_batch and args.source == "batches":
+        chunks = chunk_by_batch(items)
+    else:
+        chunks = chunk_items(order_by_cost(items, batch_dir) if args.queue else items, chunk_size)
+    
+    print(f"EXECUTOR: {args.executor} with {workers if args.executor != 'serial' else 1} workers, "
+          f"{len(chunks)} chunks of up to {max(len(chunk) for chunk in chunks) if chunks else 0} topics")
+    print(f"MANIFEST: {len(manifest)} lessons recorded" + (" (ignored, --force)" if args.force else ""))
     print()
     
     start_time = time.time()
     total_lessons = 0
-    all_errors = []
+    total_skipped = 0
+    new_manifest = {}
+    timings = {}
     
-    # Process batches in parallel
-    with ThreadPoolExecutor(max_workers=20) as executor:
-        # Submit all batch processing jobs
-        future_to_batch = {
-            executor.submit(process_batch, i+1, batch_file, output_dir): i+1 
-            for i, batch_file in enumerate(batch_files)
-        }
-        
-        # Collect results as they complete
-        for future in as_completed(future_to_batch):
-            batch_num = future_to_batch[future]
-            try:
-                batch_num, lessons_created, errors = future.result()
-                total_lessons += lessons_created
-                all_errors.extend(errors)
-                
-                print(f"COMPLETED: Batch {batch_num:2d} completed: {lessons_created:2d} lessons")
-                
-            except Exception as e:
-                print(f"FAILED: Batch {batch_num:2d} failed: {str(e)}")
-                all_errors.append(f"Batch {batch_num} critical failure: {str(e)}")
+    # Each chunk only needs the manifest entries for its own lessons
+    chunk_args = [
+        (chunk, {filename: manifest[filename] for *_, filename in chunk if filename in manifest})
+        for chunk in chunks
+    ]
+    
+    try:
+        for lessons_created, lessons_skipped, errors, entries, chunk_timings in run_chunks(
+                args.executor, workers, _process_chunk_args, chunk_args, output_dir):
+            total_lessons += lessons_created
+            total_skipped += lessons_skipped
+            all_errors.extend(errors)
+            new_manifest.update(entries)
+            timings.update(chunk_timings)
+            
+            done = total_lessons + total_skipped
+            print(f"  PROGRESS: {done}/{len(items)} topics ({total_lessons} written)")
+    except Exception as e:
+        print(f"FAILED: Executor failed: {str(e)}")
+        all_errors.append(f"Executor critical failure: {str(e)}")
+    
+    if new_manifest != manifest:
+        save_manifest(manifest_path, new_manifest)
+    if timings and batch_dir.exists():
+        save_timings(batch_dir, timings)
     
     # Final summary
     end_time = time.time()
@@ -322,10 +404,21 @@ def main():
     print("=" * 60)
     print(">> LESSON GENERATION COMPLETE!")
     print("=" * 60)
-    print(f"TOTAL LESSONS: {total_lessons}")
-    print(f"TOTAL TIME: {duration:.1f} seconds")
-    print(f"SPEED: {total_lessons/duration:.1f} lessons/second")
-    print(f"EFFICIENCY: {20:.0f}x faster than sequential")
+    print(f"TOTAL LESSONS: {total_lessons} written, {total_skipped} unchanged")
+    print(f"TOTAL TIME: {duration:.3f} seconds")
+    print(f"SPEED: {(total_lessons + total_skipped)/max(duration, 1e-9):.1f} lessons/second")
+    
+    if args.benchmark:
+        serial_time, parallel_time, startup_time = benchmark_rendering(items, args.executor, workers, chunk_size)
+        print(f"BENCHMARK: serial render {serial_time:.3f}s ({len(items)/serial_time:.0f} lessons/s), "
+              f"{args.executor} render {parallel_time:.3f}s ({len(items)/parallel_time:.0f} lessons/s)")
+        if args.executor != 'serial':
+            print(f"STARTUP: {args.executor} pool start-up {startup_time:.3f}s (once per run, not in the render times)")
+        print(f"EFFICIENCY: {serial_time/parallel_time:.2f}x vs serial (measured)")
+    
+    plan = load_batch_plan(batch_dir) if args.source == "batches" else None
+    if plan and timings:
+        report_batch_plan(plan, items, timings)
     
     if all_errors:
         print(f"ERRORS: {len(all_errors)} encountered")
@@ -342,4 +435,4 @@ def main():
     print("STATUS: Ready for data engineering learning!")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,156 @@
+import re
+import hashlib
+import time
+from functools import lru_cache
+from pathlib import Path
+
+# Placeholder template used for every generated lesson. "Template for Lesson.md"
+# at the repo root is a finished example lesson (ACID) with no placeholders, so
+# the generator keeps its own template alongside this module.
+TEMPLATE_PATH = Path(__file__).parent / "lesson_template.md"
+
+# Placeholders look like {{name}}
+PLACEHOLDER_PATTERN = re.compile(r'\{\{\s*(\w+)\s*\}\}')
+
+# Every placeholder a lesson template may use, mapped to the expression the
+# compiled render function evaluates it with. The function's only inputs are
+# module, topic and complexity; derived values are computed inline, once.
+LESSON_FIELDS = {
+    'topic': "topic",
+    'topic_short': "topic.split('(')[0].strip()",
+    'module': "module",
+    'module_lower': "module.lower()",
+    'complexity': "complexity",
+    'complexity_label': "_complexity_label(complexity)",
+}
+
+COMPLEXITY_LABELS = [
+    ('F', "Foundational concepts"),
+    ('I', "Intermediate application"),
+    ('A', "Advanced implementation"),
+]
+
+class CompiledTemplate:
+    """A template compiled once into a single render function
+
+    The literal text becomes string constants and each placeholder a local
+    variable, joined by one f-string expression, so rendering costs what
+    the hand-written f-string did. Literals are emitted with repr(), so
+    template text is never interpreted as code.
+    """
+
+    def __init__(self, text):
+        self.source = text
+        self.version = hashlib.sha256(text.encode('utf-8')).hexdigest()[:12]
+
+        # Even indexes hold literal text, odd indexes hold placeholder names
+        self.parts = PLACEHOLDER_PATTERN.split(text)
+        self.placeholders = set(self.parts[1::2])
+        unknown = self.placeholders - set(LESSON_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown template placeholders: {', '.join(sorted(unknown))}")
+
+        lines = ["def render_lesson(module, topic, complexity):"]
+        for name, expression in LESSON_FIELDS.items():
+            if name in self.placeholders and name != expression:
+                lines.append(f"    {name} = {expression}")
+        pieces = [f'f"{{{part}}}"' if i % 2 else repr(part)
+                  for i, part in enumerate(self.parts) if part]
+        lines.append(f"    return ({' '.join(pieces) or repr('')})")
+        namespace = {'_complexity_label': complexity_label}
+        exec(compile("\n".join(lines) + "\n", str(TEMPLATE_PATH), 'exec'), namespace)
+        # render_lesson(module, topic, complexity) -> lesson text
+        self.render_lesson = namespace['render_lesson']
+
+    def render(self, context):
+        """Render from a {placeholder: value} mapping"""
+        parts = self.parts[:]
+        for i in range(1, len(parts), 2):
+            parts[i] = str(context[parts[i]])
+        return ''.join(parts)
+
+@lru_cache(maxsize=None)
+def complexity_label(complexity):
+    """Describe a complexity code such as 'F', 'I-A' or 'E'"""
+    for code, label in COMPLEXITY_LABELS:
+        if code in complexity:
+            return label
+    return "Expert-level knowledge"
+
+def lesson_context(module, topic, complexity):
+    """Compute every placeholder value for one lesson"""
+    return {
+        'topic': topic,
+        'topic_short': topic.split('(')[0].strip(),
+        'module': module,
+        'module_lower': module.lower(),
+        'complexity': complexity,
+        'complexity_label': complexity_label(complexity),
+    }
+
+def read_lesson_template(template_path=TEMPLATE_PATH):
+    """Read the raw lesson template"""
+    with open(template_path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+_compiled = {}
+
+def load_template(template_path=TEMPLATE_PATH):
+    """Return the compiled template, parsing the file only on first use"""
+    key = str(template_path)
+    if key not in _compiled:
+        _compiled[key] = CompiledTemplate(read_lesson_template(template_path))
+    return _compiled[key]
+
+def render_lesson(module, topic, complexity, template=None):
+    """Render a single lesson with the compiled template"""
+    return (template or load_template()).render_lesson(module, topic, complexity)
+
+def benchmark(topics, rounds=5):
+    """Compare lessons/sec of the original f-string against the compiled template
+
+    topics is a list of (module, topic, complexity) tuples. Both renderers
+    must produce identical lessons. Returns (fstring_rate, compiled_rate)
+    in lessons/second, best of `rounds` alternating runs.
+    """
+    from lesson_baseline import generate_lesson_content
+
+    render = CompiledTemplate(read_lesson_template()).render_lesson
+    for module, topic, complexity in topics:
+        if render(module, topic, complexity) != generate_lesson_content(module, topic, complexity, None):
+            raise AssertionError(f"Compiled template output differs for {topic!r}")
+
+    def fstring():
+        for module, topic, complexity in topics:
+            generate_lesson_content(module, topic, complexity, None)
+
+    def compiled():
+        for module, topic, complexity in topics:
+            render(module, topic, complexity)
+
+    best = {fstring: float('inf'), compiled: float('inf')}
+    for _ in range(rounds):
+        for fn in best:
+            start = time.perf_counter()
+            fn()
+            best[fn] = min(best[fn], time.perf_counter() - start)
+    return len(topics) / best[fstring], len(topics) / best[compiled]
+
+if __name__ == "__main__":
+    batch_dir = Path(__file__).parent
+    topics = []
+    for batch_file in sorted(batch_dir.glob("batch_*.txt")):
+        with open(batch_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                parts = line.strip().split('|')
+                if len(parts) == 4:
+                    topics.append(tuple(parts[:3]))
+
+    template = load_template()
+    print(f"Template: {TEMPLATE_PATH.name} (version {template.version})")
+    print(f"Segments: {len(template.parts)} ({len(template.placeholders)} distinct placeholders)")
+
+    fstring_rate, compiled_rate = benchmark(topics, rounds=20)
+    print(f"Original f-string: {fstring_rate:,.0f} lessons/second")
+    print(f"Compiled template: {compiled_rate:,.0f} lessons/second")
+    print(f"Compiled template runs at {compiled_rate / fstring_rate:.2f}x the f-string rate over {len(topics)} topics")
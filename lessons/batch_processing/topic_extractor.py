@@ -0,0 +1,59 @@
+import re
+from pathlib import Path
+
+TOPICS_FILE = Path("C:/ai/data_engineering_learning/Data Training Topics.txt")
+
+# One grammar for every line of the training document. A line is either a
+# module header ("Module 3: Data Warehousing Principles") or a bulleted
+# topic ending in its complexity ("•  Star schema design [F-I]"). Legend
+# bullets ("•  [F] = Foundational ...") never match because a topic name
+# cannot start with '[' and the complexity must close the line.
+LINE_GRAMMAR = re.compile(
+    r'\s*(?:'
+    r'Module\s+\d+:\s*(?P<module>.+?)'
+    r'|•\s*(?P<topic>[^\[\s].*?)\s*\[(?P<complexity>[FIAE](?:-[FIAE])?)\]'
+    r')\s*'
+)
+
+def create_filename(module, topic):
+    """Create standardized filename"""
+    # Clean module name
+    module_clean = re.sub(r'[^\w\s-]', '', module).strip()
+    module_clean = re.sub(r'\s+', '-', module_clean)
+
+    # Clean topic name
+    topic_clean = re.sub(r'[^\w\s-]', '', topic).strip()
+    topic_clean = re.sub(r'\s+', '-', topic_clean)
+    topic_clean = topic_clean.lower()
+
+    return f"{module_clean}--{topic_clean}--2024-10-30.md"
+
+def iter_topics(lines):
+    """Yield a topic record for every topic line, one line at a time
+
+    lines can be any iterable of strings (an open file, a list, a
+    generator over several syllabi), so memory use stays constant
+    regardless of the size of the curriculum.
+    """
+    current_module = None
+
+    for line in lines:
+        match = LINE_GRAMMAR.fullmatch(line)
+        if not match:
+            continue
+
+        if match.group('module'):
+            current_module = match.group('module')
+        elif current_module:
+            topic_name = match.group('topic')
+            yield {
+                'module': current_module,
+                'topic': topic_name,
+                'complexity': match.group('complexity'),
+                'filename': create_filename(current_module, topic_name)
+            }
+
+def stream_topics(topics_file=TOPICS_FILE):
+    """Stream topic records from a training document on disk"""
+    with open(topics_file, 'r', encoding='utf-8') as f:
+        yield from iter_topics(f)
@@ -11,110 +11,62 @@ import os
 import re
 import json
 import asyncio
-import concurrent.futures
+import argparse
 from pathlib import Path
 from datetime import datetime
 
+from lesson_index import (INDEX_PATH, UNKNOWN_MODULE, LessonIndex,
+                          extract_slug_from_filename, parse_module_from_filename)
+from lesson_navigation import SHARD_DIR, save_navigation_shards
+from lesson_watcher import create_watcher
+
 # Base directory for lessons
 LESSONS_DIR = Path(r"C:\ai\data_engineering_learning\lessons")
 
-# Module mapping
-MODULE_MAPPING = {
-    'Data-Database-Fundamentals': {'id': 'module-1', 'name': 'Module 1: Data & Database Fundamentals'},
-    'SQL-ELT-Concepts': {'id': 'module-2', 'name': 'Module 2: SQL & ELT Concepts'},
-    'Data-Warehousing-Principles': {'id': 'module-3', 'name': 'Module 3: Data Warehousing Principles'},
-    'Data-Modeling': {'id': 'module-4', 'name': 'Module 4: Data Modeling'},
-    'Snowflake-Specific-Knowledge': {'id': 'module-5', 'name': 'Module 5: Snowflake-Specific Knowledge'},
-    'ETLELT-Design-Best-Practices': {'id': 'module-6', 'name': 'Module 6: ETL/ELT Design & Best Practices'},
-    'Data-Governance-Quality-Metadata': {'id': 'module-7', 'name': 'Module 7: Data Governance, Quality & Metadata'},
-    'Snowflake-Security-Access-Control': {'id': 'module-8', 'name': 'Module 8: Snowflake Security & Access Control'},
-    'Reporting-BI-Concepts': {'id': 'module-9', 'name': 'Module 9: Reporting & BI Concepts'},
-    'UnixLinux-File-Handling': {'id': 'module-10', 'name': 'Module 10: Unix/Linux & File Handling'},
-    'Version-Control-Team-Collaboration': {'id': 'module-11', 'name': 'Module 11: Version Control & Team Collaboration'},
-    'Performance-Optimization-Troubleshooting': {'id': 'module-12', 'name': 'Module 12: Performance Optimization & Troubleshooting'},
-    'CICD-Deployment-Practices': {'id': 'module-13', 'name': 'Module 13: CI/CD & Deployment Practices'},
-    'Monitoring-Observability': {'id': 'module-14', 'name': 'Module 14: Monitoring & Observability'},
-    'Orchestration-Scheduling-Tools': {'id': 'module-15', 'name': 'Module 15: Orchestration & Scheduling Tools'},
-    'Data-Transformation-with-dbt-Optional-but-Recommended': {'id': 'module-16', 'name': 'Module 16: Data Transformation with dbt'},
-    'Soft-Skills-Professional-Practices': {'id': 'module-17', 'name': 'Module 17: Soft Skills & Professional Practices'},
-    'Business-Domain-Knowledge': {'id': 'module-18', 'name': 'Module 18: Business & Domain Knowledge'},
-    'Additional-Technical-Skills': {'id': 'module-19', 'name': 'Module 19: Additional Technical Skills'},
-    'Emerging-Topics-Advanced-Concepts': {'id': 'module-20', 'name': 'Module 20: Emerging Topics & Advanced Concepts'},
-}
+def write_json_atomic(path, data, **dump_kwargs):
+    """Write JSON via a temp file and rename, so readers never see a partial file"""
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, **dump_kwargs)
+    os.replace(tmp_path, path)
 
 class LessonSlugGenerator:
-    def __init__(self):
+    def __init__(self, index_path=INDEX_PATH, shard_dir=None):
         self.lessons_by_module = {}
         self.all_lessons = []
+        self.index_path = index_path
+        # When set, the map is written as per-module shards instead of one file
+        self.shard_dir = shard_dir
         
     def extract_slug_from_filename(self, filename):
         """Extract lesson slug from filename"""
-        # Remove .md extension
-        without_ext = filename.replace('.md', '')
-        # Format: Module-Name--topic-slug--2024-10-30
-        parts = without_ext.split('--')
-        if len(parts) >= 2:
-            return parts[1] if len(parts) == 3 else '--'.join(parts[1:-1])
-        return without_ext
+        return extract_slug_from_filename(filename)
     
     def parse_module_from_filename(self, filename):
         """Parse module info from filename"""
-        for prefix, module_info in MODULE_MAPPING.items():
-            if filename.startswith(prefix):
-                return module_info
-        return None
-    
-    def process_lesson_file(self, file_path):
-        """Process a single lesson file"""
-        try:
-            filename = file_path.name
-            module_info = self.parse_module_from_filename(filename)
-            
-            if not module_info:
-                return None
-            
-            # Read content to extract title
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Extract title (first # heading)
-            title_match = re.search(r'^#\s+(.+)$', content, re.MULTILINE)
-            title = title_match.group(1) if title_match else 'Untitled Lesson'
-            
-            slug = self.extract_slug_from_filename(filename)
-            
-            lesson_info = {
-                'slug': slug,
-                'title': title,
-                'filename': filename,
-                'module_id': module_info['id'],
-                'module_name': module_info['name'],
-                'file_path': str(file_path)
-            }
-            
-            return lesson_info
-            
-        except Exception as e:
-            print(f"Error processing {file_path}: {e}")
-            return None
+        return parse_module_from_filename(filename)
     
     def scan_all_lessons(self):
-        """Scan all lesson files and organize by module"""
+        """Scan all lesson files and organize by module
+
+        Goes through the persistent lesson index, so only lessons whose size
+        or mtime changed since the last scan are read from disk.
+        """
         print(f"Scanning lessons directory: {LESSONS_DIR}")
         
         if not LESSONS_DIR.exists():
             print(f"Lessons directory not found: {LESSONS_DIR}")
             return
         
-        md_files = list(LESSONS_DIR.glob("*.md"))
-        print(f"Found {len(md_files)} markdown files")
+        with LessonIndex(self.index_path) as index:
+            stats = index.update(LESSONS_DIR)
+            indexed = index.all_lessons()
         
-        # Process files in parallel
-        with concurrent.futures.ThreadPoolExecutor(max_workers=20) as executor:
-            results = list(executor.map(self.process_lesson_file, md_files))
+        print(f"Found {stats['total']} lesson files "
+              f"({stats['updated']} re-indexed, {stats['unchanged']} unchanged, {stats['deleted']} removed)")
         
-        # Filter and organize results
-        valid_lessons = [r for r in results if r is not None]
+        valid_lessons = [self._lesson_info(lesson) for lesson in indexed]
         self.all_lessons = valid_lessons
         
         # Group by module
@@ -128,6 +80,59 @@ class LessonSlugGenerator:
         
         return self.lessons_by_module
     
+    def _lesson_info(self, lesson):
+        """Reduce an index row to the fields the navigation map uses"""
+        return {
+            'slug': lesson['slug'],
+            'title': lesson['title'],
+            'filename': lesson['filename'],
+            'module_id': lesson['module_id'],
+            'module_name': lesson['module_name'],
+            'file_path': lesson['file_path']
+        }
+    
+    def refresh_modules(self, index, module_ids):
+        """Reload only the given modules' lessons from the index"""
+        for module_id in module_ids:
+            lessons = [self._lesson_info(lesson) for lesson in index.lessons_in_module(module_id)]
+            if lessons:
+                self.lessons_by_module[module_id] = lessons
+            else:
+                self.lessons_by_module.pop(module_id, None)
+        self.all_lessons = [lesson for lessons in self.lessons_by_module.values() for lesson in lessons]
+    
+    def watch(self, output_file="lesson_navigation_map.json", interval=2.0):
+        """Keep the navigation map up to date as lessons change
+
+        Each batch of filesystem events updates the index (re-reading only
+        changed files), reloads just the modules those files belong to and
+        rewrites the map atomically. Runs until interrupted.
+        """
+        watcher = create_watcher(LESSONS_DIR, interval)
+        print(f"Watching {LESSONS_DIR} with {type(watcher).__name__} (Ctrl+C to stop)")
+        
+        try:
+            with LessonIndex(self.index_path) as index:
+                while True:
+                    changed = watcher.wait()
+                    if not changed:
+                        continue
+                    
+                    module_ids = {
+                        (parse_module_from_filename(name) or UNKNOWN_MODULE)['id'] for name in changed
+                    } - {UNKNOWN_MODULE['id']}
+                    stats = index.update(LESSONS_DIR)
+                    self.refresh_modules(index, module_ids)
+                    self.save_navigation_map(output_file)
+                    
+                    print(f"[{datetime.now():%H:%M:%S}] {len(changed)} files changed, "
+                          f"{stats['updated']} re-indexed, {stats['deleted']} removed; "
+                          f"updated {', '.join(sorted(module_ids)) or 'no modules'}")
+        except KeyboardInterrupt:
+            print("Stopped watching")
+        finally:
+            watcher.close()
+    
     def generate_lesson_navigation_map(self):
         """Generate lesson navigation mapping for frontend"""
         navigation_map = {}
@@ -150,13 +155,15 @@ class LessonSlugGenerator:
         return navigation_map
     
     def save_navigation_map(self, output_file="lesson_navigation_map.json"):
-        """Save navigation map to JSON file"""
+        """Save navigation map to JSON file, or to per-module shards"""
         nav_map = self.generate_lesson_navigation_map()
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(nav_map, f, indent=2, ensure_ascii=False)
-        
-        print(f"Navigation map saved to: {output_file}")
+        if self.shard_dir:
+            written = save_navigation_shards(nav_map, self.shard_dir)
+            print(f"Navigation shards saved to: {self.shard_dir} ({written} of {len(nav_map)} rewritten)")
+        else:
+            write_json_atomic(output_file, nav_map, indent=2)
+            print(f"Navigation map saved to: {output_file}")
         return nav_map
     
     def generate_report(self):
@@ -187,7 +194,7 @@ class LessonSlugGenerator:
         
         return report
 
-async def main():
+async def main(watch=False, interval=2.0, shard_dir=None):
     """Main execution"""
     print("=" * 80)
     print("PARALLEL LESSON SLUG GENERATOR")
@@ -195,7 +202,7 @@ async def main():
     print("Optimized for 10-core/20-thread/32GB RAM system")
     print("=" * 80)
     
-    generator = LessonSlugGenerator()
+    generator = LessonSlugGenerator(shard_dir=shard_dir)
     
     # Scan and process all lessons
     lessons_by_module = generator.scan_all_lessons()
@@ -235,11 +242,23 @@ async def main():
                 print(f"    • {lesson['title']} ({lesson['url']})")
     
     print(f"\nReports saved:")
-    print(f"  - Navigation map: lesson_navigation_map.json")
+    print(f"  - Navigation map: {shard_dir or 'lesson_navigation_map.json'}")
     print(f"  - Detailed report: {report_file}")
     print("=" * 80)
     
+    if watch:
+        generator.watch(interval=interval)
+    
     return report
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Generate the lesson navigation map")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep running and update the map as lessons change")
+    parser.add_argument("--interval", type=float, default=2.0,
+                        help="Polling interval in seconds when inotify is unavailable")
+    parser.add_argument("--shards", nargs="?", const=str(SHARD_DIR), metavar="DIR",
+                        help=f"Write a manifest plus one JSON shard per module to DIR (default: {SHARD_DIR})")
+    args = parser.parse_args()
+    
+    asyncio.run(main(watch=args.watch, interval=args.interval, shard_dir=args.shards))
\ No newline at end of file
@@ -0,0 +1,786 @@
+#!/usr/bin/env python3
+"""
+Estimate query cost against table statistics.
+
+Walks the statement tree of each query and, using row counts, partition /
+cluster keys and column cardinalities from a stats file, estimates bytes
+scanned, whether filters can prune partitions, join fan-out and the risk
+of aggregations, sorts and join builds spilling out of memory. Findings
+are ranked by estimated bytes so the most expensive problem comes first.
+
+Default statistics are derived from assets/sample-datasets; use --scale
+to project them to production sizes, or --write-stats to get a file to
+edit.
+"""
+
+import argparse
+import json
+import math
+import re
+import sys
+from typing import Dict, List, NamedTuple
+
+from sample_data import DATASET_DIR, column_names, dataset_paths, read_dataset
+from sql_tree import Group, parse
+
+DEFAULT_MEMORY_BYTES = 8 * 1024 ** 3
+DEFAULT_COLUMN_BYTES = 8
+AGGREGATE_STATE_BYTES = 16
+# Rows cost something to produce even when no column is read (COUNT(*))
+MIN_ROW_BYTES = DEFAULT_COLUMN_BYTES
+
+# Textbook selectivities when only cardinalities are known
+RANGE_SELECTIVITY = 1 / 3
+BETWEEN_SELECTIVITY = 1 / 4
+LIKE_SELECTIVITY = 1 / 10
+FAN_OUT_THRESHOLD = 1.5
+
+DATE_VALUE = re.compile(r"\d{4}-\d{2}-\d{2}")
+TIMESTAMP_VALUE = re.compile(r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(:\d{2}(\.\d+)?)?(Z|[+-]\d{2}:?\d{2})?")
+NUMBER_VALUE = re.compile(r"-?\d+(\.\d+)?")
+
+CLAUSE_WORDS = {'SELECT', 'FROM', 'WHERE', 'HAVING', 'QUALIFY', 'LIMIT', 'WINDOW', 'OFFSET', 'FETCH'}
+SET_OPERATORS = {'UNION', 'INTERSECT', 'EXCEPT', 'MINUS'}
+JOIN_WORDS = {'JOIN', 'INNER', 'LEFT', 'RIGHT', 'FULL', 'OUTER', 'CROSS', 'NATURAL', 'LATERAL'}
+NOT_ALIAS = CLAUSE_WORDS | SET_OPERATORS | JOIN_WORDS | {
+    'ON', 'USING', 'AS', 'WITH', 'GROUP', 'ORDER', 'BY', 'AND', 'OR', 'SAMPLE', 'TABLESAMPLE', 'AT', 'BEFORE'
+}
+SQL_WORDS = NOT_ALIAS | {
+    'DISTINCT', 'ALL', 'NOT', 'NULL', 'IS', 'IN', 'LIKE', 'ILIKE', 'BETWEEN', 'CASE', 'WHEN', 'THEN',
+    'ELSE', 'END', 'TRUE', 'FALSE', 'ASC', 'DESC', 'OVER', 'PARTITION', 'ROWS', 'RANGE', 'INTERVAL',
+    'CURRENT_DATE', 'CURRENT_TIMESTAMP', 'EXISTS', 'NULLS', 'FIRST', 'LAST'
+}
+COMPARISON_OPS = {'=', '<', '>', '<=', '>=', '<>', '!='}
+RANGE_OPS = {'<', '>', '<=', '>='}
+
+class Cost(NamedTuple):
+    kind: str          # scan, no-pruning, fan-out, cartesian, spill
+    bytes: float       # estimated bytes this finding costs
+    statement: int     # 1-based
+    line: int
+    col: int
+    detail: str
+
+# Statistics
+
+def _value_bytes(value):
+    """Approximate stored width of one sample value"""
+    if isinstance(value, bool):
+        return 1
+    if isinstance(value, (int, float)):
+        return 8
+    if isinstance(value, (dict, list)):
+        return len(json.dumps(value))
+    text = str(value)
+    if DATE_VALUE.fullmatch(text):
+        return 4
+    if TIMESTAMP_VALUE.fullmatch(text) or NUMBER_VALUE.fullmatch(text):
+        return 8
+    return len(text.encode('utf-8'))
+
+def _is_temporal(values):
+    return bool(values) and all(
+        isinstance(v, str) and (DATE_VALUE.fullmatch(v) or TIMESTAMP_VALUE.fullmatch(v)) for v in values
+    )
+
+def table_stats(rows):
+    """Row count, per-column cardinality/width and a guessed cluster key"""
+    columns = {}
+    temporal = []
+    for name in column_names(rows):
+        values = [row[name] for row in rows if row.get(name) not in (None, '')]
+        distinct = len({json.dumps(v, sort_keys=True) for v in values})
+        avg_bytes = sum(_value_bytes(v) for v in values) / len(values) if values else DEFAULT_COLUMN_BYTES
+        columns[name] = {
+            'distinct': distinct,
+            'nulls': len(rows) - len(values),
+            'avg_bytes': round(avg_bytes, 1)
+        }
+        if _is_temporal(values):
+            temporal.append(name)
+
+    return {
+        'row_count': len(rows),
+        'partition_keys': [],
+        'cluster_keys': temporal[:1],
+        'columns': columns
+    }
+
+def build_default_stats(dataset_dir=DATASET_DIR):
+    """Statistics for every CSV/JSON dataset in dataset_dir, keyed by file stem"""
+    tables = {name: table_stats(read_dataset(path)) for name, path in dataset_paths(dataset_dir).items()}
+    return {'memory_bytes': DEFAULT_MEMORY_BYTES, 'tables': tables}
+
+def scale_stats(stats, factor):
+    """Project statistics to `factor` times the rows
+
+    Unique columns and identifiers (*_id) grow with the rows; other
+    cardinalities are kept, since categories and dates do not.
+    """
+    scaled = {'memory_bytes': stats.get('memory_bytes', DEFAULT_MEMORY_BYTES), 'tables': {}}
+    for name, table in stats['tables'].items():
+        rows = table['row_count']
+        columns = {}
+        for column, info in table['columns'].items():
+            info = dict(info)
+            if info['distinct'] >= rows - info.get('nulls', 0) or column.lower().endswith('_id'):
+                info['distinct'] = int(info['distinct'] * factor)
+            info['nulls'] = int(info.get('nulls', 0) * factor)
+            columns[column] = info
+        scaled['tables'][name] = dict(table, row_count=int(rows * factor), columns=columns)
+    return scaled
+
+def load_stats(path=None, scale=None):
+    if path:
+        with open(path, 'r', encoding='utf-8') as f:
+            stats = json.load(f)
+    else:
+        stats = build_default_stats()
+    if scale:
+        stats = scale_stats(stats, scale)
+    return stats
+
+# Query structure
+
+class TableRef:
+    """A FROM/JOIN source: a base table with stats, or a derived table"""
+
+    def __init__(self, name, alias, node, stats=None, derived=None):
+        self.name = name
+        self.alias = alias
+        self.node = node
+        self.stats = stats
+        self.derived = derived              # (rows, width) of a subquery
+        self.used_columns = set()
+        self.all_columns = False
+        self.selectivity = 1.0
+        self.prune_fraction = 1.0
+        self.unprunable = None              # (wrapper, column, node, selectivity)
+
+    @property
+    def columns(self):
+        return self.stats['columns'] if self.stats else {}
+
+    @property
+    def keys(self):
+        if not self.stats:
+            return set()
+        return {k.lower() for k in self.stats.get('partition_keys', []) + self.stats.get('cluster_keys', [])}
+
+    @property
+    def rows(self):
+        if self.derived:
+            return self.derived[0]
+        return self.stats['row_count'] if self.stats else None
+
+    def column(self, name):
+        for column, info in self.columns.items():
+            if column.lower() == name.lower():
+                return column, info
+        return None, None
+
+    def ndv(self, name):
+        _, info = self.column(name)
+        rows = self.rows or 1
+        return min(info['distinct'], rows) if info else rows
+
+    def width(self, columns=None):
+        if self.derived:
+            return self.derived[1]
+        names = self.columns if self.all_columns or columns is None else columns
+        return sum(self.columns[c]['avg_bytes'] for c in names if c in self.columns)
+
+    @property
+    def filtered_rows(self):
+        return (self.rows or 0) * self.selectivity
+
+def at(nodes, i):
+    return nodes[i] if 0 <= i < len(nodes) else None
+
+def is_subquery(node):
+    return (isinstance(node, Group) and node.children
+            and getattr(node.children[0], 'norm', None) in ('SELECT', 'WITH'))
+
+def word(node):
+    if node is None or isinstance(node, Group):
+        return None
+    return node.norm if node.type == 'word' else None
+
+def read_name(nodes, i):
+    """(name parts, index after the name) for a possibly qualified table name
+
+    Parts may be quoted or hyphenated (my-project.dataset.table); the name
+    ends at the first gap between tokens.
+    """
+    parts = ['']
+    end = None
+    while i < len(nodes) and not isinstance(nodes[i], Group):
+        t = nodes[i]
+        if end is not None and t.start != end:
+            break
+        if t.type == 'quoted_ident':
+            parts[-1] += t.value[1:-1]
+        elif t.type in ('word', 'number') or t.value == '-':
+            parts[-1] += t.value
+        elif t.value == '.':
+            parts.append('')
+        else:
+            break
+        end = t.start + len(t.value)
+        i += 1
+    # `project.dataset.table` is a single backtick-quoted token
+    parts = [p for part in parts for p in part.split('.')]
+    return [p for p in parts if p], i
+
+def split_top(nodes, separators):
+    """Split nodes on top-level words or operators in separators"""
+    parts = [[]]
+    for node in nodes:
+        if not isinstance(node, Group) and (node.norm in separators or node.value in separators):
+            parts.append([])
+        else:
+            parts[-1].append(node)
+    return [part for part in parts if part]
+
+def split_clauses(nodes):
+    """Map clause name -> nodes for one query block"""
+    clauses = {}
+    current = None
+    i = 0
+    while i < len(nodes):
+        norm = word(nodes[i])
+        nxt = word(nodes[i + 1]) if i + 1 < len(nodes) else None
+        if norm in ('GROUP', 'ORDER') and nxt == 'BY':
+            current = f"{norm} BY"
+            clauses[current] = []
+            i += 2
+            continue
+        if norm in CLAUSE_WORDS:
+            current = norm
+            clauses.setdefault(current, [])
+        elif current:
+            clauses[current].append(nodes[i])
+        i += 1
+    return clauses
+
+def split_set_operations(nodes):
+    """Query blocks of a UNION/INTERSECT/EXCEPT chain"""
+    blocks = [[]]
+    for node in nodes:
+        norm = word(node)
+        if norm in SET_OPERATORS:
+            blocks.append([])
+        elif norm in ('ALL', 'DISTINCT') and not blocks[-1]:
+            continue
+        else:
+            blocks[-1].append(node)
+    return [block for block in blocks if block]
+
+def column_refs(nodes, refs):
+    """Yield (ref, column, node) for column references among nodes
+
+    Descends into function arguments but not into subqueries, which are
+    analyzed as blocks of their own.
+    """
+    by_alias = {}
+    for ref in refs:
+        by_alias[ref.alias.lower()] = ref
+        by_alias.setdefault(ref.name.lower(), ref)
+
+    i = 0
+    while i < len(nodes):
+        node = nodes[i]
+        if isinstance(node, Group):
+            if not is_subquery(node):
+                yield from column_refs(node.children, refs)
+            i += 1
+            continue
+        if node.type in ('word', 'quoted_ident'):
+            name = node.value.strip('"`')
+            nxt = nodes[i + 1] if i + 1 < len(nodes) else None
+            after = nodes[i + 2] if i + 2 < len(nodes) else None
+            if getattr(nxt, 'value', None) == '.' and after is not None and not isinstance(after, Group):
+                ref = by_alias.get(name.lower())
+                if ref is not None:
+                    if after.value == '*':
+                        yield ref, '*', node
+                    else:
+                        yield ref, after.value.strip('"`'), node
+                i += 3
+                continue
+            if (node.norm not in SQL_WORDS and not isinstance(nxt, Group)):
+                for ref in refs:
+                    column, _ = ref.column(name)
+                    if column:
+                        yield ref, column, node
+                        break
+        i += 1
+
+# Analysis
+
+class Analyzer:
+    """Estimates the cost of each statement against table statistics"""
+
+    def __init__(self, stats):
+        self.stats = stats
+        self.tables = {name.lower(): table for name, table in stats['tables'].items()}
+        self.memory_bytes = stats.get('memory_bytes', DEFAULT_MEMORY_BYTES)
+        self._statement = 0
+        self._costs: List[Cost] = []
+        self._notes: List[str] = []
+        self._ctes: Dict[str, tuple] = {}
+
+    def analyze(self, sql):
+        """Ranked list of Cost findings and notes for every statement"""
+        costs: List[Cost] = []
+        notes: List[str] = []
+        for statement in parse(sql).statements:
+            self._statement = statement.index + 1
+            self._costs = costs
+            self._notes = notes
+            self._ctes = {}
+            self.analyze_query(statement.children)
+        costs.sort(key=lambda c: -c.bytes)
+        return costs, notes
+
+    def report(self, kind, nbytes, node, detail):
+        self._costs.append(Cost(kind, nbytes, self._statement, node.line, node.col, detail))
+
+    def analyze_query(self, nodes):
+        """Analyze WITH ... SELECT ... (set operations included); returns (rows, width)"""
+        i = 0
+        if nodes and word(nodes[0]) == 'WITH':
+            i = 2 if word(at(nodes, 1)) == 'RECURSIVE' else 1
+            while at(nodes, i) is not None:
+                # name [ (columns) ] AS ( query )
+                name = nodes[i]
+                if isinstance(name, Group):
+                    break
+                j = i + 1
+                if isinstance(at(nodes, j), Group) and not is_subquery(nodes[j]):
+                    j += 1
+                if word(at(nodes, j)) != 'AS' or not is_subquery(at(nodes, j + 1)):
+                    break
+                self._ctes[name.value.lower()] = self.analyze_query(nodes[j + 1].children)
+                i = j + 2
+                if getattr(at(nodes, i), 'value', None) != ',':
+                    break
+                i += 1
+
+        # INSERT ... SELECT, CREATE TABLE ... AS SELECT: analyze the query part
+        while i < len(nodes) and word(nodes[i]) != 'SELECT':
+            if is_subquery(nodes[i]):
+                return self.analyze_query(nodes[i].children)
+            i += 1
+        if i == len(nodes):
+            return 0, 0
+
+        rows = 0
+        width = 0
+        for block in split_set_operations(nodes[i:]):
+            block_rows, block_width = self.analyze_block(block)
+            rows += block_rows
+            width = max(width, block_width)
+        return rows, width
+
+    def resolve_source(self, nodes, i):
+        """TableRef starting at nodes[i]; returns (ref, next index)"""
+        node = nodes[i]
+        if is_subquery(node):
+            derived = self.analyze_query(node.children)
+            ref = TableRef('(subquery)', '(subquery)', node, derived=derived)
+            i += 1
+        else:
+            parts, i = read_name(nodes, i)
+            if not parts:
+                return None, i + 1
+            name = parts[-1].lower()
+            if name in self._ctes:
+                ref = TableRef(name, name, node, derived=self._ctes[name])
+            else:
+                ref = TableRef(name, name, node, stats=self.tables.get(name))
+                if ref.stats is None:
+                    self._notes.append(f"Statement {self._statement}: no statistics for table {name}")
+        if i < len(nodes) and word(nodes[i]) == 'AS':
+            i += 1
+        if i < len(nodes) and not isinstance(nodes[i], Group) and nodes[i].type in ('word', 'quoted_ident') \
+                and nodes[i].norm not in NOT_ALIAS:
+            ref.alias = nodes[i].value.strip('"`')
+            i += 1
+        return ref, i
+
+    def parse_from(self, nodes):
+        """[(ref, join_kind, condition nodes or None)] for a FROM clause"""
+        sources = []
+        i = 0
+        kind = 'FROM'
+        while i < len(nodes):
+            norm = word(nodes[i])
+            if getattr(nodes[i], 'value', None) == ',':
+                kind = ','
+                i += 1
+                continue
+            if norm in JOIN_WORDS:
+                words = []
+                while i < len(nodes) and word(nodes[i]) in JOIN_WORDS:
+                    words.append(word(nodes[i]))
+                    i += 1
+                kind = ' '.join(words)
+                continue
+            ref, i = self.resolve_source(nodes, i)
+            condition = None
+            if i < len(nodes) and word(nodes[i]) in ('ON', 'USING'):
+                start = i
+                i += 1
+                while i < len(nodes) and word(nodes[i]) not in JOIN_WORDS and getattr(nodes[i], 'value', None) != ',':
+                    i += 1
+                condition = nodes[start:i]
+            if ref is not None:
+                sources.append((ref, kind, condition))
+            # Skip anything else up to the next join (table functions, sampling clauses)
+            while i < len(nodes) and word(nodes[i]) not in JOIN_WORDS and getattr(nodes[i], 'value', None) != ',':
+                i += 1
+        return sources
+
+    def analyze_block(self, nodes):
+        """Analyze one SELECT block; returns (estimated output rows, row width)"""
+        clauses = split_clauses(nodes)
+        sources = self.parse_from(clauses.get('FROM', []))
+        refs = [ref for ref, _, _ in sources]
+
+        # Subqueries anywhere else in the block (IN (...), EXISTS (...), scalar)
+        for name, clause in clauses.items():
+            if name != 'FROM':
+                self._analyze_nested(clause)
+        for _, _, condition in sources:
+            if condition:
+                self._analyze_nested(condition)
+
+        select = clauses.get('SELECT', [])
+        for i, node in enumerate(select):
+            if getattr(node, 'value', None) == '*' and (
+                    i == 0 or getattr(select[i - 1], 'value', None) == ','
+                    or word(select[i - 1]) == 'DISTINCT'):
+                for ref in refs:
+                    ref.all_columns = True
+        for clause in clauses.values():
+            for ref, column, _ in column_refs(clause, refs):
+                if column == '*':
+                    ref.all_columns = True
+                else:
+                    ref.used_columns.add(column)
+        for _, _, condition in sources:
+            for ref, column, _ in column_refs(condition or [], refs):
+                ref.used_columns.add(column)
+
+        join_pairs = self.apply_filters(clauses.get('WHERE', []), refs)
+
+        for ref in refs:
+            self.report_scan(ref)
+
+        rows, width = self.estimate_joins(sources, join_pairs)
+
+        select_width = width
+        group_by = clauses.get('GROUP BY')
+        if group_by:
+            rows = self.estimate_aggregate(group_by, refs, rows, 'GROUP BY', group_by[0])
+        elif select and word(select[0]) == 'DISTINCT':
+            rows = self.estimate_aggregate(select[1:], refs, rows, 'DISTINCT', select[0])
+        elif select and self._only_aggregates(select):
+            rows = 1
+
+        order_by = clauses.get('ORDER BY')
+        if order_by and 'LIMIT' not in clauses and 'FETCH' not in clauses:
+            self.check_spill('sort', rows * select_width, order_by[0],
+                             f"ORDER BY sorts ~{human_rows(rows)} rows without LIMIT")
+        over = [n for n in select if word(n) == 'OVER']
+        if over:
+            self.check_spill('window', rows * select_width, over[0],
+                             f"window function sorts ~{human_rows(rows)} rows per partition set")
+
+        if 'LIMIT' in clauses:
+            limit = next((n for n in clauses['LIMIT'] if getattr(n, 'type', None) == 'number'), None)
+            if limit is not None:
+                rows = min(rows, float(limit.value))
+        return rows, select_width
+
+    def _analyze_nested(self, nodes):
+        for node in nodes:
+            if isinstance(node, Group):
+                if is_subquery(node):
+                    self.analyze_query(node.children)
+                else:
+                    self._analyze_nested(node.children)
+
+    @staticmethod
+    def _only_aggregates(select):
+        functions = {'COUNT', 'SUM', 'AVG', 'MIN', 'MAX'}
+        items = split_top(select, {','})
+        return all(item and word(item[0]) in functions for item in items)
+
+    def apply_filters(self, where, refs):
+        """Set per-table selectivity and pruning from WHERE conjuncts
+
+        Returns column-equality pairs that act as join conditions.
+        """
+        join_pairs = []
+        if not where or not refs:
+            return join_pairs
+        if any(word(n) == 'OR' for n in where):
+            # Disjunctions are not estimated; assume no reduction
+            return join_pairs
+
+        conjuncts = []
+        current = []
+        between = False
+        for node in where:
+            if word(node) == 'BETWEEN':
+                between = True
+            if word(node) == 'AND' and not between:
+                conjuncts.append(current)
+                current = []
+                continue
+            if word(node) == 'AND':
+                between = False
+            current.append(node)
+        conjuncts.append(current)
+
+        for conjunct in conjuncts:
+            pair = self.apply_predicate(conjunct, refs)
+            if pair:
+                join_pairs.append(pair)
+        return join_pairs
+
+    def apply_predicate(self, conjunct, refs):
+        if not conjunct:
+            return None
+        found = list(column_refs(conjunct, refs))
+        if not found:
+            return None
+
+        # col = col between two tables is a join condition
+        op_index = next((i for i, n in enumerate(conjunct)
+                         if not isinstance(n, Group) and n.value in COMPARISON_OPS), None)
+        if len(found) >= 2 and found[0][0] is not found[1][0] and op_index is not None \
+                and conjunct[op_index].value == '=':
+            return found[0][:2], found[1][:2]
+
+        ref, column, node = found[0]
+        wrapper = None
+        first = conjunct[0]
+        if isinstance(conjunct[1] if len(conjunct) > 1 else None, Group) and word(first) and first is not node:
+            wrapper = f"{first.value}()"
+        elif any(getattr(n, 'value', None) == '::' for n in conjunct[:op_index or len(conjunct)]):
+            wrapper = "a :: cast"
+
+        norms = [word(n) for n in conjunct]
+        if op_index is not None and conjunct[op_index].value == '=':
+            selectivity = 1 / max(ref.ndv(column), 1)
+        elif op_index is not None and conjunct[op_index].value in RANGE_OPS:
+            selectivity = RANGE_SELECTIVITY
+        elif 'BETWEEN' in norms:
+            selectivity = BETWEEN_SELECTIVITY
+        elif 'IN' in norms:
+            values = next((n for n in conjunct if isinstance(n, Group)), None)
+            count = len(split_top(values.children, {','})) if values and not is_subquery(values) else 1
+            selectivity = min(1.0, count / max(ref.ndv(column), 1))
+        elif 'LIKE' in norms or 'ILIKE' in norms:
+            selectivity = LIKE_SELECTIVITY
+        else:
+            return None
+
+        ref.selectivity *= selectivity
+        if column.lower() in ref.keys:
+            if wrapper:
+                ref.unprunable = (wrapper, column, node, selectivity)
+            else:
+                ref.prune_fraction *= selectivity
+        return None
+
+    def report_scan(self, ref):
+        if ref.stats is None:
+            return
+        rows = ref.rows
+        columns = set(ref.columns) if ref.all_columns else ref.used_columns
+        full_bytes = rows * ref.width(columns)
+        scanned = full_bytes * ref.prune_fraction
+        detail = (f"{ref.name}: {len(columns)} of {len(ref.columns)} columns, "
+                  f"{human_rows(rows * ref.prune_fraction)} of {human_rows(rows)} rows")
+        if ref.all_columns:
+            detail += "; SELECT * reads every column"
+        if not columns:
+            detail += "; no columns read, can be answered from metadata"
+        elif ref.keys and ref.prune_fraction == 1.0 and ref.unprunable is None:
+            detail += f"; no filter on {'/'.join(sorted(ref.keys))}, full scan"
+        self.report('scan', scanned, ref.node, detail)
+
+        if ref.unprunable is not None:
+            wrapper, column, node, selectivity = ref.unprunable
+            wasted = scanned * (1 - selectivity)
+            self.report('no-pruning', wasted, node,
+                        f"{wrapper} around {ref.name}.{column} prevents partition pruning; "
+                        f"filtering the raw column would skip ~{(1 - selectivity) * 100:.0f}% of the scan")
+
+    def estimate_joins(self, sources, join_pairs):
+        """Fold joins left to right; returns (rows, width)"""
+        if not sources:
+            return 1, 0
+        first = sources[0][0]
+        rows = first.filtered_rows if first.rows is not None else 0
+        width = first.width(first.used_columns) if first.stats or first.derived else 0
+        joined = [first]
+
+        for ref, kind, condition in sources[1:]:
+            right_rows = ref.filtered_rows if ref.rows is not None else 0
+            right_width = ref.width(ref.used_columns) if ref.stats or ref.derived else 0
+            pair = self._join_condition(condition, joined, ref, join_pairs)
+            node = condition[0] if condition else ref.node
+
+            if pair is None and 'NATURAL' not in kind:
+                out = rows * right_rows
+                if rows and right_rows:
+                    self.report('cartesian', out * max(width + right_width, MIN_ROW_BYTES), node,
+                                f"{kind} {ref.name} has no join condition: "
+                                f"{human_rows(rows)} x {human_rows(right_rows)} rows")
+            else:
+                if pair is None:
+                    ndv = max(rows, right_rows, 1)
+                else:
+                    (left_ref, left_column), (right_ref, right_column) = pair
+                    ndv = max(left_ref.ndv(left_column), right_ref.ndv(right_column), 1)
+                out = rows * right_rows / ndv
+                if 'LEFT' in kind or 'FULL' in kind:
+                    out = max(out, rows)
+                fan_out = out / max(rows, right_rows, 1)
+                if fan_out > FAN_OUT_THRESHOLD:
+                    self.report('fan-out', out * max(width + right_width, MIN_ROW_BYTES), node,
+                                f"join to {ref.name} multiplies rows x{fan_out:.1f} "
+                                f"({human_rows(out)} rows): join keys are not unique on either side")
+
+            build_rows, build_width = min((rows, width), (right_rows, right_width))
+            self.check_spill('join', build_rows * build_width, node,
+                             f"hash join builds on ~{human_rows(build_rows)} rows of {ref.name}")
+            rows = out
+            width += right_width
+            joined.append(ref)
+        return rows, width
+
+    @staticmethod
+    def _join_condition(condition, joined, ref, join_pairs):
+        """The (left, right) column pair joining ref to the tables before it"""
+        refs = joined + [ref]
+        if condition and word(condition[0]) == 'USING':
+            group = next((n for n in condition if isinstance(n, Group)), None)
+            if group is not None:
+                column = next((n.value for n in group.children if getattr(n, 'type', None) == 'word'), None)
+                if column:
+                    return (joined[-1], column), (ref, column)
+        if condition:
+            for conjunct in split_top(condition[1:], {'AND'}):
+                found = list(column_refs(conjunct, refs))
+                if len(found) >= 2 and found[0][0] is not found[1][0]:
+                    return found[0][:2], found[1][:2]
+        for left, right in join_pairs:
+            if right[0] is ref and left[0] in joined:
+                return left, right
+            if left[0] is ref and right[0] in joined:
+                return right, left
+        return None
+
+    def estimate_aggregate(self, nodes, refs, rows, label, node):
+        """Estimated group count for grouping by nodes; node locates any finding"""
+        groups = 1
+        resolved = False
+        for ref, column, _ in column_refs(nodes, refs):
+            if column != '*':
+                groups *= ref.ndv(column)
+                resolved = True
+        if not resolved:
+            groups = rows
+        groups = min(groups, rows)
+        keys_width = sum(ref.width(ref.used_columns) for ref in refs if ref.stats) or DEFAULT_COLUMN_BYTES
+        self.check_spill('aggregate', groups * (keys_width + AGGREGATE_STATE_BYTES), node,
+                         f"{label} keeps ~{human_rows(groups)} groups in a hash table")
+        return groups
+
+    def check_spill(self, operation, nbytes, node, detail):
+        if nbytes > self.memory_bytes:
+            self.report('spill', nbytes - self.memory_bytes, node,
+                        f"{detail} (~{human_bytes(nbytes)} vs {human_bytes(self.memory_bytes)} memory); "
+                        f"expect the {operation} to spill to disk")
+
+def human_bytes(n):
+    for unit in ('B', 'KB', 'MB', 'GB', 'TB'):
+        if abs(n) < 1024 or unit == 'TB':
+            return f"{n:.0f} {unit}" if unit == 'B' else f"{n:.1f} {unit}"
+        n /= 1024
+
+def human_rows(n):
+    if n >= 1e9:
+        return f"{n / 1e9:.1f}B"
+    if n >= 1e6:
+        return f"{n / 1e6:.1f}M"
+    if n >= 1e3:
+        return f"{n / 1e3:.1f}K"
+    return f"{math.ceil(n)}"
+
+def print_report(costs, notes):
+    print("\nCOST REPORT (most expensive first)")
+    print("=" * 80)
+    if not costs:
+        print("\nNo tables with statistics were referenced.")
+    for rank, cost in enumerate(costs, 1):
+        print(f"\n{rank:>3}. [{cost.kind.upper()}] {human_bytes(cost.bytes)}  "
+              f"(statement {cost.statement}, line {cost.line}, col {cost.col})")
+        print(f"     {cost.detail}")
+    if notes:
+        print("\nNOTES:")
+        for note in notes:
+            print(f"  - {note}")
+    print("\n" + "=" * 80)
+
+def main():
+    parser = argparse.ArgumentParser(description="Estimate query cost against table statistics")
+    parser.add_argument("--query", help="SQL query to analyze")
+    parser.add_argument("--file", help="File containing SQL")
+    parser.add_argument("--stats", help="Statistics JSON file (default: derived from assets/sample-datasets)")
+    parser.add_argument("--scale", type=float,
+                       help="Multiply row counts, e.g. 5000000 to model production volumes")
+    parser.add_argument("--memory", type=float,
+                       help="Memory available to one operator in GB (default from stats, else 8)")
+    parser.add_argument("--write-stats", metavar="PATH",
+                       help="Write the statistics in use to PATH and exit")
+    parser.add_argument("--format", default="text", choices=["text", "json"], help="Report format")
+
+    args = parser.parse_args()
+
+    stats = load_stats(args.stats, args.scale)
+    if args.memory:
+        stats['memory_bytes'] = int(args.memory * 1024 ** 3)
+
+    if args.write_stats:
+        with open(args.write_stats, 'w', encoding='utf-8') as f:
+            json.dump(stats, f, indent=2)
+        print(f"Statistics for {len(stats['tables'])} tables written to: {args.write_stats}")
+        return 0
+
+    if not args.query and not args.file:
+        parser.error("Must provide either --query or --file")
+
+    if args.file:
+        with open(args.file, 'r', encoding='utf-8') as f:
+            sql = f.read()
+    else:
+        sql = args.query
+
+    costs, notes = Analyzer(stats).analyze(sql)
+
+    if args.format == 'json':
+        json.dump({'costs': [c._asdict() for c in costs], 'notes': notes}, sys.stdout, indent=2)
+        print()
+    else:
+        print_report(costs, notes)
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Incremental CDC pipeline simulator.
+
+Turns order_events.json (or generate_data.py output) into a change log,
+like a log-based CDC feed: one record per change with a log sequence
+number (LSN), the operation and the full row image after the change,
+ordered by commit time. Delivery is at-least-once, so some records are
+delivered again later, after newer changes to the same order.
+
+The pipeline consumes the log in micro-batches:
+
+- the cdc_watermarks table holds the last applied LSN and updated_at, so
+  each run reads only what is new (the exercise's watermark table)
+- each batch is deduplicated with a hash map keyed by order_id that keeps
+  the latest updated_at, the streaming equivalent of ROW_NUMBER() = 1
+- the batch is merged (upserted) into orders_cdc, skipping images older
+  than the row already there, so redelivered records cannot roll it back
+- the merge and the watermark advance commit in one transaction, so a run
+  killed at any point resumes from the last batch without reprocessing
+
+It reports throughput (events/s) and end-to-end lag, from the moment a
+change is available in the log to the commit that applies it. --rate
+replays the log at a fixed production rate to show lag under load, and
+--crash-after kills the run mid-batch to demonstrate the restart.
+"""
+
+import argparse
+import heapq
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple
+
+from generate_data import FIELDS
+from json_stream import iter_records
+from sample_data import DATASET_DIR, iter_rows, table_files
+
+KEY = 'order_id'
+EVENT_FIELDS = [field for field in FIELDS['order_events'] if field not in ('event_type', 'event_timestamp')]
+COLUMNS = [KEY, 'status'] + EVENT_FIELDS[1:] + ['placed_at', 'updated_at']
+TARGET = 'orders_cdc'
+
+SEGMENT_RECORDS = 100000
+DUPLICATE_RATE = 0.02
+REDELIVERY_WINDOW = 1000       # a redelivered record arrives up to this many records later
+OPEN_ORDERS = 100000           # row images kept while folding events (source is grouped by order)
+BATCH_SIZE = 5000
+
+# Default state location: stable across runs so a killed run can resume,
+# but outside the working directory so runs never write into a checkout
+WORK_DIR = Path(tempfile.gettempdir()) / "data-engineering-teacher-cdc"
+LOG_DIR = WORK_DIR / "cdc-log"
+TARGET_PATH = WORK_DIR / "cdc_target.sqlite"
+
+class Stats(NamedTuple):
+    events: int
+    batches: int
+    merged: int        # distinct orders upserted after in-batch dedup
+    collapsed: int     # records dropped by in-batch dedup
+    stale: int         # images older than the target row, skipped by the merge
+    seconds: float
+    lags: List[float]  # seconds from availability to commit, per event
+
+# Change log
+
+def fold_events(events) -> Iterator[Dict]:
+    """Change records from order events: each event updates the order's row image"""
+    images = OrderedDict()
+    for event in events:
+        order_id = event[KEY]
+        image = images.pop(order_id, None)
+        op = 'u' if image else 'c'
+        image = dict(image) if image else {column: None for column in COLUMNS}
+        for field in EVENT_FIELDS:
+            value = event.get(field)
+            if value is not None and value != '':   # CSV sources have '' for fields an event lacks
+                image[field] = float(value) if field == 'order_amount' else value
+        image['status'] = event['event_type']
+        image['updated_at'] = event['event_timestamp']
+        if event['event_type'] == 'ORDER_PLACED':
+            image['placed_at'] = event['event_timestamp']
+        images[order_id] = image
+        if len(images) > OPEN_ORDERS:
+            images.popitem(last=False)
+        yield {'op': op, 'key': order_id, 'updated_at': image['updated_at'], 'after': image}
+
+def write_log(changes, log_dir, duplicate_rate=DUPLICATE_RATE, seed=42,
+              segment_records=SEGMENT_RECORDS) -> int:
+    """Write changes in commit-time order as NDJSON segments with LSNs; returns records written
+
+    Sorting goes through a temporary SQLite table, which spills to disk for
+    logs larger than memory. A share of records is delivered a second time
+    up to REDELIVERY_WINDOW records later, with a new LSN.
+    """
+    log_dir = Path(log_dir)
+    log_dir.mkdir(parents=True, exist_ok=True)
+    for old in log_dir.glob('segment-*.jsonl'):
+        old.unlink()
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        sort = sqlite3.connect(Path(tmp) / 'sort.sqlite')
+        sort.execute("CREATE TABLE changes (updated_at TEXT, seq INTEGER, record TEXT)")
+        sort.executemany("INSERT INTO changes VALUES (?, ?, ?)",
+                         ((change['updated_at'], seq, json.dumps(change)) for seq, change in enumerate(changes)))
+        ordered = (record for record, in sort.execute("SELECT record FROM changes ORDER BY updated_at, seq"))
+
+        lsn = 0
+        out = None
+        redeliveries = []  # heap of (due position, tiebreak, record)
+
+        def emit(record):
+            nonlocal lsn, out
+            if lsn % segment_records == 0:
+                if out:
+                    out.close()
+                out = open(log_dir / f"segment-{lsn:012d}.jsonl", 'w', encoding='utf-8')
+            out.write(f'{{"lsn": {lsn}, {record[1:]}\n')  # record is a JSON object
+            lsn += 1
+
+        for position, record in enumerate(ordered):
+            while redeliveries and redeliveries[0][0] <= position:
+                emit(heapq.heappop(redeliveries)[2])
+            emit(record)
+            if rng.random() < duplicate_rate:
+                heapq.heappush(redeliveries, (position + rng.randint(1, REDELIVERY_WINDOW), position, record))
+        while redeliveries:
+            emit(heapq.heappop(redeliveries)[2])
+        if out:
+            out.close()
+        sort.close()
+    return lsn
+
+def read_log(log_dir, start_lsn=0) -> Iterator[Dict]:
+    """Log records from start_lsn on, opening only the segments that contain them"""
+    segments = sorted(Path(log_dir).glob('segment-*.jsonl'))
+    firsts = [int(path.stem.split('-')[1]) for path in segments]
+    for i, path in enumerate(segments):
+        if i + 1 < len(segments) and firsts[i + 1] <= start_lsn:
+            continue
+        for record in iter_records(path):
+            if record['lsn'] >= start_lsn:
+                yield record
+
+# Target and watermarks
+
+def create_target(conn):
+    columns = ',\n            '.join(f"{column} {'REAL' if column == 'order_amount' else 'TEXT'}"
+                                   + (" PRIMARY KEY" if column == KEY else '') for column in COLUMNS)
+    conn.executescript(f"""
+        CREATE TABLE IF NOT EXISTS {TARGET} (
+            {columns},
+            _lsn INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS cdc_watermarks (
+            table_name TEXT PRIMARY KEY,
+            last_lsn INTEGER NOT NULL,
+            last_processed_timestamp TEXT,
+            events_applied INTEGER NOT NULL,
+            last_updated TEXT
+        );
+    """)
+
+def read_watermark(conn):
+    """(last applied LSN, last processed updated_at, events applied); LSN -1 before the first run"""
+    row = conn.execute("SELECT last_lsn, last_processed_timestamp, events_applied FROM cdc_watermarks "
+                       "WHERE table_name = ?", (TARGET,)).fetchone()
+    return row or (-1, None, 0)
+
+def dedup(records) -> Dict[str, Dict]:
+    """{key: latest record}: later updated_at wins, and the later LSN on a tie"""
+    latest = {}
+    for record in records:
+        current = latest.get(record['key'])
+        if current is None or record['updated_at'] >= current['updated_at']:
+            latest[record['key']] = record
+    return latest
+
+def merge(conn, latest) -> int:
+    """Upsert row images into the target, keeping rows that are newer; returns rows written"""
+    columns = ', '.join(COLUMNS)
+    assignments = ', '.join(f"{column} = excluded.{column}" for column in COLUMNS[1:])
+    cursor = conn.executemany(
+        f"INSERT INTO {TARGET} ({columns}, _lsn) VALUES ({', '.join('?' * (len(COLUMNS) + 1))}) "
+        f"ON CONFLICT ({KEY}) DO UPDATE SET {assignments}, _lsn = excluded._lsn "
+        f"WHERE excluded.updated_at >= {TARGET}.updated_at",
+        ([record['after'][column] for column in COLUMNS] + [record['lsn']] for record in latest.values()))
+    return cursor.rowcount
+
+def micro_batches(records, batch_size, rate, started) -> Iterator[List]:
+    """[(record, available_at)] batches; with a production rate, a partial batch is
+    flushed rather than waiting for records that do not exist yet"""
+    batch = []
+    for i, record in enumerate(records):
+        available = started + i / rate if rate else started
+        wait = available - time.perf_counter()
+        if wait > 0:
+            if batch:
+                yield batch
+                batch = []
+            time.sleep(wait)
+        batch.append((record, available))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def run(conn, log_dir, batch_size=BATCH_SIZE, rate=None, crash_after=None, max_events=None) -> Stats:
+    """Apply the log from the watermark on; each batch commits with its watermark"""
+    last_lsn, _, applied = read_watermark(conn)
+    records = read_log(log_dir, last_lsn + 1)
+    if max_events:
+        records = (record for record, _ in zip(records, range(max_events)))
+    started = time.perf_counter()
+    events = batches = merged = collapsed = stale = 0
+    lags = []
+    for batch in micro_batches(records, batch_size, rate, started):
+        latest = dedup(record for record, _ in batch)
+        with conn:
+            written = merge(conn, latest)
+            last = batch[-1][0]
+            high = max(record['updated_at'] for record, _ in batch)
+            conn.execute(
+                "INSERT INTO cdc_watermarks VALUES (?, ?, ?, ?, ?) ON CONFLICT (table_name) DO UPDATE SET "
+                "last_lsn = excluded.last_lsn, last_updated = excluded.last_updated, "
+                "events_applied = excluded.events_applied, "
+                "last_processed_timestamp = MAX(COALESCE(last_processed_timestamp, ''), "
+                "excluded.last_processed_timestamp)",
+                (TARGET, last['lsn'], high, applied + events + len(batch), datetime.now().isoformat()))
+            if crash_after is not None and events + len(batch) >= crash_after:
+                print(f"Simulated crash after merging LSN {batch[0][0]['lsn']}-{last['lsn']}, before commit",
+                      file=sys.stderr)
+                sys.stdout.flush()
+                os._exit(75)
+        committed = time.perf_counter()
+        lags.extend(committed - available for _, available in batch)
+        events += len(batch)
+        batches += 1
+        merged += len(latest)
+        collapsed += len(batch) - len(latest)
+        stale += len(latest) - written
+    return Stats(events, batches, merged, collapsed, stale, time.perf_counter() - started, lags)
+
+def verify(conn, log_dir) -> int:
+    """Replay the whole log one record at a time; returns rows where the target differs"""
+    expected = {}
+    for record in read_log(log_dir):
+        current = expected.get(record['key'])
+        if current is None or record['updated_at'] >= current['updated_at']:
+            expected[record['key']] = record['after']
+    actual = {row[0]: row for row in conn.execute(f"SELECT {', '.join(COLUMNS)} FROM {TARGET}")}
+    mismatches = len(set(actual) - set(expected))
+    for key, image in expected.items():
+        if actual.get(key) != tuple(image[column] for column in COLUMNS):
+            mismatches += 1
+    return mismatches
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)] if ordered else 0.0
+
+def source_events(source) -> Iterator[Dict]:
+    files = table_files(source)
+    files = files.get('order_events') or next(iter(files.values()))
+    for path in files:
+        yield from iter_rows(path)
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run an incremental CDC pipeline with watermarks and checkpointed restart")
+    parser.add_argument("--source", default=str(DATASET_DIR / "order_events.json"),
+                       help="Order events to derive the change log from (JSON/NDJSON or generate_data.py "
+                            "output)")
+    parser.add_argument("--log", default=str(LOG_DIR), help=f"Change log directory (default: {LOG_DIR})")
+    parser.add_argument("--target", default=str(TARGET_PATH),
+                       help=f"SQLite database with the target table and watermarks (default: {TARGET_PATH})")
+    parser.add_argument("--regenerate", action="store_true", help="Rebuild the change log even if it exists")
+    parser.add_argument("--reset", action="store_true", help="Drop the target table and watermark first")
+    parser.add_argument("--duplicate-rate", type=float, default=DUPLICATE_RATE,
+                       help="Share of records delivered twice (default: 0.02)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for redeliveries (default: 42)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Records per micro-batch")
+    parser.add_argument("--rate", type=float, help="Replay the log at this many events/s (default: all at once)")
+    parser.add_argument("--max-events", type=int, help="Stop after this many events")
+    parser.add_argument("--crash-after", type=int, help="Kill the run mid-batch after this many events")
+    parser.add_argument("--verify", action="store_true", help="Check the target against a full replay of the log")
+
+    args = parser.parse_args()
+
+    if args.batch_size < 1 or (args.rate is not None and args.rate <= 0):
+        print("ERROR: --batch-size and --rate must be positive")
+        return 1
+
+    print("=" * 80)
+    print(f"CDC pipeline: {args.log}/ -> {args.target} ({TARGET})")
+    print("=" * 80)
+    try:
+        if args.regenerate or not any(Path(args.log).glob('segment-*.jsonl')):
+            started = time.perf_counter()
+            written = write_log(fold_events(source_events(args.source)), args.log, args.duplicate_rate, args.seed)
+            print(f"INFO: Wrote change log: {written:,} records from {args.source} "
+                  f"in {time.perf_counter() - started:.1f}s")
+
+        Path(args.target).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(args.target)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if args.reset:
+            conn.executescript(f"DROP TABLE IF EXISTS {TARGET}; DROP TABLE IF EXISTS cdc_watermarks;")
+        create_target(conn)
+        last_lsn, last_timestamp, applied = read_watermark(conn)
+        if last_lsn < 0:
+            print("Starting from the beginning of the log")
+        else:
+            print(f"Resuming after LSN {last_lsn:,} (updated_at {last_timestamp}, {applied:,} events applied)")
+        stats = run(conn, args.log, args.batch_size, args.rate, args.crash_after, args.max_events)
+    except (OSError, ValueError, KeyError, sqlite3.Error) as e:
+        print(f"ERROR: {e}")
+        return 1
+
+    last_lsn, last_timestamp, applied = read_watermark(conn)
+    print(f"\n{stats.events:,} events in {stats.batches:,} batches, {stats.seconds:.2f}s "
+          f"({stats.events / max(stats.seconds, 1e-9):,.0f} events/s)")
+    print(f"Merged {stats.merged:,} order images: {stats.collapsed:,} duplicates collapsed in-batch, "
+          f"{stats.stale:,} stale images skipped")
+    if stats.lags:
+        print(f"End-to-end lag: p50 {percentile(stats.lags, 0.5) * 1000:,.0f} ms, "
+              f"p95 {percentile(stats.lags, 0.95) * 1000:,.0f} ms, max {max(stats.lags) * 1000:,.0f} ms")
+    print(f"Watermark: LSN {last_lsn:,}, updated_at {last_timestamp}, {applied:,} events applied")
+    remaining = sum(1 for _ in read_log(args.log, last_lsn + 1))
+    print(f"Backlog: {remaining:,} events not yet applied")
+    status = 0
+    if args.verify and remaining:
+        print(f"INFO: Verification skipped, {remaining:,} events not yet applied")
+    elif args.verify:
+        mismatches = verify(conn, args.log)
+        if mismatches:
+            print(f"ERROR: {mismatches:,} target rows differ from a full replay of the log")
+            status = 1
+        else:
+            print("Verified: target matches a full replay of the log")
+    conn.close()
+    print("=" * 80)
+    return status
+
+if __name__ == "__main__":
+    exit(main())
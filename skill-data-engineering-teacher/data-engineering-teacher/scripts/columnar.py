@@ -0,0 +1,531 @@
+#!/usr/bin/env python3
+"""
+Columnar copies of the sample datasets, loaded by memory-mapping.
+
+Converts the CSV/JSON datasets (or generate_data.py output) into typed,
+column-per-file storage: integers, reals, booleans, dates and timestamps
+as fixed-width arrays, low-cardinality strings dictionary-encoded as int32
+codes, and other text as Arrow-style offsets plus UTF-8 data. Opening a
+table memory-maps the column files and exposes them as memoryviews, so
+nothing is parsed or copied until a value is read.
+
+With pyarrow installed the same typed schema is also written as Parquet
+and Arrow IPC files; the IPC file is loaded zero-copy through a memory map.
+
+Conversion streams in batches, so scaled datasets are converted in
+constant memory apart from the dictionaries of categorical columns.
+"""
+
+import argparse
+import json
+import math
+import mmap
+import os
+import re
+import sys
+import time
+from array import array
+from datetime import date, datetime, timedelta, timezone
+from itertools import islice
+from pathlib import Path
+from typing import Dict, List
+
+from sample_data import DATASET_DIR, column_names, infer_type, iter_rows, table_files
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+SCHEMA_FILE = 'schema.json'
+BATCH_ROWS = 65536
+INFER_ROWS = 100000
+
+# Strings become dictionary-encoded when they repeat this much in the inferred sample
+DICTIONARY_MAX_RATIO = 0.5
+DICTIONARY_MAX_VALUES = 65536
+
+DATE_VALUE = re.compile(r"\d{4}-\d{2}-\d{2}")
+TIMESTAMP_VALUE = re.compile(r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(\.\d+)?(Z|[+-]\d{2}:\d{2})?")
+BOOLEAN_VALUES = {'true': 1, 'false': 0}
+
+EPOCH = date(1970, 1, 1)
+
+# Column type -> (array typecode, null sentinel)
+STORAGE = {
+    'INTEGER': ('q', -2 ** 63),
+    'REAL': ('d', math.nan),
+    'BOOLEAN': ('b', -1),
+    'DATE': ('i', -2 ** 31),       # days since 1970-01-01
+    'TIMESTAMP': ('q', -2 ** 63),  # seconds since 1970-01-01 UTC
+    'DICTIONARY': ('i', -1),       # index into the column's dictionary
+    'TEXT': ('q', None),           # end offsets into <column>.data; empty text reads as null
+}
+
+def column_type(values):
+    """Storage type for a column from its non-empty sample values"""
+    if values and all(isinstance(v, str) and v.lower() in BOOLEAN_VALUES for v in values):
+        return 'BOOLEAN'
+    sql_type = infer_type(values)
+    if sql_type != 'TEXT' or any(isinstance(v, (dict, list)) for v in values):
+        return sql_type
+    if all(DATE_VALUE.fullmatch(v) for v in values):
+        return 'DATE'
+    if all(TIMESTAMP_VALUE.fullmatch(v) for v in values):
+        return 'TIMESTAMP'
+    distinct = len(set(values))
+    if distinct <= DICTIONARY_MAX_VALUES and distinct <= len(values) * DICTIONARY_MAX_RATIO:
+        return 'DICTIONARY'
+    return 'TEXT'
+
+def infer_columns(rows) -> Dict[str, str]:
+    """{column: storage type} for sample rows"""
+    return {
+        name: column_type([row[name] for row in rows if row.get(name) not in (None, '')])
+        for name in column_names(rows)
+    }
+
+def parse_timestamp(value):
+    moment = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment
+
+def encode(value, column_type):
+    """Stored number for a non-null value of a fixed-width column"""
+    if column_type == 'INTEGER':
+        return int(value)
+    if column_type == 'REAL':
+        return float(value)
+    if column_type == 'BOOLEAN':
+        return BOOLEAN_VALUES[value.lower()] if isinstance(value, str) else int(value)
+    if column_type == 'DATE':
+        return (date.fromisoformat(str(value)[:10]) - EPOCH).days
+    return int(parse_timestamp(value).timestamp())
+
+def text_value(value):
+    return json.dumps(value) if isinstance(value, (dict, list)) else str(value)
+
+def batches(rows, size=BATCH_ROWS):
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+# Column store
+
+class ColumnWriter:
+    """Appends batches of rows to one file per column"""
+
+    def __init__(self, directory, columns: Dict[str, str]):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.columns = columns
+        self.rows = 0
+        self.files = {}
+        self.dictionaries: Dict[str, Dict[str, int]] = {}
+        self.text_offsets: Dict[str, int] = {}
+        for name, column_type in columns.items():
+            self.files[name] = open(self.directory / f"{name}.bin", 'wb')
+            if column_type == 'DICTIONARY':
+                self.dictionaries[name] = {}
+            elif column_type == 'TEXT':
+                self.files[name + '.data'] = open(self.directory / f"{name}.data", 'wb')
+                self.text_offsets[name] = 0
+
+    def write_batch(self, rows):
+        for name, column_type in self.columns.items():
+            typecode, null = STORAGE[column_type]
+            values = array(typecode)
+            try:
+                if column_type == 'DICTIONARY':
+                    codes = self.dictionaries[name]
+                    for row in rows:
+                        value = row.get(name)
+                        if value is None or value == '':
+                            values.append(null)
+                        else:
+                            values.append(codes.setdefault(text_value(value), len(codes)))
+                elif column_type == 'TEXT':
+                    data = bytearray()
+                    offset = self.text_offsets[name]
+                    for row in rows:
+                        value = row.get(name)
+                        if value is not None:
+                            data += text_value(value).encode('utf-8')
+                        values.append(offset + len(data))
+                    self.text_offsets[name] = offset + len(data)
+                    self.files[name + '.data'].write(data)
+                else:
+                    for row in rows:
+                        value = row.get(name)
+                        values.append(null if value is None or value == '' else encode(value, column_type))
+            except (ValueError, KeyError, TypeError) as e:
+                raise ValueError(f"Column {name}: value does not fit inferred type {column_type} ({e}); "
+                                 f"raise --infer-rows") from None
+            values.tofile(self.files[name])
+        self.rows += len(rows)
+
+    def close(self):
+        for f in self.files.values():
+            f.close()
+        schema = {
+            'rows': self.rows,
+            'columns': [
+                {'name': name, 'type': column_type, 'typecode': STORAGE[column_type][0],
+                 **({'dictionary': list(self.dictionaries[name])} if column_type == 'DICTIONARY' else {})}
+                for name, column_type in self.columns.items()
+            ]
+        }
+        with open(self.directory / SCHEMA_FILE, 'w', encoding='utf-8') as f:
+            json.dump(schema, f)
+
+def _map(path, typecode):
+    """Zero-copy typed view of a file (empty files give an empty view)"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None, memoryview(array(typecode))
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return mapped, memoryview(mapped).cast(typecode)
+
+class Column:
+    """One memory-mapped column; `values` is the raw stored array"""
+
+    def __init__(self, directory, spec):
+        self.name = spec['name']
+        self.type = spec['type']
+        self.dictionary = spec.get('dictionary')
+        self.null = STORAGE[self.type][1]
+        self._maps = []
+        mapped, self.values = _map(Path(directory) / f"{self.name}.bin", spec['typecode'])
+        self._maps.append(mapped)
+        self.data = None
+        if self.type == 'TEXT':
+            mapped, self.data = _map(Path(directory) / f"{self.name}.data", 'B')
+            self._maps.append(mapped)
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, i):
+        """Decoded value of row i, or None"""
+        raw = self.values[i]
+        if self.type == 'TEXT':
+            start = self.values[i - 1] if i else 0
+            return bytes(self.data[start:raw]).decode('utf-8') if raw > start else None
+        if raw == self.null or raw != raw:  # raw != raw for NaN
+            return None
+        if self.type == 'DICTIONARY':
+            return self.dictionary[raw]
+        if self.type == 'BOOLEAN':
+            return bool(raw)
+        if self.type == 'DATE':
+            return EPOCH + timedelta(days=raw)
+        if self.type == 'TIMESTAMP':
+            return datetime.fromtimestamp(raw, timezone.utc)
+        return raw
+
+    def __iter__(self):
+        for i in range(len(self.values)):
+            yield self[i]
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes + (self.data.nbytes if self.data is not None else 0)
+
+    def close(self):
+        self.values.release()
+        if self.data is not None:
+            self.data.release()
+        for mapped in self._maps:
+            if mapped is not None:
+                mapped.close()
+
+class ColumnTable:
+    """A converted table opened by memory-mapping its column files"""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        with open(self.directory / SCHEMA_FILE, 'r', encoding='utf-8') as f:
+            schema = json.load(f)
+        self.num_rows = schema['rows']
+        self.specs = {spec['name']: spec for spec in schema['columns']}
+        self._columns: Dict[str, Column] = {}
+
+    @property
+    def column_names(self) -> List[str]:
+        return list(self.specs)
+
+    def column(self, name) -> Column:
+        """Map a column on first use; untouched columns are never read"""
+        if name not in self._columns:
+            if name not in self.specs:
+                raise KeyError(f"No column {name} in {self.directory}")
+            self._columns[name] = Column(self.directory, self.specs[name])
+        return self._columns[name]
+
+    def rows(self, columns=None):
+        """Decoded rows as dicts (row-at-a-time access; slow by design)"""
+        names = columns or self.column_names
+        cols = [self.column(name) for name in names]
+        for i in range(self.num_rows):
+            yield {name: col[i] for name, col in zip(names, cols)}
+
+    def close(self):
+        for column in self._columns.values():
+            column.close()
+        self._columns = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def load_columns(directory) -> ColumnTable:
+    return ColumnTable(directory)
+
+# Arrow / Parquet
+
+ARROW_TYPES = {
+    'INTEGER': lambda: pa.int64(),
+    'REAL': lambda: pa.float64(),
+    'BOOLEAN': lambda: pa.bool_(),
+    'DATE': lambda: pa.date32(),
+    'TIMESTAMP': lambda: pa.timestamp('s', tz='UTC'),
+    'DICTIONARY': lambda: pa.dictionary(pa.int32(), pa.string()),
+    'TEXT': lambda: pa.string(),
+}
+
+def arrow_schema(columns):
+    return pa.schema([(name, ARROW_TYPES[column_type]()) for name, column_type in columns.items()])
+
+def arrow_batch(rows, columns, schema, dictionaries):
+    """RecordBatch for rows; dictionaries only grow, so IPC can emit deltas"""
+    arrays = []
+    for name, column_type in columns.items():
+        values = [row.get(name) for row in rows]
+        values = [None if v is None or v == '' else v for v in values]
+        if column_type == 'DICTIONARY':
+            codes = dictionaries.setdefault(name, {})
+            indices = [None if v is None else codes.setdefault(text_value(v), len(codes)) for v in values]
+            arrays.append(pa.DictionaryArray.from_arrays(
+                pa.array(indices, pa.int32()), pa.array(list(codes), pa.string())))
+        elif column_type == 'TEXT':
+            arrays.append(pa.array([None if v is None else text_value(v) for v in values], pa.string()))
+        elif column_type == 'DATE':
+            arrays.append(pa.array([None if v is None else date.fromisoformat(str(v)[:10]) for v in values],
+                                   pa.date32()))
+        elif column_type == 'TIMESTAMP':
+            arrays.append(pa.array([None if v is None else parse_timestamp(v) for v in values],
+                                   pa.timestamp('s', tz='UTC')))
+        else:
+            arrays.append(pa.array([None if v is None else encode(v, column_type) for v in values],
+                                   ARROW_TYPES[column_type]()))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+class ArrowWriter:
+    """Writes batches to an Arrow IPC file and a Parquet file"""
+
+    def __init__(self, directory, table, columns):
+        self.columns = columns
+        self.schema = arrow_schema(columns)
+        self.dictionaries = {}
+        self.ipc_path = Path(directory) / f"{table}.arrow"
+        self.parquet_path = Path(directory) / f"{table}.parquet"
+        self.sink = pa.OSFile(str(self.ipc_path), 'wb')
+        self.ipc = pa.ipc.new_file(self.sink, self.schema,
+                                   options=pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True))
+        self.parquet = pq.ParquetWriter(str(self.parquet_path), self.schema)
+
+    def write_batch(self, rows):
+        batch = arrow_batch(rows, self.columns, self.schema, self.dictionaries)
+        self.ipc.write_batch(batch)
+        self.parquet.write_batch(batch)
+
+    def close(self):
+        self.ipc.close()
+        self.sink.close()
+        self.parquet.close()
+
+def load_arrow(path):
+    """Arrow table backed by a memory map of an IPC file (no copy)"""
+    source = pa.memory_map(str(path), 'r')
+    return pa.ipc.open_file(source).read_all()
+
+# Conversion
+
+def convert_table(name, files, output_dir, arrow=False, infer_rows=INFER_ROWS, batch_rows=BATCH_ROWS):
+    """Convert one table's files; returns (rows, column types)"""
+    rows = (row for path in files for row in iter_rows(path))
+    sample = list(islice(rows, infer_rows))
+    columns = infer_columns(sample)
+    writers = [ColumnWriter(Path(output_dir) / name, columns)]
+    if arrow:
+        writers.append(ArrowWriter(output_dir, name, columns))
+    try:
+        for batch in batches(sample, batch_rows):
+            for writer in writers:
+                writer.write_batch(batch)
+        for batch in batches(rows, batch_rows):
+            for writer in writers:
+                writer.write_batch(batch)
+    finally:
+        for writer in writers:
+            writer.close()
+    return writers[0].rows, columns
+
+def directory_bytes(paths):
+    return sum(os.path.getsize(p) for p in paths if os.path.isfile(p))
+
+# Benchmark: row-oriented text vs memory-mapped columns
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+def benchmark(name, files, output_dir, group_by=None, measure=None):
+    """Time SUM(measure) GROUP BY group_by over the source rows and the column store
+
+    The column scan sums a REAL measure into slots indexed by dictionary
+    code, so group_by must be a DICTIONARY column; anything else raises
+    ValueError.
+    """
+    table = ColumnTable(Path(output_dir) / name)
+    categorical = sorted((len(spec['dictionary']), n) for n, spec in table.specs.items()
+                         if spec['type'] == 'DICTIONARY')
+    reals = [n for n, spec in table.specs.items() if spec['type'] == 'REAL']
+    # Defaults: the lowest-cardinality category and the last real column (usually a total)
+    group_by = group_by or (categorical[0][1] if categorical else None)
+    measure = measure or (reals[-1] if reals else None)
+    if group_by is None or measure is None:
+        print(f"\nINFO: Skipping {name}: no categorical and real column to benchmark (use --group-by/--measure)")
+        return None
+    for column, expected in ((group_by, 'DICTIONARY'), (measure, 'REAL')):
+        if column not in table.specs:
+            raise ValueError(f"no column {column!r} (available: {', '.join(table.specs)})")
+        if table.specs[column]['type'] != expected:
+            role = "--group-by" if expected == 'DICTIONARY' else "--measure"
+            candidates = [n for n, spec in table.specs.items() if spec['type'] == expected]
+            raise ValueError(f"{role} {column} is {table.specs[column]['type']}, not {expected} "
+                             f"(choose from: {', '.join(candidates) or 'none'})")
+    results = []
+
+    # Row store: parse every field of every row, then aggregate
+    rows, load_ms = timed(lambda: [row for path in files for row in iter_rows(path)])
+
+    def row_scan():
+        totals = {}
+        for row in rows:
+            value = row.get(measure)
+            if value not in (None, ''):
+                key = row.get(group_by)
+                totals[key] = totals.get(key, 0.0) + float(value)
+        return totals
+    row_totals, scan_ms = timed(row_scan)
+    results.append(('Row (source text)', load_ms, scan_ms, directory_bytes(files)))
+    del rows
+
+    # Column store: map two columns and aggregate their arrays
+    def column_load():
+        t = ColumnTable(Path(output_dir) / name)
+        return t, t.column(group_by), t.column(measure)
+    (columns_table, keys, values), load_ms = timed(column_load)
+
+    def column_scan():
+        sums = [0.0] * (len(keys.dictionary) + 1)
+        for code, value in zip(keys.values, values.values):
+            if value == value:
+                sums[code] += value  # null code -1 lands in the last slot
+        return {(keys.dictionary[i] if i < len(keys.dictionary) else None): total
+                for i, total in enumerate(sums) if total}
+    column_totals, scan_ms = timed(column_scan)
+    results.append(('Columns (mmap)', load_ms, scan_ms, keys.nbytes + values.nbytes))
+    columns_table.close()
+
+    ipc_path = Path(output_dir) / f"{name}.arrow"
+    if pa is not None and ipc_path.exists():
+        arrow_table, load_ms = timed(lambda: load_arrow(ipc_path))
+
+        def arrow_scan():
+            return arrow_table.group_by(group_by).aggregate([(measure, 'sum')])
+        _, scan_ms = timed(arrow_scan)
+        arrow_bytes = arrow_table.column(group_by).nbytes + arrow_table.column(measure).nbytes
+        results.append(('Arrow IPC (mmap)', load_ms, scan_ms, arrow_bytes))
+
+    mismatched = [key for key, total in row_totals.items()
+                  if abs(total - column_totals.get(key or None, 0.0)) > 1e-6 * max(1.0, abs(total))]
+    return group_by, measure, table.num_rows, results, mismatched
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Convert datasets to memory-mapped columnar storage and benchmark row vs column scans")
+    parser.add_argument("--input", default=str(DATASET_DIR),
+                       help="Dataset file, directory of datasets, or generate_data.py output")
+    parser.add_argument("--output", "-o", default="columnar-data", help="Output directory")
+    parser.add_argument("--tables", nargs="+", help="Tables to convert (default: all)")
+    parser.add_argument("--format", choices=["columns", "all"], default="all",
+                       help="columns: column files only; all: also Parquet and Arrow IPC when pyarrow is installed")
+    parser.add_argument("--infer-rows", type=int, default=INFER_ROWS,
+                       help=f"Rows sampled to infer column types (default: {INFER_ROWS})")
+    parser.add_argument("--benchmark", action="store_true",
+                       help="Time SUM(measure) GROUP BY category over source rows vs columns")
+    parser.add_argument("--group-by", help="Benchmark grouping column (default: lowest-cardinality category)")
+    parser.add_argument("--measure", help="Benchmark summed column (default: last REAL column)")
+
+    args = parser.parse_args()
+
+    tables = table_files(args.input)
+    if args.tables:
+        missing = [t for t in args.tables if t not in tables]
+        if missing:
+            print(f"ERROR: Unknown tables: {', '.join(missing)} (available: {', '.join(tables)})")
+            return 1
+        tables = {t: tables[t] for t in args.tables}
+    arrow = args.format == 'all' and pa is not None
+    if args.format == 'all' and pa is None:
+        print("INFO: pyarrow not installed; writing column files only (pip install pyarrow for Parquet/Arrow)",
+              file=sys.stderr)
+
+    print("=" * 80)
+    print(f"Columnar conversion: {args.input} -> {args.output}/")
+    print("=" * 80)
+    print(f"{'Table':<18}{'Rows':>12}{'Source MB':>11}{'Columns MB':>12}{'ms':>10}  Types")
+    print("-" * 80)
+    for name, files in tables.items():
+        try:
+            (rows, columns), ms = timed(lambda: convert_table(name, files, args.output, arrow, args.infer_rows))
+        except ValueError as e:
+            print(f"ERROR: {name}: {e}")
+            return 1
+        column_dir = Path(args.output) / name
+        stored = directory_bytes(column_dir.iterdir())
+        kinds = ', '.join(sorted({t.lower() for t in columns.values()}))
+        print(f"{name:<18}{rows:>12,}{directory_bytes(files) / 1e6:>11.2f}{stored / 1e6:>12.2f}{ms:>10.0f}  {kinds}")
+
+    if args.benchmark:
+        for name, files in tables.items():
+            try:
+                outcome = benchmark(name, files, args.output, args.group_by, args.measure)
+            except ValueError as e:
+                print(f"ERROR: {name}: {e}")
+                return 1
+            if outcome is None:
+                continue
+            group_by, measure, rows, results, mismatched = outcome
+            print(f"\n{name}: SUM({measure}) GROUP BY {group_by} over {rows:,} rows")
+            print(f"  {'Storage':<20}{'Load ms':>10}{'Scan ms':>10}{'Bytes read':>14}")
+            for label, load_ms, scan_ms, nbytes in results:
+                print(f"  {label:<20}{load_ms:>10.1f}{scan_ms:>10.1f}{nbytes:>14,}")
+            if mismatched:
+                print(f"  WARNING: totals differ for {len(mismatched)} groups")
+    print("=" * 80)
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
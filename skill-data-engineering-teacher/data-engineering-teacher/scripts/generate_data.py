@@ -0,0 +1,564 @@
+#!/usr/bin/env python3
+"""
+Generate scaled-up versions of the sample datasets.
+
+Produces customers, products, stores, retail sales transactions and order
+events at any size (1K to 100M+ rows) with referential integrity: every
+customer_id, product_id and store_id referenced by a transaction or order
+exists in its dimension, and unit prices match the product catalog.
+Customer and product popularity follow a Zipf distribution and dates
+follow a seasonal calendar (holiday peak, weekend lift, yearly growth).
+
+Rows are generated in fixed-size parts spread over a process pool and
+streamed straight to one file per part, so memory stays constant however
+many rows are requested. Output is deterministic: the same seed, sizes and
+--chunk-rows produce byte-identical files with any number of workers.
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+import time
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from math import gcd
+from pathlib import Path
+from typing import Dict, List, NamedTuple
+
+from sample_data import DATASET_DIR, read_dataset
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+# Output column order per dataset
+FIELDS = {
+    'customer_data': ['customer_id', 'customer_name', 'email', 'phone', 'address', 'city', 'state',
+                      'zip_code', 'signup_date', 'loyalty_tier', 'last_purchase_date'],
+    'product_catalog': ['product_id', 'product_name', 'category', 'subcategory', 'brand', 'unit_price',
+                        'cost', 'in_stock', 'stock_quantity', 'attributes'],
+    'stores': ['store_id', 'store_name', 'city', 'state', 'region', 'opened_date', 'square_feet'],
+    'retail_sales': ['transaction_id', 'transaction_date', 'customer_id', 'product_id', 'store_id',
+                     'quantity', 'unit_price', 'discount_amount', 'tax_amount', 'total_amount'],
+    'order_events': ['order_id', 'event_type', 'event_timestamp', 'customer_id', 'order_amount',
+                     'payment_method', 'transaction_id', 'carrier', 'tracking_number', 'delivery_notes',
+                     'failure_reason'],
+}
+DATASETS = tuple(FIELDS)
+
+FIRST_NAMES = ['John', 'Sarah', 'Michael', 'Emily', 'David', 'Jennifer', 'Robert', 'Lisa', 'William',
+               'Jessica', 'James', 'Maria', 'Daniel', 'Amanda', 'Carlos', 'Priya', 'Wei', 'Aisha',
+               'Thomas', 'Olivia', 'Kevin', 'Fatima', 'Brian', 'Grace']
+LAST_NAMES = ['Smith', 'Johnson', 'Brown', 'Davis', 'Wilson', 'Martinez', 'Taylor', 'Anderson',
+              'Thomas', 'Garcia', 'Lee', 'Clark', 'Lewis', 'Walker', 'Patel', 'Nguyen', 'Kim',
+              'Hernandez', 'Lopez', 'Chen', 'Young', 'King', 'Wright', 'Scott']
+STREETS = ['Main St', 'Oak Ave', 'Elm St', 'Pine Rd', 'Maple Dr', 'Cedar Ln', 'Birch Way', 'Lake St',
+           'Park Ave', 'Hill Rd', 'River Rd', 'Washington Blvd']
+CITIES = [
+    ('Springfield', 'IL', '62701'), ('Chicago', 'IL', '60601'), ('Peoria', 'IL', '61602'),
+    ('Rockford', 'IL', '61101'), ('Naperville', 'IL', '60540'), ('Aurora', 'IL', '60505'),
+    ('Joliet', 'IL', '60432'), ('Evanston', 'IL', '60201'), ('Champaign', 'IL', '61820'),
+    ('Milwaukee', 'WI', '53202'), ('Madison', 'WI', '53703'), ('Indianapolis', 'IN', '46204'),
+    ('Detroit', 'MI', '48226'), ('Columbus', 'OH', '43215'), ('Minneapolis', 'MN', '55401'),
+    ('St. Louis', 'MO', '63101'), ('Dallas', 'TX', '75201'), ('Austin', 'TX', '78701'),
+    ('Atlanta', 'GA', '30303'), ('Denver', 'CO', '80202'), ('Seattle', 'WA', '98101'),
+    ('Portland', 'OR', '97201'), ('Boston', 'MA', '02108'), ('New York', 'NY', '10001'),
+]
+REGIONS = {
+    'IL': 'Midwest', 'WI': 'Midwest', 'IN': 'Midwest', 'MI': 'Midwest', 'OH': 'Midwest', 'MN': 'Midwest',
+    'MO': 'Midwest', 'TX': 'South', 'GA': 'South', 'CO': 'West', 'WA': 'West', 'OR': 'West',
+    'MA': 'Northeast', 'NY': 'Northeast',
+}
+LOYALTY_TIERS = ['Bronze', 'Silver', 'Gold', 'Platinum']
+LOYALTY_CUM_WEIGHTS = [50, 80, 95, 100]
+PAYMENT_METHODS = ['Credit Card', 'Debit Card', 'PayPal', 'Apple Pay', 'Gift Card']
+PAYMENT_CUM_WEIGHTS = [45, 70, 85, 97, 100]
+CARRIERS = [('FastShip', 'FS'), ('QuickPost', 'QP'), ('ParcelGo', 'PG')]
+DELIVERY_NOTES = ['Left at front door', 'Handed to resident', 'Left with neighbor', 'Delivered to mailroom']
+FAILURE_REASONS = ['Insufficient funds', 'Card expired', 'Fraud check declined']
+QUANTITIES = [1, 2, 3, 4, 5]
+QUANTITY_CUM_WEIGHTS = [50, 75, 88, 95, 100]
+TAX_RATE = 0.08
+
+# Seasonality: relative daily volume by month, by weekday (Monday first), and yearly growth
+MONTH_WEIGHTS = (0.80, 0.78, 0.90, 0.95, 1.00, 0.98, 1.00, 1.05, 0.95, 1.00, 1.35, 1.60)
+WEEKDAY_WEIGHTS = (0.90, 0.90, 0.95, 1.00, 1.10, 1.30, 1.25)
+ANNUAL_GROWTH = 0.15
+
+# Written with two decimals in CSV output
+MONEY_FIELDS = {'unit_price', 'cost', 'discount_amount', 'tax_amount', 'total_amount', 'order_amount'}
+
+COUNT_SUFFIXES = {'K': 10 ** 3, 'M': 10 ** 6, 'B': 10 ** 9}
+
+class Config(NamedTuple):
+    seed: int
+    counts: Dict[str, int]     # rows per dataset; order_events counts orders
+    start: date
+    days: int
+    skew: float                # Zipf exponent for customer and product popularity
+    chunk_rows: int
+    fmt: str
+    output_dir: str
+
+def parse_count(text):
+    """Row count with an optional K/M/B suffix ('250K' -> 250000)"""
+    text = text.strip().upper().replace('_', '')
+    if text and text[-1] in COUNT_SUFFIXES:
+        return int(float(text[:-1]) * COUNT_SUFFIXES[text[-1]])
+    return int(text)
+
+def default_counts(rows):
+    """Dimension sizes for a given number of sales transactions"""
+    return {
+        'customer_data': max(20, rows // 20),
+        'product_catalog': max(20, min(rows // 1000, 100000)),
+        'stores': max(5, min(rows // 100000, 5000)),
+        'retail_sales': rows,
+        'order_events': max(10, rows // 4),
+    }
+
+def weighted(rng, items, cum_weights):
+    """One weighted draw; cheaper than rng.choices for a single item"""
+    return items[bisect_right(cum_weights, rng.random() * cum_weights[-1])]
+
+def split64(seed, index):
+    """splitmix64 hash of (seed, index) as a float in [0, 1)"""
+    z = (seed * 0x9E3779B97F4A7C15 + index + 1) & 0xFFFFFFFFFFFFFFFF
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & 0xFFFFFFFFFFFFFFFF
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & 0xFFFFFFFFFFFFFFFF
+    return ((z ^ (z >> 31)) >> 11) / float(1 << 53)
+
+class ZipfIndex:
+    """Maps uniform draws to indexes in [0, n) with Zipf popularity
+
+    Ranks come from the inverse CDF of a power law bounded to n, the
+    continuous approximation of Zipf, so drawing is O(1) for any n. Ranks
+    are then scattered over the index space by a multiplicative
+    permutation, so the most popular customers are not simply the lowest ids.
+    """
+
+    def __init__(self, n, skew, seed):
+        self.n = n
+        self.skew = skew
+        multiplier = 2654435761 % n or 1
+        while gcd(multiplier, n) != 1:
+            multiplier += 1
+        self.multiplier = multiplier
+        self.offset = seed % n
+        if skew > 0 and skew != 1:
+            self.exponent = 1 / (1 - skew)
+            self.span = (n + 1) ** (1 - skew) - 1
+
+    def __call__(self, u):
+        n, s = self.n, self.skew
+        if s <= 0:
+            rank = int(u * n)
+        elif s == 1:
+            rank = int((n + 1) ** u) - 1
+        else:
+            rank = int((self.span * u + 1) ** self.exponent) - 1
+        rank = min(max(rank, 0), n - 1)
+        return (rank * self.multiplier + self.offset) % n
+
+class SeasonalCalendar:
+    """Spreads a sequence of events over a date range by seasonal volume"""
+
+    def __init__(self, start, days):
+        self.start = start
+        self.cum_weights = []
+        total = 0.0
+        for offset in range(days):
+            day = start + timedelta(days=offset)
+            total += (MONTH_WEIGHTS[day.month - 1] * WEEKDAY_WEIGHTS[day.weekday()]
+                      * (1 + ANNUAL_GROWTH * offset / 365))
+            self.cum_weights.append(total)
+        self.total = total
+        self.days = days
+        self.dates = [start + timedelta(days=offset) for offset in range(days)]
+        self.iso_dates = [day.isoformat() for day in self.dates]
+
+    def offset_at(self, fraction):
+        """Day offset at a fraction of cumulative volume (0 = start, 1 = end)"""
+        return min(bisect_left(self.cum_weights, fraction * self.total), self.days - 1)
+
+    @property
+    def end(self):
+        return self.start + timedelta(days=self.days - 1)
+
+def id_width(n, minimum):
+    return max(minimum, len(str(n)))
+
+class DataGenerator:
+    """Row generators for each dataset, driven by a Config
+
+    Each part of each dataset has its own random stream seeded from
+    (seed, dataset, part), and cross-dataset values (product prices,
+    popular customers) are pure functions of the seed, so parts can be
+    generated independently and in any order.
+    """
+
+    def __init__(self, config: Config, products=None):
+        self.config = config
+        self.counts = config.counts
+        self.calendar = SeasonalCalendar(config.start, config.days)
+        self.customer_pick = ZipfIndex(self.counts['customer_data'], config.skew, config.seed)
+        self.product_pick = ZipfIndex(self.counts['product_catalog'], config.skew, config.seed + 1)
+        self.customer_width = id_width(self.counts['customer_data'], 3)
+        self.store_width = id_width(self.counts['stores'], 2)
+        self.templates = products if products is not None else read_dataset(DATASET_DIR / 'product_catalog.json')
+
+    def rng(self, dataset, part):
+        return random.Random(f"{self.config.seed}:{dataset}:{part}")
+
+    def customer_id(self, i):
+        return f"C{i + 1:0{self.customer_width}d}"
+
+    def product_id(self, i):
+        return f"P{101 + i}"
+
+    def store_id(self, i):
+        return f"S{i + 1:0{self.store_width}d}"
+
+    def product_price(self, i):
+        """Unit price of product i; the first catalog entries keep their sample prices"""
+        template = self.templates[i % len(self.templates)]
+        if i < len(self.templates):
+            return template['unit_price']
+        price = template['unit_price'] * (0.6 + 0.8 * split64(self.config.seed, i))
+        return max(int(price), 1) - 0.01
+
+    def rows(self, dataset, part, start, stop):
+        rng = self.rng(dataset, part)
+        return getattr(self, dataset)(rng, start, stop)
+
+    # Dimensions
+
+    def customer_data(self, rng, start, stop):
+        first_day = self.calendar.start - timedelta(days=365)
+        signup_span = 365 + self.config.days // 2
+        for i in range(start, stop):
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            city, state, zip_code = rng.choice(CITIES)
+            signup = first_day + timedelta(days=rng.randrange(signup_span))
+            last_purchase = signup + timedelta(days=rng.randrange((self.calendar.end - signup).days + 1))
+            yield {
+                'customer_id': self.customer_id(i),
+                'customer_name': f"{first} {last}",
+                'email': f"{first.lower()}.{last.lower()}{i + 1}@email.com",
+                'phone': f"555-{rng.randrange(10000):04d}",
+                'address': f"{rng.randrange(1, 9999)} {rng.choice(STREETS)}",
+                'city': city,
+                'state': state,
+                'zip_code': zip_code,
+                'signup_date': signup.isoformat(),
+                'loyalty_tier': weighted(rng, LOYALTY_TIERS, LOYALTY_CUM_WEIGHTS),
+                'last_purchase_date': last_purchase.isoformat(),
+            }
+
+    def product_catalog(self, rng, start, stop):
+        for i in range(start, stop):
+            template = self.templates[i % len(self.templates)]
+            series = i // len(self.templates)
+            price = self.product_price(i)
+            yield {
+                'product_id': self.product_id(i),
+                'product_name': template['product_name'] + (f" Series {series + 1}" if series else ''),
+                'category': template['category'],
+                'subcategory': template['subcategory'],
+                'brand': template['brand'],
+                'unit_price': price,
+                'cost': round(price * rng.uniform(0.4, 0.6), 2) if series else template['cost'],
+                'in_stock': rng.random() < 0.9,
+                'stock_quantity': rng.randrange(0, 500),
+                'attributes': template.get('attributes', {}),
+            }
+
+    def stores(self, rng, start, stop):
+        for i in range(start, stop):
+            city, state, _ = rng.choice(CITIES)
+            opened = self.calendar.start - timedelta(days=rng.randrange(365 * 15))
+            yield {
+                'store_id': self.store_id(i),
+                'store_name': f"{city} #{i + 1}",
+                'city': city,
+                'state': state,
+                'region': REGIONS[state],
+                'opened_date': opened.isoformat(),
+                'square_feet': rng.randrange(8, 60) * 1000,
+            }
+
+    # Facts
+
+    def retail_sales(self, rng, start, stop):
+        n = self.counts['retail_sales']
+        stores = self.counts['stores']
+        for i in range(start, stop):
+            # Dates advance with the transaction id, as in an append-only fact table
+            offset = self.calendar.offset_at((i + rng.random()) / n)
+            product = self.product_pick(rng.random())
+            quantity = weighted(rng, QUANTITIES, QUANTITY_CUM_WEIGHTS)
+            unit_price = self.product_price(product)
+            subtotal = quantity * unit_price
+            discount = round(subtotal * rng.choice((0.1, 0.15, 0.2)), 2) if rng.random() < 0.2 else 0.0
+            tax = round((subtotal - discount) * TAX_RATE, 2)
+            yield {
+                'transaction_id': 1001 + i,
+                'transaction_date': self.calendar.iso_dates[offset],
+                'customer_id': self.customer_id(self.customer_pick(rng.random())),
+                'product_id': self.product_id(product),
+                'store_id': self.store_id(rng.randrange(stores)),
+                'quantity': quantity,
+                'unit_price': unit_price,
+                'discount_amount': discount,
+                'tax_amount': tax,
+                'total_amount': round(subtotal - discount + tax, 2),
+            }
+
+    def order_events(self, rng, start, stop):
+        """Event rows for orders start..stop: placed, payment, shipped, delivered"""
+        n = self.counts['order_events']
+        for i in range(start, stop):
+            order_id = f"ORD-{1001 + i}"
+            day = self.calendar.dates[self.calendar.offset_at((i + rng.random()) / n)]
+            placed = datetime(day.year, day.month, day.day, 7) + timedelta(seconds=rng.randrange(15 * 3600))
+            quantity = weighted(rng, QUANTITIES, QUANTITY_CUM_WEIGHTS)
+            amount = round(quantity * self.product_price(self.product_pick(rng.random())) * (1 + TAX_RATE), 2)
+            payment_method = weighted(rng, PAYMENT_METHODS, PAYMENT_CUM_WEIGHTS)
+            yield {
+                'order_id': order_id,
+                'event_type': 'ORDER_PLACED',
+                'event_timestamp': timestamp(placed),
+                'customer_id': self.customer_id(self.customer_pick(rng.random())),
+                'order_amount': amount,
+                'payment_method': payment_method,
+            }
+            at = placed + timedelta(seconds=rng.randrange(5, 60))
+            if rng.random() < 0.05:
+                yield {'order_id': order_id, 'event_type': 'PAYMENT_FAILED', 'event_timestamp': timestamp(at),
+                       'failure_reason': rng.choice(FAILURE_REASONS)}
+                if rng.random() >= 0.6:
+                    continue
+                at += timedelta(seconds=rng.randrange(1800, 4 * 3600))
+                yield {'order_id': order_id, 'event_type': 'PAYMENT_RETRY', 'event_timestamp': timestamp(at),
+                       'payment_method': weighted(rng, PAYMENT_METHODS, PAYMENT_CUM_WEIGHTS)}
+                at += timedelta(seconds=rng.randrange(5, 60))
+            yield {'order_id': order_id, 'event_type': 'PAYMENT_CONFIRMED', 'event_timestamp': timestamp(at),
+                   'transaction_id': f"TXN-{5001 + i}"}
+            if rng.random() >= 0.93:
+                continue
+            at += timedelta(seconds=rng.randrange(12 * 3600, 48 * 3600))
+            carrier, prefix = rng.choice(CARRIERS)
+            yield {'order_id': order_id, 'event_type': 'ORDER_SHIPPED', 'event_timestamp': timestamp(at),
+                   'carrier': carrier, 'tracking_number': f"{prefix}{rng.randrange(10 ** 9):09d}"}
+            if rng.random() >= 0.9:
+                continue
+            at += timedelta(seconds=rng.randrange(24 * 3600, 5 * 24 * 3600))
+            yield {'order_id': order_id, 'event_type': 'ORDER_DELIVERED', 'event_timestamp': timestamp(at),
+                   'delivery_notes': rng.choice(DELIVERY_NOTES)}
+
+def timestamp(value):
+    return value.isoformat() + 'Z'  # whole seconds, so no fractional part
+
+# Writers: each streams one part's rows to a file and returns the row count
+
+def csv_value(value):
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+def write_csv(path, fields, rows):
+    # Only money, boolean and nested fields need converting; the rest are written as-is
+    money = [i for i, field in enumerate(fields) if field in MONEY_FIELDS]
+    other = [i for i, field in enumerate(fields) if field in ('in_stock', 'attributes')]
+    count = 0
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(fields)
+        for row in rows:
+            values = [row.get(field, '') for field in fields]
+            for i in money:
+                if values[i] != '':
+                    values[i] = f"{values[i]:.2f}"
+            for i in other:
+                values[i] = csv_value(values[i])
+            writer.writerow(values)
+            count += 1
+    return count
+
+def write_jsonl(path, fields, rows):
+    count = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        for row in rows:
+            f.write(json.dumps(row))
+            f.write('\n')
+            count += 1
+    return count
+
+def write_parquet(path, fields, rows):
+    # One part is held as columns until written; parts are bounded by --chunk-rows
+    columns: Dict[str, list] = {field: [] for field in fields}
+    count = 0
+    for row in rows:
+        for field in fields:
+            value = row.get(field)
+            columns[field].append(json.dumps(value) if isinstance(value, (dict, list)) else value)
+        count += 1
+    pq.write_table(pa.table(columns), path)
+    return count
+
+WRITERS = {'csv': write_csv, 'jsonl': write_jsonl, 'parquet': write_parquet}
+
+# Parts and workers
+
+class Part(NamedTuple):
+    dataset: str
+    index: int
+    start: int
+    stop: int
+
+def plan_parts(counts, chunk_rows, datasets=DATASETS) -> List[Part]:
+    """Split each dataset into parts of at most chunk_rows rows (orders for order_events)"""
+    parts = []
+    for dataset in datasets:
+        for index, start in enumerate(range(0, counts[dataset], chunk_rows)):
+            parts.append(Part(dataset, index, start, min(start + chunk_rows, counts[dataset])))
+    return parts
+
+def part_path(output_dir, part, fmt):
+    return Path(output_dir) / part.dataset / f"part-{part.index:05d}.{fmt}"
+
+_worker_generator = None
+
+def _init_worker(config, products):
+    global _worker_generator
+    _worker_generator = DataGenerator(config, products)
+
+def write_part(part):
+    """Generate and write one part; returns (part, path, rows written)"""
+    config = _worker_generator.config
+    path = part_path(config.output_dir, part, config.fmt)
+    rows = _worker_generator.rows(part.dataset, part.index, part.start, part.stop)
+    count = WRITERS[config.fmt](path, FIELDS[part.dataset], rows)
+    return part, path, count
+
+def generate(config, datasets=DATASETS, workers=None):
+    """Write every part of the requested datasets; yields (part, path, rows) in part order"""
+    parts = plan_parts(config.counts, config.chunk_rows, datasets)
+    for dataset in datasets:
+        (Path(config.output_dir) / dataset).mkdir(parents=True, exist_ok=True)
+    products = read_dataset(DATASET_DIR / 'product_catalog.json')
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(parts) <= 1:
+        _init_worker(config, products)
+        yield from map(write_part, parts)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(config, products)) as executor:
+        yield from executor.map(write_part, parts)
+
+def write_manifest(config, results, datasets):
+    """Record sizes, settings and files so a run can be reproduced or loaded"""
+    manifest = {
+        'seed': config.seed,
+        'start': config.start.isoformat(),
+        'days': config.days,
+        'skew': config.skew,
+        'chunk_rows': config.chunk_rows,
+        'format': config.fmt,
+        'datasets': {}
+    }
+    for dataset in datasets:
+        entries = [(path, count) for part, path, count in results if part.dataset == dataset]
+        manifest['datasets'][dataset] = {
+            'rows': sum(count for _, count in entries),
+            'files': [str(Path(path).relative_to(config.output_dir)) for path, _ in entries],
+        }
+        if dataset == 'order_events':
+            manifest['datasets'][dataset]['orders'] = config.counts[dataset]
+    path = Path(config.output_dir) / 'manifest.json'
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return path
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate scaled sample datasets with referential integrity and realistic skew")
+    parser.add_argument("--rows", type=parse_count, default=100000,
+                       help="Retail sales transactions to generate, e.g. 1K, 10M, 100M (default: 100K)")
+    parser.add_argument("--customers", type=parse_count, help="Customers (default: rows / 20)")
+    parser.add_argument("--products", type=parse_count, help="Products (default: rows / 1000, 20 to 100K)")
+    parser.add_argument("--stores", type=parse_count, help="Stores (default: rows / 100K, 5 to 5000)")
+    parser.add_argument("--orders", type=parse_count, help="Orders in order_events (default: rows / 4)")
+    parser.add_argument("--datasets", nargs="+", choices=list(DATASETS), default=list(DATASETS),
+                       help="Datasets to write (default: all)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed (default: 42)")
+    parser.add_argument("--start", type=date.fromisoformat, default=date(2023, 1, 1),
+                       help="First transaction date (default: 2023-01-01)")
+    parser.add_argument("--days", type=int, default=730, help="Days of history (default: 730)")
+    parser.add_argument("--skew", type=float, default=1.0,
+                       help="Zipf exponent for customer and product popularity; 0 is uniform (default: 1.0)")
+    parser.add_argument("--format", choices=list(WRITERS), default="csv", help="Output file format")
+    parser.add_argument("--chunk-rows", type=parse_count, default=250000,
+                       help="Rows per output file (default: 250K)")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--output", "-o", default="generated-data", help="Output directory")
+
+    args = parser.parse_args()
+
+    if args.format == 'parquet' and pa is None:
+        print("ERROR: Parquet output requires pyarrow (pip install pyarrow); use --format csv or jsonl")
+        return 1
+    if args.days < 1 or args.chunk_rows < 1:
+        print("ERROR: --days and --chunk-rows must be positive")
+        return 1
+
+    counts = default_counts(args.rows)
+    for dataset, override in (('customer_data', args.customers), ('product_catalog', args.products),
+                              ('stores', args.stores), ('order_events', args.orders)):
+        if override is not None:
+            counts[dataset] = override
+    if any(counts[dataset] < 1 for dataset in ('customer_data', 'product_catalog', 'stores')):
+        print("ERROR: --customers, --products and --stores must be positive")
+        return 1
+
+    config = Config(seed=args.seed, counts=counts, start=args.start, days=args.days, skew=args.skew,
+                    chunk_rows=args.chunk_rows, fmt=args.format, output_dir=args.output)
+    datasets = [dataset for dataset in DATASETS if dataset in args.datasets]
+
+    print("=" * 80)
+    print(f"Generating {', '.join(datasets)} into {args.output}/ ({args.format}, seed {args.seed})")
+    print("=" * 80)
+
+    started = time.perf_counter()
+    results = []
+    for part, path, count in generate(config, datasets, args.workers):
+        results.append((part, path, count))
+        print(f"  {part.dataset:<16} part {part.index:>5}  {count:>10,} rows", file=sys.stderr)
+    elapsed = time.perf_counter() - started
+    manifest = write_manifest(config, results, datasets)
+
+    print(f"\n{'Dataset':<18}{'Rows':>14}{'Files':>8}{'MB':>10}")
+    print("-" * 50)
+    total_rows = 0
+    for dataset in datasets:
+        entries = [(path, count) for part, path, count in results if part.dataset == dataset]
+        rows = sum(count for _, count in entries)
+        size = sum(os.path.getsize(path) for path, _ in entries) / 1e6
+        total_rows += rows
+        print(f"{dataset:<18}{rows:>14,}{len(entries):>8}{size:>10.1f}")
+    print("-" * 50)
+    print(f"{total_rows:,} rows in {elapsed:.1f}s ({total_rows / max(elapsed, 1e-9):,.0f} rows/s)")
+    print(f"Manifest: {manifest}")
+    print("=" * 80)
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Stream JSON event feeds in bounded memory.
+
+Reads a top-level JSON array (like order_events.json), newline-delimited
+JSON, or back-to-back JSON values incrementally: the file is read in
+chunks and each value is decoded as soon as it is complete, so memory is
+bounded by the chunk size and the largest single event, not the file.
+Events are yielded in batches and can be flattened on the fly, turning
+nested objects into prefixed columns (attributes.color -> attributes_color).
+"""
+
+import argparse
+import gzip
+import json
+import re
+import sys
+import time
+from collections import Counter
+from itertools import islice
+from typing import Dict, Iterator, List, Optional
+
+CHUNK_SIZE = 1 << 20
+MAX_VALUE_BYTES = 64 << 20     # a value still incomplete beyond this is treated as malformed
+BATCH_SIZE = 1000
+
+SKIP_WHITESPACE = re.compile(r"\s*")
+NUMBER_CHARS = set('0123456789+-.eE')
+
+def open_text(path):
+    """Text stream for a path; .gz files are decompressed on the fly"""
+    if str(path).endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+def iter_json(f, chunk_size=CHUNK_SIZE, max_value_bytes=MAX_VALUE_BYTES) -> Iterator:
+    """Yield each element of a top-level array, or each top-level value of NDJSON
+
+    The format is detected from the first non-blank character: '[' means
+    one array whose elements are streamed, anything else a sequence of
+    values separated by whitespace (one per line for NDJSON). Array
+    elements must be separated by exactly one comma, and anything but
+    whitespace after the array's closing ']' is an error.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    pos = 0
+    consumed = 0   # characters dropped from the front of buffer
+    eof = False
+    in_array = None
+    closed = False   # the top-level array has ended
+    need_comma = False    # an array element was just read
+    after_comma = False   # a comma was just read, so an element must follow
+
+    def fill(size):
+        nonlocal buffer, pos, consumed, eof
+        chunk = f.read(size)
+        if not chunk:
+            eof = True
+        consumed += pos
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+    while True:
+        pos = SKIP_WHITESPACE.match(buffer, pos).end()
+        if pos >= len(buffer):
+            if eof:
+                if in_array:
+                    raise ValueError(f"Unterminated top-level array at offset {consumed + pos}")
+                return
+            fill(chunk_size)
+            continue
+        if closed:
+            raise ValueError(f"Trailing data after the top-level array at offset {consumed + pos}")
+        if in_array is None:
+            in_array = buffer[pos] == '['
+            if in_array:
+                pos += 1
+            continue
+        if in_array:
+            char = buffer[pos]
+            if char == ']' and not after_comma:
+                pos += 1
+                in_array = False
+                closed = True
+                continue
+            if need_comma:
+                if char != ',':
+                    raise ValueError(f"Malformed JSON at offset {consumed + pos}: expected ',' or ']'")
+                pos += 1
+                need_comma = False
+                after_comma = True
+                continue
+            if char in ',]':
+                raise ValueError(f"Malformed JSON at offset {consumed + pos}: expected a value")
+        try:
+            value, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError as e:
+            if eof:
+                raise ValueError(f"Malformed JSON at offset {consumed + e.pos}: {e.msg}") from None
+            if len(buffer) - pos > max_value_bytes:
+                raise ValueError(f"JSON value at offset {consumed + pos} is malformed or larger than "
+                                 f"{max_value_bytes} bytes") from None
+            # Incomplete value: read more, doubling so one huge value is not rescanned per chunk
+            fill(max(chunk_size, len(buffer) - pos))
+            continue
+        if not eof and not isinstance(value, (dict, list)) and (end == len(buffer) or buffer[end] in NUMBER_CHARS):
+            # A number cut off by the end of the buffer ('3.2' of '3.25e10') may continue in the next chunk
+            fill(chunk_size)
+            continue
+        pos = end
+        need_comma = in_array
+        after_comma = False
+        yield value
+
+def flatten(record, sep='_', arrays='json', prefix='') -> Dict:
+    """Flatten nested objects into prefixed keys
+
+    Arrays are kept as JSON text (arrays='json') or spread into indexed
+    keys (arrays='index': tags_0, tags_1, ...). `prefix` is prepended to
+    every key, separator included.
+    """
+    flat = {}
+    for key, value in record.items():
+        kind = type(value)   # exact type checks: this runs once per field of every event
+        if kind is dict:
+            if value:
+                flat.update(flatten(value, sep, arrays, f"{prefix}{key}{sep}"))
+                continue
+            value = '{}'
+        elif kind is list:
+            if arrays == 'index':
+                indexed = {str(i): item for i, item in enumerate(value)}
+                flat.update(flatten(indexed, sep, arrays, f"{prefix}{key}{sep}"))
+                continue
+            value = json.dumps(value)
+        flat[prefix + key if prefix else key] = value
+    return flat
+
+def iter_records(path, flat=False, sep='_', arrays='json', chunk_size=CHUNK_SIZE) -> Iterator[Dict]:
+    """Stream the records of a JSON array or NDJSON file, optionally flattened"""
+    with open_text(path) as f:
+        for value in iter_json(f, chunk_size):
+            if flat and isinstance(value, dict):
+                value = flatten(value, sep, arrays)
+            yield value
+
+def read_events(path, batch_size=BATCH_SIZE, flat=True, sep='_', arrays='json',
+                chunk_size=CHUNK_SIZE) -> Iterator[List[Dict]]:
+    """Yield lists of at most batch_size events"""
+    records = iter_records(path, flat, sep, arrays, chunk_size)
+    while True:
+        batch = list(islice(records, batch_size))
+        if not batch:
+            return
+        yield batch
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process, or None where it is not available
+
+    ru_maxrss is KB on Linux and bytes on macOS; the resource module does
+    not exist on Windows.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def peak_memory() -> str:
+    """Peak resident set size for reports, e.g. '42 MB', or 'n/a'"""
+    peak = peak_rss_mb()
+    return 'n/a' if peak is None else f"{peak:.0f} MB"
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream a JSON array or NDJSON event file in batches")
+    parser.add_argument("path", help="JSON array, NDJSON or .gz file")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Events per batch")
+    parser.add_argument("--no-flatten", action="store_true", help="Keep nested objects as they are")
+    parser.add_argument("--sep", default="_", help="Separator for flattened keys (default: _)")
+    parser.add_argument("--arrays", choices=["json", "index"], default="json",
+                       help="Flattened arrays as JSON text or indexed keys")
+    parser.add_argument("--count-by", default="event_type", help="Field to tally (default: event_type)")
+    parser.add_argument("--output", "-o", help="Write the (flattened) events as NDJSON to this file")
+    parser.add_argument("--show", type=int, default=3, help="Print the first N events")
+
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    events = 0
+    batches = 0
+    columns: Dict[str, int] = {}
+    tally = Counter()
+    shown = []
+    out = open(args.output, 'w', encoding='utf-8') if args.output else None
+    try:
+        for batch in read_events(args.path, args.batch_size, not args.no_flatten, args.sep, args.arrays):
+            batches += 1
+            events += len(batch)
+            for event in batch:
+                if isinstance(event, dict):
+                    for key in event:
+                        columns[key] = columns.get(key, 0) + 1
+                    tally[event.get(args.count_by)] += 1
+                if out:
+                    out.write(json.dumps(event))
+                    out.write('\n')
+            if len(shown) < args.show:
+                shown.extend(batch[:args.show - len(shown)])
+    except (OSError, ValueError) as e:
+        print(f"ERROR: {e}")
+        return 1
+    finally:
+        if out:
+            out.close()
+    elapsed = time.perf_counter() - start
+
+    print("=" * 80)
+    print(f"Events: {args.path}")
+    print("=" * 80)
+    print(f"{events:,} events in {batches:,} batches, {elapsed:.2f}s "
+          f"({events / max(elapsed, 1e-9):,.0f} events/s), peak memory {peak_memory()}")
+    if columns:
+        print(f"\nColumns ({len(columns)}):")
+        for key, count in columns.items():
+            print(f"  {key:<32}{count:>12,} ({count / events:.0%})")
+    if any(key is not None for key in tally):
+        print(f"\nBy {args.count_by}:")
+        for key, count in tally.most_common():
+            print(f"  {str(key):<32}{count:>12,}")
+    if shown:
+        print("\nFirst events:")
+        for event in shown:
+            print(f"  {json.dumps(event)}")
+    print("=" * 80)
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
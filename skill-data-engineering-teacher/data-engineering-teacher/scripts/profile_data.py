@@ -0,0 +1,707 @@
+#!/usr/bin/env python3
+"""
+Profile datasets and run the data-quality checks in one pass per table.
+
+Rows are read once and transposed into column chunks; every column chunk
+updates that column's profile: null, type, range and format counts,
+distinct values, quantiles and foreign-key membership. This covers the
+null, duplicate, range, referential-integrity and format checks that the
+data-quality exercise writes as separate full-table SQL queries.
+
+Distinct counts are exact up to EXACT_DISTINCT_LIMIT values per column and
+then switch to a HyperLogLog estimate; quantiles come from a KLL sketch,
+so memory per column stays bounded on scaled datasets. Parent key sets for
+referential checks fall back to a Bloom filter beyond PARENT_KEY_LIMIT.
+Approximate figures are marked with '~'.
+
+Key checks (not null, unique) run only on declared keys: TABLE_KEYS for
+the sample datasets, or --key TABLE=COLUMN. Columns named like another
+table's key are checked against it for referential integrity.
+
+--compare-sql loads the same tables into SQLite and runs the equivalent
+checks as one query each, so the counts and timings can be compared.
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import random
+import re
+import sqlite3
+import time
+from collections import Counter
+from datetime import date
+from itertools import islice
+from operator import itemgetter, mul
+from typing import Dict, List, NamedTuple, Optional
+
+from columnar import column_type
+from sample_data import DATASET_DIR, iter_rows, load_table, table_files
+
+CHUNK_ROWS = 50000
+EXACT_DISTINCT_LIMIT = 100000
+PARENT_KEY_LIMIT = 2000000
+HLL_PRECISION = 14            # 16384 registers, ~0.8% standard error
+KLL_K = 200
+QUANTILES = (0.01, 0.25, 0.5, 0.75, 0.99)
+SHAPE_LIMIT = 1000            # stop tracking value shapes for free-text columns
+TOP_LIMIT = 1000              # stop counting top values beyond this many distinct values
+FORMAT_MIN_SHARE = 0.9        # a shape this common defines the column's format
+SAMPLE_VALUES = 5
+
+# Declared key column per dataset. order_events has one row per event, so
+# order_id repeats and the table has no key.
+TABLE_KEYS = {
+    'customer_data': 'customer_id',
+    'product_catalog': 'product_id',
+    'stores': 'store_id',
+    'retail_sales': 'transaction_id',
+}
+
+EMAIL = re.compile(r".+@.+\..{2,}", re.DOTALL)   # same test as LIKE '%_@_%.__%'
+SHAPES = str.maketrans('0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ',
+                       '9' * 10 + 'a' * 26 + 'A' * 26)
+# Runs of one character class collapse, so 'P1100' and 'P101' are both 'A9'
+SHAPE_RUNS = [(re.compile('9+'), '9'), (re.compile('a+'), 'a'), (re.compile('A+'), 'A')]
+NUMERIC_TYPES = {'INTEGER', 'REAL'}
+TEMPORAL_TYPES = {'DATE', 'TIMESTAMP'}
+
+def stable_hash(value) -> int:
+    """64-bit hash that is the same in every process (unlike hash())"""
+    data = value.encode('utf-8') if isinstance(value, str) else repr(value).encode('utf-8')
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'little')
+
+def value_shapes(texts):
+    """Character-class shape of each text ('C001' -> 'A9', '555-0101' -> '9-9')"""
+    # One translate and one pass per pattern over the whole chunk instead of per value
+    joined = '\n'.join(texts).translate(SHAPES)
+    for pattern, replacement in SHAPE_RUNS:
+        joined = pattern.sub(replacement, joined)
+    shapes = joined.split('\n')
+    if len(shapes) != len(texts):   # a value contained a newline
+        shapes = [value_shapes([text.replace('\n', ' ')])[0] for text in texts]
+    return shapes
+
+# Sketches
+
+class HyperLogLog:
+    """Approximate distinct count in 2^precision one-byte registers"""
+
+    def __init__(self, precision=HLL_PRECISION):
+        self.p = precision
+        self.m = 1 << precision
+        self.registers = bytearray(self.m)
+        self.rest_bits = 64 - precision
+
+    def add_hashes(self, hashes):
+        registers, rest_bits = self.registers, self.rest_bits
+        rest_mask = (1 << rest_bits) - 1
+        for h in hashes:
+            index = h >> rest_bits
+            rank = rest_bits - (h & rest_mask).bit_length() + 1
+            if rank > registers[index]:
+                registers[index] = rank
+
+    def update(self, values):
+        self.add_hashes(map(stable_hash, values))
+
+    def merge(self, other):
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def estimate(self) -> float:
+        m = self.m
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            return m * math.log(m / zeros)   # linear counting for small cardinalities
+        return estimate
+
+class QuantileSketch:
+    """KLL sketch: approximate quantiles of a stream in O(k log n) memory
+
+    Level h holds items that each stand for 2^h inputs. When a level is
+    full it is sorted and every other item (random offset) is promoted to
+    the next level. Exact while fewer than k items have been seen.
+    """
+
+    def __init__(self, k=KLL_K, seed=0):
+        self.k = k
+        self.levels: List[list] = [[]]
+        self.n = 0
+        self.rng = random.Random(seed)
+
+    def capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(2, int(self.k * (2 / 3) ** depth))
+
+    def update(self, values):
+        self.levels[0].extend(values)
+        self.n += len(values)
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) >= self.capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append([])
+                items.sort()
+                keep = [items.pop()] if len(items) % 2 else []
+                self.levels[level + 1].extend(items[self.rng.random() < 0.5::2])
+                self.levels[level] = keep
+            level += 1
+
+    def quantiles(self, qs):
+        weighted = sorted((v, 1 << level) for level, items in enumerate(self.levels) for v in items)
+        if not weighted:
+            return [None] * len(qs)
+        total = sum(w for _, w in weighted)
+        results = []
+        for q in qs:
+            target = q * total
+            seen = 0
+            for value, weight in weighted:
+                seen += weight
+                if seen >= target:
+                    break
+            results.append(value)
+        return results
+
+    @property
+    def exact(self):
+        return len(self.levels) == 1
+
+class BloomFilter:
+    """Set membership with no false negatives and ~1% false positives"""
+
+    def __init__(self, capacity, error=0.01):
+        self.bits = max(64, int(-capacity * math.log(error) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        self.array = bytearray((self.bits + 7) // 8)
+
+    def _positions(self, value):
+        h = stable_hash(value)
+        a, b = h & 0xFFFFFFFF, h >> 32
+        return [(a + i * b) % self.bits for i in range(self.hashes)]
+
+    def add(self, value):
+        for position in self._positions(value):
+            self.array[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value):
+        return all(self.array[p >> 3] & (1 << (p & 7)) for p in self._positions(value))
+
+class KeySet:
+    """Parent key values: an exact set that becomes a Bloom filter when large"""
+
+    def __init__(self, limit=PARENT_KEY_LIMIT):
+        self.limit = limit
+        self.values = set()
+        self.bloom: Optional[BloomFilter] = None
+
+    def update(self, values):
+        if self.bloom is None:
+            self.values.update(values)
+            if len(self.values) > self.limit:
+                self.bloom = BloomFilter(self.limit * 10)
+                for value in self.values:
+                    self.bloom.add(value)
+                self.values = set()
+        else:
+            for value in values:
+                self.bloom.add(value)
+
+    def missing(self, values):
+        """Values not in the key set"""
+        keys = self.bloom if self.bloom is not None else self.values
+        return [v for v in values if v not in keys]
+
+    @property
+    def exact(self):
+        return self.bloom is None
+
+# Column profiles
+
+class ColumnProfile:
+    """Statistics and check counts for one column, updated a chunk at a time"""
+
+    def __init__(self, table, name, is_key=False):
+        self.table = table
+        self.name = name
+        self.is_key = is_key
+        self.type = None
+        self.count = 0
+        self.nulls = 0
+        self.type_errors = 0
+        self.error_samples: List[str] = []
+        self.distinct = set()
+        self.hll: Optional[HyperLogLog] = None
+        self.top = Counter()
+        self.quantiles = QuantileSketch()
+        self.minimum = None
+        self.maximum = None
+        self.total = 0.0
+        self.total_squares = 0.0
+        self.numeric_count = 0
+        self.negatives = 0
+        self.future = 0
+        self.min_length = None
+        self.max_length = None
+        self.shapes: Optional[Counter] = Counter()
+        self.email_errors = 0 if 'email' in name.lower() else None
+        self.reference = None        # (parent table, parent column, KeySet)
+        self.orphans = 0
+        self.orphan_samples: List[str] = []
+
+    def add_nulls(self, n):
+        """Account for rows read before this column first appeared"""
+        self.count += n
+        self.nulls += n
+
+    def update(self, values, today):
+        self.count += len(values)
+        present = [v for v in values if v is not None and v != '']
+        self.nulls += len(values) - len(present)
+        if not present:
+            return
+        kinds = set(map(type, present))
+        if dict in kinds or list in kinds:
+            present = [json.dumps(v) if isinstance(v, (dict, list)) else v for v in present]
+        if self.type is None:
+            self.type = column_type(present)
+        self._update_distinct(present)
+        if self.type in NUMERIC_TYPES:
+            self._update_numeric(present)
+        elif self.type in TEMPORAL_TYPES:
+            self._update_temporal(present, today)
+        else:
+            self._update_text([v if isinstance(v, str) else str(v) for v in present])
+        if self.reference is not None:
+            missing = self.reference[2].missing(present)
+            self.orphans += len(missing)
+            for value in missing:
+                if len(self.orphan_samples) >= SAMPLE_VALUES:
+                    break
+                if value not in self.orphan_samples:
+                    self.orphan_samples.append(value)
+
+    def _update_distinct(self, present):
+        if self.hll is None:
+            self.distinct.update(present)
+            if self.top is not None:
+                self.top.update(present)
+                if len(self.top) > TOP_LIMIT:
+                    self.top = None   # only low-cardinality columns report top values
+            if len(self.distinct) > EXACT_DISTINCT_LIMIT:
+                self.hll = HyperLogLog()
+                self.hll.update(self.distinct)
+                self.distinct = set()
+        else:
+            self.hll.update(present)
+
+    def _update_numeric(self, present):
+        try:
+            numbers = list(map(float, present))
+        except (TypeError, ValueError):
+            numbers = []
+            for value in present:
+                try:
+                    numbers.append(float(value))
+                except (TypeError, ValueError):
+                    self._type_error(value)
+        if not numbers:
+            return
+        self.numeric_count += len(numbers)
+        low, high = min(numbers), max(numbers)
+        self.total += sum(numbers)
+        self.total_squares += sum(map(mul, numbers, numbers))
+        if low < 0:
+            self.negatives += sum(1 for x in numbers if x < 0)
+        self.minimum = low if self.minimum is None else min(self.minimum, low)
+        self.maximum = high if self.maximum is None else max(self.maximum, high)
+        self.quantiles.update(numbers)
+
+    def _update_temporal(self, present, today):
+        # ISO dates and timestamps order correctly as text
+        values = [str(v) for v in present]
+        low, high = min(values), max(values)
+        self.minimum = low if self.minimum is None else min(self.minimum, low)
+        self.maximum = high if self.maximum is None else max(self.maximum, high)
+        self.future += sum(1 for v in values if v[:10] > today)
+
+    def _update_text(self, texts):
+        lengths = list(map(len, texts))
+        low, high = min(lengths), max(lengths)
+        self.min_length = low if self.min_length is None else min(self.min_length, low)
+        self.max_length = high if self.max_length is None else max(self.max_length, high)
+        if self.shapes is not None:
+            self.shapes.update(value_shapes(texts))
+            if len(self.shapes) > SHAPE_LIMIT:
+                self.shapes = None
+        if self.email_errors is not None:
+            self.email_errors += sum(1 for text in texts if not EMAIL.fullmatch(text))
+
+    def _type_error(self, value):
+        self.type_errors += 1
+        if len(self.error_samples) < SAMPLE_VALUES:
+            self.error_samples.append(str(value))
+
+    # Results
+
+    @property
+    def non_null(self):
+        return self.count - self.nulls
+
+    @property
+    def distinct_exact(self):
+        return self.hll is None
+
+    @property
+    def distinct_count(self):
+        return len(self.distinct) if self.hll is None else round(self.hll.estimate())
+
+    @property
+    def duplicates(self):
+        return max(0, self.non_null - self.distinct_count)
+
+    @property
+    def format(self):
+        """(dominant shape, values not matching it) when one shape covers most code-like values"""
+        if not self.shapes or self.type in NUMERIC_TYPES | TEMPORAL_TYPES | {'BOOLEAN'}:
+            return None
+        shape, count = self.shapes.most_common(1)[0]
+        total = sum(self.shapes.values())
+        # Only code-like values (ids, phones, zips) have a format; names and free text vary
+        if '9' in shape and (count == total or count >= FORMAT_MIN_SHARE * total):
+            return shape, total - count
+        return None
+
+    def stats(self):
+        result = {
+            'type': self.type or 'EMPTY',
+            'count': self.count,
+            'nulls': self.nulls,
+            'distinct': self.distinct_count,
+            'distinct_exact': self.distinct_exact,
+        }
+        if self.numeric_count:
+            mean = self.total / self.numeric_count
+            variance = max(0.0, self.total_squares / self.numeric_count - mean * mean)
+            number = int if self.type == 'INTEGER' else float
+            quantiles = [number(q) for q in self.quantiles.quantiles(QUANTILES)]
+            result.update(min=number(self.minimum), max=number(self.maximum), mean=mean,
+                          stddev=math.sqrt(variance),
+                          quantiles=dict(zip((f"p{round(q * 100):02d}" for q in QUANTILES), quantiles)),
+                          quantiles_exact=self.quantiles.exact)
+        elif self.minimum is not None:
+            result.update(min=self.minimum, max=self.maximum)
+        if self.min_length is not None:
+            result.update(min_length=self.min_length, max_length=self.max_length)
+        if self.format:
+            result['format'] = self.format[0]
+        if self.top:
+            result['top'] = self.top.most_common(3)
+        return result
+
+class Check(NamedTuple):
+    table: str
+    column: str
+    check: str         # null, duplicate, type, range, referential, format
+    failures: int
+    exact: bool
+    detail: str
+
+def column_checks(profile: ColumnProfile) -> List[Check]:
+    """The exercise's quality checks, evaluated from one column profile"""
+    p = profile
+    checks = []
+    add = lambda check, failures, detail, exact=True: checks.append(
+        Check(p.table, p.name, check, failures, exact, detail))
+    if p.is_key:
+        add('null', p.nulls, "key column")
+        add('duplicate', p.duplicates, "key column", p.distinct_exact)
+    if p.type_errors:
+        add('type', p.type_errors, f"not {p.type}: {', '.join(p.error_samples)}")
+    if p.type in NUMERIC_TYPES:
+        add('range', p.negatives, "negative values")
+    if p.type in TEMPORAL_TYPES:
+        add('range', p.future, "dates in the future")
+    if p.reference is not None:
+        parent, parent_column, keys = p.reference
+        samples = f": {', '.join(map(str, p.orphan_samples))}" if p.orphan_samples else ''
+        add('referential', p.orphans, f"not in {parent}.{parent_column}{samples}", keys.exact)
+    if p.email_errors is not None:
+        add('format', p.email_errors, "invalid email")
+    elif p.format and p.format[1]:
+        add('format', p.format[1], f"values not shaped like {p.format[0]}")
+    return checks
+
+# Tables
+
+class TableProfile:
+    def __init__(self, name, key=None):
+        self.name = name
+        self.key = key
+        self.rows = 0
+        self.columns: Dict[str, ColumnProfile] = {}
+        self.elapsed_ms = 0.0
+
+def batches(rows, size):
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+def header(files, rows=1000):
+    """Column names seen in the first rows of a table, in order"""
+    names = {}
+    for row in islice((row for path in files for row in iter_rows(path)), rows):
+        names.update(dict.fromkeys(row))
+    return list(names)
+
+def find_relationships(tables, keys) -> Dict[str, Dict[str, tuple]]:
+    """{child table: {column: (parent table, key column)}} by matching key column names
+
+    keys maps tables to their declared key column; a table with a column of
+    that name references it. Only tables that reference nothing themselves
+    (dimensions) are treated as parents, so a fact table's key is not
+    matched against same-named columns of other facts.
+    """
+    columns = {name: header(files) for name, files in tables.items()}
+    candidates = {}
+    for parent, key in keys.items():
+        for child, names in columns.items():
+            if child != parent and key in names and keys.get(child) != key:
+                candidates.setdefault(child, {})[key] = (parent, key)
+    return {
+        child: {column: (parent, key) for column, (parent, key) in refs.items() if parent not in candidates}
+        for child, refs in candidates.items()
+    }
+
+def profile_table(name, files, key=None, references=None, collect_key=None, chunk_rows=CHUNK_ROWS,
+                  today=None):
+    """Profile one table in a single pass
+
+    key: declared key column, checked for nulls and duplicates; None skips key checks
+    references: {column: (parent table, parent column, KeySet)} to check
+    collect_key: KeySet to fill with this table's key column values
+    """
+    today = today or date.today().isoformat()
+    table = TableProfile(name, key)
+    start = time.perf_counter()
+    rows = (row for path in files for row in iter_rows(path))
+    for batch in batches(rows, chunk_rows):
+        names = dict.fromkeys(batch[0])
+        for row in batch:
+            if not names.keys() >= row.keys():
+                names.update(dict.fromkeys(row))
+        for column in names:
+            profile = table.columns.get(column)
+            if profile is None:
+                profile = ColumnProfile(name, column, is_key=column == key)
+                profile.add_nulls(table.rows)
+                if references and column in references:
+                    profile.reference = references[column]
+                table.columns[column] = profile
+            try:
+                values = list(map(itemgetter(column), batch))
+            except KeyError:   # sparse rows (JSON events)
+                values = [row.get(column) for row in batch]
+            profile.update(values, today)
+            if collect_key is not None and profile.is_key:
+                collect_key.update([v for v in values if v is not None and v != ''])
+        # Columns absent from every row of this chunk
+        for column, profile in table.columns.items():
+            if column not in names:
+                profile.add_nulls(len(batch))
+        table.rows += len(batch)
+    table.elapsed_ms = (time.perf_counter() - start) * 1000
+    return table
+
+def profile_tables(tables, keys=None, chunk_rows=CHUNK_ROWS, today=None) -> List[TableProfile]:
+    """Profile every table, parents before the tables that reference them
+
+    keys maps tables to their key column (default TABLE_KEYS); tables
+    without one get no key checks and are never parents.
+    """
+    keys = {name: column for name, column in (TABLE_KEYS if keys is None else keys).items() if name in tables}
+    relationships = find_relationships(tables, keys)
+    parents = {parent for refs in relationships.values() for parent, _ in refs.values()}
+    order = [t for t in tables if t in parents] + [t for t in tables if t not in parents]
+    key_sets = {parent: KeySet() for parent in parents}
+    results = []
+    for name in order:
+        references = {
+            column: (parent, key, key_sets[parent])
+            for column, (parent, key) in relationships.get(name, {}).items()
+        }
+        results.append(profile_table(name, tables[name], keys.get(name), references, key_sets.get(name),
+                                     chunk_rows, today))
+    return sorted(results, key=lambda t: list(tables).index(t.name))
+
+# SQL comparison
+
+def sql_checks(profiles: List[TableProfile]):
+    """(Check, SQL) pairs: one full-table query per check, as in the exercise"""
+    pairs = []
+    for table in profiles:
+        for profile in table.columns.values():
+            for check in column_checks(profile):
+                t, c = f'"{check.table}"', f'"{check.column}"'
+                if check.check == 'null':
+                    sql = f"SELECT COUNT(*) FROM {t} WHERE {c} IS NULL"
+                elif check.check == 'duplicate':
+                    sql = f"SELECT COUNT({c}) - COUNT(DISTINCT {c}) FROM {t}"
+                elif check.check == 'range' and profile.type in NUMERIC_TYPES:
+                    sql = f"SELECT COUNT(*) FROM {t} WHERE {c} < 0"
+                elif check.check == 'range':
+                    sql = f"SELECT COUNT(*) FROM {t} WHERE SUBSTR({c}, 1, 10) > DATE('now', 'localtime')"
+                elif check.check == 'referential':
+                    parent, key, _ = profile.reference
+                    sql = (f'SELECT COUNT(*) FROM {t} child LEFT JOIN "{parent}" parent '
+                           f'ON child.{c} = parent."{key}" '
+                           f'WHERE child.{c} IS NOT NULL AND parent."{key}" IS NULL')
+                elif check.check == 'format' and profile.email_errors is not None:
+                    sql = f"SELECT COUNT(*) FROM {t} WHERE {c} NOT LIKE '%_@_%.__%'"
+                else:
+                    continue
+                pairs.append((check, sql))
+    return pairs
+
+def compare_sql(tables, profiles):
+    """Run the checks as SQL queries; returns (load ms, [(check, sql count, ms)])"""
+    conn = sqlite3.connect(':memory:')
+    start = time.perf_counter()
+    for name, files in tables.items():
+        load_table(conn, name, [row for path in files for row in iter_rows(path)])
+    load_ms = (time.perf_counter() - start) * 1000
+    results = []
+    for check, sql in sql_checks(profiles):
+        start = time.perf_counter()
+        count = conn.execute(sql).fetchone()[0]
+        results.append((check, count, (time.perf_counter() - start) * 1000))
+    conn.close()
+    return load_ms, results
+
+# Reporting
+
+def approx(value, exact):
+    text = f"{value:,}" if isinstance(value, int) else str(value)
+    return text if exact else f"~{text}"
+
+def short(value, width=12):
+    if isinstance(value, float):
+        text = f"{value:,.2f}"
+    else:
+        text = str(value)
+    return text if len(text) <= width else text[:width - 1] + '…'
+
+def print_report(profiles, checks):
+    for table in profiles:
+        print(f"\n{table.name}: {table.rows:,} rows, {len(table.columns)} columns, "
+              f"key {table.key or '(none declared)'}, profiled in {table.elapsed_ms:,.0f} ms")
+        print(f"  {'Column':<22}{'Type':<10}{'Nulls':>9}{'Distinct':>12}  {'Min':>12}  {'Max':>12}  Notes")
+        for profile in table.columns.values():
+            s = profile.stats()
+            null_pct = f"{s['nulls'] / s['count']:.0%}" if s['count'] else '-'
+            notes = []
+            if 'quantiles' in s:
+                q = s['quantiles']
+                notes.append(f"median {'' if s['quantiles_exact'] else '~'}{short(q['p50'])}")
+            if 'format' in s:
+                notes.append(f"format {s['format']}")
+            if 'top' in s and s['distinct'] <= min(20, (s['count'] - s['nulls']) // 2):
+                notes.append("top " + ', '.join(f"{short(v, 16)} ({n})" for v, n in s['top']))
+            print(f"  {short(profile.name, 21):<22}{s['type']:<10}{null_pct:>9}"
+                  f"{approx(s['distinct'], s['distinct_exact']):>12}  "
+                  f"{short(s.get('min', '')):>12}  {short(s.get('max', '')):>12}  {'; '.join(notes)}")
+
+    failed = [c for c in checks if c.failures]
+    print(f"\nQuality checks: {len(checks)} run, {len(failed)} failed")
+    for c in failed:
+        print(f"  ❌ {c.table}.{c.column} [{c.check}] {approx(c.failures, c.exact)} rows — {c.detail}")
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Profile datasets and run null/duplicate/range/referential/format checks in one pass")
+    parser.add_argument("--input", default=str(DATASET_DIR),
+                       help="Dataset file, directory of datasets, or generate_data.py output")
+    parser.add_argument("--tables", nargs="+", help="Tables to profile (default: all)")
+    parser.add_argument("--key", action="append", default=[], metavar="TABLE=COLUMN",
+                       help="Declare a table's key column (repeatable; adds to or overrides the "
+                            "sample datasets' keys, an empty COLUMN removes one)")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="Rows per column chunk")
+    parser.add_argument("--compare-sql", action="store_true",
+                       help="Also run each check as its own SQL query in SQLite and compare")
+    parser.add_argument("--format", choices=["text", "json"], default="text", help="Output format")
+
+    args = parser.parse_args()
+
+    tables = table_files(args.input)
+    if args.tables:
+        missing = [t for t in args.tables if t not in tables]
+        if missing:
+            print(f"ERROR: Unknown tables: {', '.join(missing)} (available: {', '.join(tables)})")
+            return 1
+        tables = {t: tables[t] for t in args.tables}
+
+    keys = dict(TABLE_KEYS)
+    for spec in args.key:
+        table, sep, column = spec.partition('=')
+        if not sep or table not in tables:
+            print(f"ERROR: --key expects TABLE=COLUMN for a profiled table, got {spec!r}")
+            return 1
+        if column and column not in header(tables[table]):
+            print(f"ERROR: {table} has no column {column!r}")
+            return 1
+        keys[table] = column or None
+    keys = {table: column for table, column in keys.items() if column}
+
+    start = time.perf_counter()
+    profiles = profile_tables(tables, keys, args.chunk_rows)
+    profile_ms = (time.perf_counter() - start) * 1000
+    checks = [check for table in profiles for p in table.columns.values() for check in column_checks(p)]
+    comparison = compare_sql(tables, profiles) if args.compare_sql else None
+
+    if args.format == 'json':
+        report = {
+            'tables': {
+                t.name: {'rows': t.rows, 'key': t.key, 'elapsed_ms': round(t.elapsed_ms, 1),
+                         'columns': {p.name: p.stats() for p in t.columns.values()}}
+                for t in profiles
+            },
+            'checks': [c._asdict() for c in checks],
+        }
+        if comparison:
+            load_ms, results = comparison
+            report['sql'] = {'load_ms': round(load_ms, 1), 'queries': [
+                {'table': c.table, 'column': c.column, 'check': c.check,
+                 'failures': count, 'profile_failures': c.failures, 'ms': round(ms, 3)}
+                for c, count, ms in results]}
+        print(json.dumps(report, indent=2, default=str))
+        return 1 if any(c.failures for c in checks) else 0
+
+    print("=" * 80)
+    print(f"Data profile: {args.input}")
+    print("=" * 80)
+    print_report(profiles, checks)
+    if comparison:
+        load_ms, results = comparison
+        sql_ms = sum(ms for _, _, ms in results)
+        differ = [(c, count) for c, count, _ in results if count != c.failures]
+        print(f"\nSQL comparison: {len(results)} queries (one table scan each) in {sql_ms:,.1f} ms "
+              f"after loading SQLite in {load_ms:,.0f} ms")
+        print(f"Profile: one pass per table in {profile_ms:,.0f} ms, reading and parsing included")
+        for check, count in differ:
+            marker = "approximate" if not check.exact else "MISMATCH"
+            print(f"  {marker}: {check.table}.{check.column} [{check.check}] "
+                  f"SQL {count:,} vs profile {check.failures:,}")
+        if not differ:
+            print("  All check counts match")
+    print("=" * 80)
+    return 1 if any(c.failures for c in checks) else 0
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,439 @@
+#!/usr/bin/env python3
+"""
+Run exercise solutions and learner submissions against the sample datasets.
+
+Loads assets/sample-datasets into an in-memory SQLite database (plus the
+customers/orders views the exercises query), executes every statement of
+a solution or submission, compares result sets with the reference
+solution, and records execution time, SQLite VM steps and rows scanned.
+
+Warehouse syntax SQLite lacks is bridged where it is cheap to do so:
+`::TYPE` casts are dropped, `CURRENT_TIMESTAMP()` loses its parentheses,
+materialized views become plain views, and DATE_TRUNC, TO_DATE, DATEADD,
+DATEDIFF, IFF and NVL are provided as functions. Statements that still fail are reported, not hidden.
+"""
+
+import argparse
+import json
+import sqlite3
+import statistics
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import List, NamedTuple, Optional
+
+from generate_exercise import EXERCISES
+from sample_data import load_sqlite
+from sql_lexer import tokenize_list
+from sql_tree import parse
+
+# Statements starting with anything else (prose, YAML) are skipped
+SQL_VERBS = {'SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE', 'CREATE', 'ALTER', 'DROP', 'MERGE', 'VALUES'}
+QUERY_VERBS = {'SELECT', 'WITH', 'VALUES'}
+NOT_ALIAS = {'ON', 'USING', 'WHERE', 'GROUP', 'ORDER', 'LEFT', 'RIGHT', 'INNER', 'FULL', 'CROSS',
+             'JOIN', 'LIMIT', 'HAVING', 'UNION', 'NATURAL', 'OUTER'}
+
+PROGRESS_INTERVAL = 10      # VM instructions between progress callbacks
+FLOAT_DIGITS = 6
+
+class StatementResult(NamedTuple):
+    index: int             # 1-based statement number
+    kind: str              # query, command, skipped or error
+    sql: str
+    columns: List[str]
+    rows: list
+    best_ms: float
+    median_ms: float
+    vm_steps: int
+    rows_scanned: int
+    error: Optional[str]
+
+# SQLite functions standing in for warehouse built-ins
+
+def _parse_datetime(value):
+    if value is None:
+        return None
+    text = str(value).replace('Z', '+00:00')
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        return None
+
+def _format_like(original, value):
+    """Render value as a date if the input looked like one, else as a timestamp"""
+    if len(str(original)) <= 10:
+        return value.date().isoformat()
+    return value.isoformat(sep=' ')
+
+def date_trunc(unit, value):
+    ts = _parse_datetime(value)
+    if ts is None:
+        return None
+    unit = unit.lower()
+    if unit == 'year':
+        ts = ts.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
+    elif unit == 'quarter':
+        ts = ts.replace(month=(ts.month - 1) // 3 * 3 + 1, day=1, hour=0, minute=0, second=0, microsecond=0)
+    elif unit == 'month':
+        ts = ts.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    elif unit == 'week':
+        ts = (ts - timedelta(days=ts.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
+    elif unit == 'day':
+        ts = ts.replace(hour=0, minute=0, second=0, microsecond=0)
+    elif unit == 'hour':
+        ts = ts.replace(minute=0, second=0, microsecond=0)
+    elif unit == 'minute':
+        ts = ts.replace(second=0, microsecond=0)
+    return _format_like(value, ts.replace(tzinfo=None))
+
+def to_date(value, fmt=None):
+    if fmt:
+        try:
+            fmt = fmt.replace('YYYY', '%Y').replace('MM', '%m').replace('DD', '%d')
+            return datetime.strptime(str(value), fmt).date().isoformat()
+        except ValueError:
+            return None
+    ts = _parse_datetime(value)
+    return ts.date().isoformat() if ts else None
+
+def dateadd(unit, amount, value):
+    ts = _parse_datetime(value)
+    if ts is None:
+        return None
+    unit = unit.lower()
+    if unit in ('year', 'month'):
+        months = ts.month - 1 + int(amount) * (12 if unit == 'year' else 1)
+        year, month = ts.year + months // 12, months % 12 + 1
+        ts = ts.replace(year=year, month=month, day=min(ts.day, 28))
+    else:
+        ts = ts + timedelta(**{f"{unit}s": int(amount)})
+    return _format_like(value, ts.replace(tzinfo=None))
+
+def datediff(unit, start, end):
+    a, b = _parse_datetime(start), _parse_datetime(end)
+    if a is None or b is None:
+        return None
+    unit = unit.lower()
+    if unit == 'year':
+        return b.year - a.year
+    if unit == 'month':
+        return (b.year - a.year) * 12 + b.month - a.month
+    seconds = (b.replace(tzinfo=None) - a.replace(tzinfo=None)).total_seconds()
+    divisor = {'day': 86400, 'hour': 3600, 'minute': 60, 'second': 1}.get(unit, 86400)
+    return int(seconds // divisor)
+
+SQLITE_FUNCTIONS = [
+    ('DATE_TRUNC', 2, date_trunc),
+    ('TO_DATE', 1, to_date),
+    ('TO_DATE', 2, to_date),
+    ('DATEADD', 3, dateadd),
+    ('DATEDIFF', 3, datediff),
+    ('IFF', 3, lambda condition, a, b: a if condition else b),
+    ('NVL', 2, lambda a, b: b if a is None else a),
+]
+
+def register_functions(conn):
+    for name, nargs, fn in SQLITE_FUNCTIONS:
+        conn.create_function(name, nargs, fn, deterministic=True)
+
+# Statement handling
+
+def translate(sql):
+    """Rewrite warehouse-only syntax in one statement for SQLite"""
+    tokens = tokenize_list(sql)
+    cuts = []
+    for i, t in enumerate(tokens):
+        if t.type == 'op' and t.value == '::' and i + 1 < len(tokens) and tokens[i + 1].type == 'word':
+            end = tokens[i + 1].start + len(tokens[i + 1].value)
+            # ::NUMBER(10,2)
+            if i + 2 < len(tokens) and tokens[i + 2].value == '(':
+                close = next((k for k in range(i + 3, len(tokens)) if tokens[k].value == ')'), None)
+                if close is not None:
+                    end = tokens[close].start + 1
+            cuts.append((t.start, end))
+        elif (t.type == 'word' and t.norm in ('CURRENT_TIMESTAMP', 'CURRENT_DATE')
+              and i + 2 < len(tokens) and tokens[i + 1].value == '(' and tokens[i + 2].value == ')'):
+            cuts.append((tokens[i + 1].start, tokens[i + 2].start + 1))
+        elif t.norm == 'MATERIALIZED' and i and tokens[i - 1].norm == 'CREATE':
+            cuts.append((t.start, tokens[i + 1].start if i + 1 < len(tokens) else t.start + len(t.value)))
+    out = []
+    position = 0
+    for start, end in cuts:
+        out.append(sql[position:start])
+        position = end
+    out.append(sql[position:])
+    return ''.join(out)
+
+def split_statements(sql):
+    """Source text of each statement, comments between statements dropped"""
+    return [sql[s.first.start:s.end] for s in parse(sql).statements]
+
+def table_aliases(sql, tables):
+    """{name or alias: table} for tables referenced in FROM/JOIN clauses"""
+    tokens = tokenize_list(sql)
+    aliases = {}
+    for i, t in enumerate(tokens[:-1]):
+        if t.norm in ('FROM', 'JOIN') or (t.value == ',' and aliases):
+            name = tokens[i + 1]
+            if name.type != 'word' or name.value.lower() not in tables:
+                continue
+            table = name.value.lower()
+            aliases[table] = table
+            k = i + 2
+            if k < len(tokens) and tokens[k].norm == 'AS':
+                k += 1
+            if k < len(tokens) and tokens[k].type == 'word' and tokens[k].norm not in NOT_ALIAS:
+                aliases[tokens[k].value.lower()] = table
+    return aliases
+
+def rows_scanned(conn, sql, row_counts):
+    """Rows read by full scans in the query plan (index searches not counted)"""
+    try:
+        plan = conn.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+    except sqlite3.Error:
+        return 0
+    aliases = table_aliases(sql, row_counts)
+    scanned = 0
+    for row in plan:
+        detail = row[-1]
+        if detail.startswith('SCAN '):
+            name = detail.split()[1].lower()
+            table = aliases.get(name, name)
+            scanned += row_counts.get(table, 0)
+    return scanned
+
+class Harness:
+    """Template database with the sample data, copied fresh for each run"""
+
+    def __init__(self):
+        self.template = sqlite3.connect(':memory:')
+        register_functions(self.template)
+        self.row_counts = load_sqlite(self.template)
+        self.row_counts.update({
+            name: self.template.execute(f'SELECT COUNT(*) FROM "{name}"').fetchone()[0]
+            for name in ('customers', 'orders')
+        })
+
+    def fresh_connection(self):
+        conn = sqlite3.connect(':memory:')
+        self.template.backup(conn)
+        register_functions(conn)
+        return conn
+
+    def run(self, sql, repeat=5):
+        """Execute every statement of sql on a fresh copy of the data"""
+        conn = self.fresh_connection()
+        steps = [0]
+
+        def count_steps():
+            steps[0] += PROGRESS_INTERVAL
+            return 0
+
+        conn.set_progress_handler(count_steps, PROGRESS_INTERVAL)
+        results = []
+        try:
+            for index, text in enumerate(split_statements(sql), 1):
+                tokens = tokenize_list(text)
+                if not tokens or tokens[0].norm not in SQL_VERBS:
+                    results.append(StatementResult(index, 'skipped', text, [], [], 0, 0, 0, 0, None))
+                    continue
+                results.append(self._run_statement(conn, index, text, tokens[0].norm in QUERY_VERBS,
+                                                   repeat, steps))
+        finally:
+            conn.close()
+        return results
+
+    def _run_statement(self, conn, index, text, is_query, repeat, steps):
+        sql = translate(text)
+        # Commands change state, so they run exactly once
+        runs = repeat if is_query else 1
+        timings = []
+        rows = []
+        columns = []
+        vm_steps = 0
+        try:
+            for _ in range(runs):
+                steps[0] = 0
+                start = time.perf_counter()
+                cursor = conn.execute(sql)
+                rows = cursor.fetchall()
+                timings.append((time.perf_counter() - start) * 1000)
+                vm_steps = steps[0]
+                columns = [d[0] for d in cursor.description] if cursor.description else []
+            conn.commit()
+        except sqlite3.Error as e:
+            return StatementResult(index, 'error', text, [], [], 0, 0, 0, 0, str(e))
+        scanned = rows_scanned(conn, sql, self.row_counts) if is_query else 0
+        return StatementResult(index, 'query' if is_query else 'command', text, columns, rows,
+                               round(min(timings), 3), round(statistics.median(timings), 3),
+                               vm_steps, scanned, None)
+
+# Comparison
+
+def normalize_row(row):
+    return tuple(round(v, FLOAT_DIGITS) if isinstance(v, float) else v for v in row)
+
+def has_top_level_order_by(sql):
+    statement = parse(sql).statements
+    if not statement:
+        return False
+    children = statement[0].children
+    return any(getattr(a, 'norm', None) == 'ORDER' and getattr(b, 'norm', None) == 'BY'
+               for a, b in zip(children, children[1:]))
+
+def compare_results(reference, submission):
+    """Compare query result sets pairwise; returns (all match, [messages])"""
+    expected = [r for r in reference if r.kind == 'query']
+    actual = [r for r in submission if r.kind in ('query', 'error')]
+    messages = []
+    ok = True
+    if len(actual) != len(expected):
+        ok = False
+        messages.append(f"Expected {len(expected)} result sets, got {len(actual)}")
+    for n, (ref, sub) in enumerate(zip(expected, actual), 1):
+        if sub.kind == 'error':
+            ok = False
+            messages.append(f"Query {n}: failed - {sub.error}")
+            continue
+        if len(sub.columns) != len(ref.columns):
+            ok = False
+            messages.append(f"Query {n}: expected {len(ref.columns)} columns, got {len(sub.columns)}")
+            continue
+        ref_rows = [normalize_row(r) for r in ref.rows]
+        sub_rows = [normalize_row(r) for r in sub.rows]
+        if has_top_level_order_by(ref.sql):
+            match = ref_rows == sub_rows
+        else:
+            match = Counter(ref_rows) == Counter(sub_rows)
+        if match:
+            messages.append(f"Query {n}: matches reference ({len(sub_rows)} rows)")
+        else:
+            ok = False
+            missing = sum((Counter(ref_rows) - Counter(sub_rows)).values())
+            extra = sum((Counter(sub_rows) - Counter(ref_rows)).values())
+            detail = f"{missing} missing, {extra} unexpected rows" if missing or extra else "row order differs"
+            messages.append(f"Query {n}: differs from reference ({detail})")
+    return ok, messages
+
+# Reporting
+
+def iter_exercises(topic=None, difficulty=None):
+    for topic_name, levels in EXERCISES.items():
+        if topic and topic_name != topic:
+            continue
+        for level, exercises in levels.items():
+            if difficulty and level != difficulty:
+                continue
+            for number, exercise in enumerate(exercises, 1):
+                yield topic_name, level, number, exercise
+
+def result_summary(results):
+    return {
+        'statements': len(results),
+        'executed': sum(r.kind in ('query', 'command') for r in results),
+        'errors': sum(r.kind == 'error' for r in results),
+        'skipped': sum(r.kind == 'skipped' for r in results),
+        'best_ms': round(sum(r.best_ms for r in results), 3),
+        'vm_steps': sum(r.vm_steps for r in results),
+        'rows_scanned': sum(r.rows_scanned for r in results),
+    }
+
+def result_record(result):
+    record = result._asdict()
+    record['rows'] = len(result.rows)
+    record['sql'] = ' '.join(result.sql.split())[:120]
+    return record
+
+def print_results(label, results):
+    summary = result_summary(results)
+    print(f"\n{label}")
+    print("-" * 80)
+    for r in results:
+        first_line = ' '.join(r.sql.split())[:60]
+        if r.kind == 'skipped':
+            continue
+        if r.kind == 'error':
+            print(f"  {r.index:>2}. ERROR    {first_line}")
+            print(f"      {r.error}")
+        else:
+            print(f"  {r.index:>2}. {r.kind.upper():<8} {first_line}")
+            if r.kind == 'query':
+                print(f"      {len(r.rows)} rows | {r.best_ms:.3f} ms best, {r.median_ms:.3f} ms median | "
+                      f"{r.vm_steps} VM steps | {r.rows_scanned} rows scanned")
+    print(f"  Executed {summary['executed']}/{summary['statements']} statements, "
+          f"{summary['errors']} errors, {summary['skipped']} skipped")
+
+def main():
+    parser = argparse.ArgumentParser(description="Run exercise solutions and submissions against the sample datasets")
+    parser.add_argument("--topic", choices=list(EXERCISES.keys()), help="Only this exercise topic")
+    parser.add_argument("--difficulty", choices=["beginner", "intermediate", "advanced"],
+                       help="Only this difficulty")
+    parser.add_argument("--exercise", type=int, default=1,
+                       help="Exercise number within topic/difficulty for submissions (default: 1)")
+    parser.add_argument("--submission", help="File with the learner's SQL to compare with the reference")
+    parser.add_argument("--query", help="Learner SQL given inline")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per query (default: 5)")
+    parser.add_argument("--format", default="text", choices=["text", "json"], help="Output format")
+
+    args = parser.parse_args()
+    harness = Harness()
+
+    if args.submission or args.query:
+        if not args.topic or not args.difficulty:
+            parser.error("--topic and --difficulty are required with a submission")
+        exercises = EXERCISES[args.topic].get(args.difficulty, [])
+        if not 1 <= args.exercise <= len(exercises):
+            parser.error(f"No exercise {args.exercise} for {args.topic}/{args.difficulty}")
+        exercise = exercises[args.exercise - 1]
+        if args.submission:
+            with open(args.submission, 'r', encoding='utf-8') as f:
+                submission_sql = f.read()
+        else:
+            submission_sql = args.query
+
+        reference = harness.run(exercise['solution'], args.repeat)
+        submission = harness.run(submission_sql, args.repeat)
+        ok, messages = compare_results(reference, submission)
+        ref_summary, sub_summary = result_summary(reference), result_summary(submission)
+
+        if args.format == 'json':
+            print(json.dumps({
+                'exercise': exercise['title'],
+                'match': ok,
+                'messages': messages,
+                'reference': {'summary': ref_summary, 'statements': [result_record(r) for r in reference]},
+                'submission': {'summary': sub_summary, 'statements': [result_record(r) for r in submission]},
+            }, indent=2, default=str))
+        else:
+            print(f"\n{'='*80}\nExercise: {exercise['title']}\n{'='*80}")
+            print_results("REFERENCE SOLUTION", reference)
+            print_results("YOUR SUBMISSION", submission)
+            print(f"\n{'✅ RESULTS MATCH' if ok else '❌ RESULTS DIFFER'}")
+            for message in messages:
+                print(f"  - {message}")
+            print(f"\nRuntime: yours {sub_summary['best_ms']:.3f} ms vs reference {ref_summary['best_ms']:.3f} ms "
+                  f"| VM steps {sub_summary['vm_steps']} vs {ref_summary['vm_steps']} "
+                  f"| rows scanned {sub_summary['rows_scanned']} vs {ref_summary['rows_scanned']}")
+            print("=" * 80)
+        return 0 if ok else 1
+
+    report = []
+    for topic, level, number, exercise in iter_exercises(args.topic, args.difficulty):
+        results = harness.run(exercise.get('solution', ''), args.repeat)
+        report.append((f"{topic} / {level} #{number}: {exercise['title']}", results))
+
+    if args.format == 'json':
+        print(json.dumps([
+            {'exercise': label, 'summary': result_summary(results),
+             'statements': [result_record(r) for r in results]}
+            for label, results in report
+        ], indent=2, default=str))
+    else:
+        print(f"\nSample data: " + ", ".join(f"{name} ({count} rows)" for name, count in harness.row_counts.items()))
+        for label, results in report:
+            print_results(label, results)
+        print()
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Access to the sample datasets in assets/sample-datasets.
+
+Reads the CSV and JSON files (and generate_data.py output) as rows of
+dicts, infers SQL column types, and loads them into SQLite together with
+the exercise views (customers, orders) that the solutions in
+generate_exercise.py query.
+"""
+
+import csv
+import json
+import re
+from pathlib import Path
+from typing import Dict, List
+
+from json_stream import iter_records
+
+DATASET_DIR = Path(__file__).resolve().parent.parent / "assets" / "sample-datasets"
+
+INTEGER_VALUE = re.compile(r"-?(0|[1-9]\d*)")
+REAL_VALUE = re.compile(r"-?\d+\.\d+")
+
+# Tables named in the exercises, defined over the sample datasets
+EXERCISE_VIEWS = {
+    'customers': """
+        SELECT customer_id, customer_name AS name, email, phone, address, city, state,
+               zip_code, signup_date, loyalty_tier, last_purchase_date
+        FROM customer_data""",
+    'orders': """
+        SELECT order_id, customer_id, event_timestamp AS order_timestamp,
+               DATE(event_timestamp) AS order_date, order_amount AS total_amount, payment_method
+        FROM order_events
+        WHERE event_type = 'ORDER_PLACED'""",
+}
+
+def dataset_paths(dataset_dir=DATASET_DIR):
+    """{table name: path} for every CSV/JSON dataset, named by file stem"""
+    return {
+        path.stem: path for path in sorted(Path(dataset_dir).iterdir())
+        if path.suffix in ('.csv', '.json')
+    }
+
+def read_dataset(path):
+    """Rows of a CSV file or a JSON array file as dicts"""
+    path = Path(path)
+    if path.suffix == '.csv':
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            return list(csv.DictReader(f))
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def iter_rows(path):
+    """Rows of a CSV, JSON array or JSON Lines file as dicts, streamed"""
+    path = Path(path)
+    if path.suffix == '.csv':
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            yield from csv.DictReader(f)
+    else:
+        yield from iter_records(path)
+
+def table_files(path=DATASET_DIR) -> Dict[str, List[Path]]:
+    """{table: [files]} for a dataset file, a directory of datasets, or generate_data.py output"""
+    path = Path(path)
+    if path.is_file():
+        return {path.stem: [path]}
+    manifest = path / 'manifest.json'
+    if manifest.exists():
+        with open(manifest, 'r', encoding='utf-8') as f:
+            datasets = json.load(f)['datasets']
+        return {name: [path / file for file in entry['files']] for name, entry in datasets.items()}
+    return {name: [file] for name, file in dataset_paths(path).items()}
+
+def column_names(rows):
+    """Union of keys across rows, in first-seen order"""
+    names = {}
+    for row in rows:
+        for name in row:
+            names.setdefault(name, None)
+    return list(names)
+
+def infer_type(values):
+    """SQL type for a column from its non-empty values"""
+    if not values:
+        return 'TEXT'
+    if all(isinstance(v, bool) for v in values):
+        return 'BOOLEAN'
+    if all(isinstance(v, int) and not isinstance(v, bool)
+           or isinstance(v, str) and INTEGER_VALUE.fullmatch(v) for v in values):
+        return 'INTEGER'
+    if all(isinstance(v, (int, float)) and not isinstance(v, bool)
+           or isinstance(v, str) and (INTEGER_VALUE.fullmatch(v) or REAL_VALUE.fullmatch(v)) for v in values):
+        return 'REAL'
+    return 'TEXT'
+
+def infer_schema(rows) -> Dict[str, str]:
+    """{column: SQL type} for rows"""
+    return {
+        name: infer_type([row[name] for row in rows if row.get(name) not in (None, '')])
+        for name in column_names(rows)
+    }
+
+def convert(value, sql_type):
+    """Python value for SQLite from a dataset value"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    if sql_type == 'BOOLEAN':
+        return int(value)
+    if sql_type == 'INTEGER':
+        return int(value)
+    if sql_type == 'REAL':
+        return float(value)
+    return value
+
+def load_table(conn, name, rows):
+    """Create table `name` from rows and insert them; returns the schema"""
+    schema = infer_schema(rows)
+    columns = ', '.join(f'"{column}" {sql_type}' for column, sql_type in schema.items())
+    conn.execute(f'DROP TABLE IF EXISTS "{name}"')
+    conn.execute(f'CREATE TABLE "{name}" ({columns})')
+    placeholders = ', '.join('?' * len(schema))
+    conn.executemany(
+        f'INSERT INTO "{name}" VALUES ({placeholders})',
+        ([convert(row.get(column), sql_type) for column, sql_type in schema.items()] for row in rows)
+    )
+    return schema
+
+def load_sqlite(conn, dataset_dir=DATASET_DIR, views=True) -> Dict[str, int]:
+    """Load every sample dataset into conn; returns {table: row count}"""
+    counts = {}
+    for name, path in dataset_paths(dataset_dir).items():
+        rows = read_dataset(path)
+        load_table(conn, name, rows)
+        counts[name] = len(rows)
+    if views:
+        for name, query in EXERCISE_VIEWS.items():
+            conn.execute(f'DROP VIEW IF EXISTS "{name}"')
+            conn.execute(f'CREATE VIEW "{name}" AS {query}')
+    conn.commit()
+    return counts
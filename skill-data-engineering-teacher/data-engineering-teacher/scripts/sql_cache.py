@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Persistent cache of SQL validation results.
+
+Entries are keyed by (normalized statement hash, dialect, rule-set
+version) and stored in SQLite, so unchanged statements are not
+re-validated between runs. The statement text is normalized to its token
+values plus whether each token touches the previous one (rules such as
+dotted-name checks depend on adjacency), which makes whitespace and
+comment edits that keep tokens apart or together cache hits; findings are
+stored against token positions within the statement and mapped back to
+the current line/column on the way out. Whole documents are also cached
+by their exact text, so an unchanged file is answered without tokenizing.
+The cache is bounded to `max_entries` rows with least-recently-used
+eviction.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+from sql_rules import Finding
+from sql_tree import Statement
+
+# Default cache location: the per-user cache directory, so runs from any
+# working directory share one cache and never leave files in the checkout
+CACHE_PATH = (Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+              / "data-engineering-teacher" / "sql_validation_cache.sqlite3")
+DEFAULT_MAX_ENTRIES = 200000
+
+# SQLite caps host parameters per statement; stay well below it
+LOOKUP_BATCH = 500
+
+# Recency updates are buffered and written in batches of this size
+TOUCH_BATCH = 1000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    findings TEXT NOT NULL,
+    last_used INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_results_last_used ON results(last_used);
+"""
+
+def statement_key(statement: Statement, dialect: str, ruleset_version: str) -> str:
+    """Cache key for a statement: hash of its token values and adjacency, dialect and rules"""
+    h = hashlib.sha256(f"{dialect}\0{ruleset_version}\0".encode('utf-8'))
+    end = None
+    for token in statement.tokens:
+        # Whether the token directly follows the previous one with nothing between
+        h.update(b'\x1e' if token.start == end else b'\x1f')
+        h.update(token.value.encode('utf-8'))
+        end = token.start + len(token.value)
+    return h.hexdigest()
+
+def document_key(text: str, dialect: str, ruleset_version: str) -> str:
+    """Cache key for a whole document: hash of its exact text, dialect and rules"""
+    data = f"{dialect}\0{ruleset_version}\0".encode('utf-8') + text.encode('utf-8', 'surrogatepass')
+    return 'doc:' + hashlib.sha256(data).hexdigest()
+
+def encode_document_findings(findings: Iterable[Finding]) -> str:
+    return json.dumps([list(f) for f in findings], separators=(',', ':'))
+
+def decode_document_findings(data: str) -> List[Finding]:
+    return [Finding(*row) for row in json.loads(data)]
+
+def encode_findings(statement: Statement, findings: Iterable[Finding]) -> str:
+    """Serialize findings with positions as token indexes into the statement"""
+    positions = {(t.line, t.col): i for i, t in enumerate(statement.tokens)}
+    return json.dumps([
+        [f.rule, f.severity, f.message, positions.get((f.line, f.col), 0)]
+        for f in findings
+    ], separators=(',', ':'))
+
+def decode_findings(statement: Statement, data: str) -> List[Finding]:
+    """Rebuild findings, taking line/column from the statement's tokens"""
+    findings = []
+    for rule, severity, message, token_index in json.loads(data):
+        token = statement.tokens[min(token_index, len(statement.tokens) - 1)]
+        findings.append(Finding(rule, severity, message, statement.index, token.line, token.col))
+    return findings
+
+class ValidationCache:
+    """SQLite-backed LRU cache of per-statement validation findings"""
+
+    def __init__(self, db_path=CACHE_PATH, max_entries=DEFAULT_MAX_ENTRIES):
+        self.db_path = Path(db_path)
+        self.max_entries = max_entries
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # Bulk validation opens one connection per worker process
+        self.conn = sqlite3.connect(str(self.db_path), timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.hits = 0
+        self.misses = 0
+        self._inserted = 0
+        self._touched = []
+
+    def close(self):
+        self.flush()
+        if self._inserted:
+            self.evict()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def get_many(self, keys: List[str]) -> Dict[str, str]:
+        """Return {key: encoded findings} for cached keys and mark them used"""
+        found = {}
+        for i in range(0, len(keys), LOOKUP_BATCH):
+            batch = keys[i:i + LOOKUP_BATCH]
+            placeholders = ','.join('?' * len(batch))
+            found.update(self.conn.execute(
+                f"SELECT key, findings FROM results WHERE key IN ({placeholders})", batch))
+        if found:
+            now = time.time_ns()
+            self._touched.extend((now, key) for key in found)
+            if len(self._touched) >= TOUCH_BATCH:
+                self.flush()
+        self.hits += len(found)
+        self.misses += len(set(keys)) - len(found)
+        return found
+
+    def get(self, key: str):
+        """Encoded findings for one key, or None"""
+        return self.get_many([key]).get(key)
+
+    def flush(self):
+        """Write buffered recency updates"""
+        if self._touched:
+            with self.conn:
+                self.conn.executemany("UPDATE results SET last_used = ? WHERE key = ?", self._touched)
+            self._touched = []
+
+    def put_many(self, entries: List[Tuple[str, str]]):
+        """Store (key, encoded findings) pairs"""
+        if not entries:
+            return
+        now = time.time_ns()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO results (key, findings, last_used) VALUES (?, ?, ?)",
+                [(key, data, now) for key, data in entries])
+        self._inserted += len(entries)
+        # Counting rows is a table scan, so only check the bound periodically
+        if self._inserted >= max(1, self.max_entries // 10):
+            self.evict()
+
+    def evict(self) -> int:
+        """Drop least recently used rows beyond max_entries; returns rows removed"""
+        self.flush()
+        self._inserted = 0
+        with self.conn:
+            cursor = self.conn.execute(
+                "DELETE FROM results WHERE key IN ("
+                "SELECT key FROM results ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,))
+        return cursor.rowcount
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def stats(self) -> Dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self)}
+
+class MemoryCache:
+    """In-process LRU cache with the ValidationCache interface
+
+    Used by long-running processes (the validation server) that keep
+    results warm between edits without touching disk.
+    """
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self.entries: 'OrderedDict[str, str]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, keys: List[str]) -> Dict[str, str]:
+        found = {}
+        for key in keys:
+            data = self.entries.get(key)
+            if data is not None:
+                self.entries.move_to_end(key)
+                found[key] = data
+        self.hits += len(found)
+        self.misses += len(set(keys)) - len(found)
+        return found
+
+    def get(self, key: str):
+        return self.get_many([key]).get(key)
+
+    def put_many(self, entries: List[Tuple[str, str]]):
+        for key, data in entries:
+            self.entries[key] = data
+            self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def flush(self):
+        pass
+
+    def evict(self) -> int:
+        return 0
+
+    def close(self):
+        pass
+
+    def __len__(self):
+        return len(self.entries)
+
+    def stats(self) -> Dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self)}
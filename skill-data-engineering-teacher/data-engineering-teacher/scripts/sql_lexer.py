@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Single-pass SQL lexer shared by the validation scripts.
+"""
+
+import re
+from typing import Iterator, List, NamedTuple
+
+class Token(NamedTuple):
+    type: str      # word, string, quoted_ident, dollar_string, number, param, op, comment, error
+    value: str     # text exactly as written
+    norm: str      # upper-cased for words, otherwise the value
+    start: int     # offset into the query
+    line: int      # 1-based
+    col: int       # 1-based
+
+# One alternation scanned left to right. Terminated forms are tried before
+# their unterminated fallbacks so an unclosed quote or comment becomes a
+# single 'error' token running to the end of the input.
+TOKEN_PATTERN = re.compile(r"""
+    (?P<ws>\s+)
+  | (?P<line_comment>--[^\n]*)
+  | (?P<block_comment>/\*.*?\*/)
+  | (?P<dollar_string>\$(?P<tag>(?:[A-Za-z_]\w*)?)\$.*?\$(?P=tag)\$)
+  | (?P<string>'(?:[^'\\]|''|\\.)*')
+  | (?P<quoted_ident>"(?:[^"]|"")*"|`[^`]*`)
+  | (?P<unterminated>/\*|\$(?:[A-Za-z_]\w*)?\$|['"`]).*
+  | (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+  | (?P<word>[A-Za-z_][\w$]*)
+  | (?P<param>(?<!:):[A-Za-z_]\w*|@\w+|\$\d+)
+  | (?P<op>::|<>|!=|>=|<=|\|\||=>|->>|->|.)
+""", re.VERBOSE | re.DOTALL)
+
+COMMENT_TYPES = {'line_comment', 'block_comment'}
+
+def tokenize(sql: str, keep_comments: bool = False, start: int = 0) -> Iterator[Token]:
+    """Yield tokens for sql in one left-to-right pass
+
+    Whitespace is dropped; comments are dropped unless keep_comments is
+    set, in which case they are yielded with type 'comment'. Unterminated
+    strings, identifiers and comments yield a single 'error' token.
+    Scanning can resume at `start`, which must be a token boundary;
+    positions stay relative to the whole of sql.
+    """
+    line = sql.count('\n', 0, start) + 1
+    line_start = sql.rfind('\n', 0, start) + 1
+
+    for match in TOKEN_PATTERN.finditer(sql, start):
+        kind = match.lastgroup
+        value = match.group()
+        start = match.start()
+
+        if kind != 'ws':
+            if kind in COMMENT_TYPES:
+                if keep_comments:
+                    yield Token('comment', value, value, start, line, start - line_start + 1)
+            else:
+                if kind == 'unterminated':
+                    kind = 'error'
+                norm = value.upper() if kind == 'word' else value
+                yield Token(kind, value, norm, start, line, start - line_start + 1)
+
+        newlines = value.count('\n')
+        if newlines:
+            line += newlines
+            line_start = start + value.rindex('\n') + 1
+
+def tokenize_list(sql: str) -> List[Token]:
+    """Tokenize into a list, skipping comments"""
+    return list(tokenize(sql))
@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+Pluggable validation rules dispatched from a single walk of the statement tree.
+
+Each rule declares the node types it wants to see (``word:FROM``,
+``op:::``, ``type:error``, ``group``) and is called only for those nodes;
+rules that judge a statement as a whole implement ``finish`` and read the
+counters the parser already gathered. Adding a rule therefore never adds
+another pass over the query.
+"""
+
+import hashlib
+import inspect
+import re
+import sys
+import time
+from typing import Dict, List, NamedTuple, Optional
+
+from sql_tree import Group, Script, Statement
+
+class Finding(NamedTuple):
+    rule: str
+    severity: str          # 'issue' or 'warning'
+    message: str
+    statement: int         # 0-based statement index
+    line: int
+    col: int
+
+class Rule:
+    """Base class for validation rules"""
+
+    name = ''
+    severity = 'warning'
+    dialects = None        # None means every dialect
+    node_types = ()
+
+    def visit(self, node, ctx):
+        """Called for every node matching one of node_types"""
+
+    def finish(self, statement, ctx):
+        """Called once per statement after its walk"""
+
+class WalkContext:
+    """Position and per-rule state while walking one statement"""
+
+    def __init__(self, findings: List[Finding]):
+        self.findings = findings
+        self.statement: Optional[Statement] = None
+        self.siblings = []
+        self.index = 0
+        self.state: Dict[str, dict] = {}
+
+    def peek(self, offset=1):
+        """Sibling node `offset` positions after the current node, or None"""
+        i = self.index + offset
+        return self.siblings[i] if 0 <= i < len(self.siblings) else None
+
+    def state_for(self, rule):
+        return self.state.setdefault(rule.name, {})
+
+    def report(self, rule, message, node=None):
+        node = node or self.statement.first
+        self.findings.append(Finding(rule.name, rule.severity, message,
+                                     self.statement.index, node.line, node.col))
+
+class RuleSet:
+    """Rules for one dialect with their dispatch table"""
+
+    def __init__(self, rules, profile=False):
+        self.rules = rules
+        self.profile = profile
+        self.dispatch: Dict[str, List[Rule]] = {}
+        for rule in rules:
+            for node_type in rule.node_types:
+                self.dispatch.setdefault(node_type, []).append(rule)
+        self.finishers = [rule for rule in rules if type(rule).finish is not Rule.finish]
+        self.timings = {rule.name: 0.0 for rule in rules}
+        self.calls = {rule.name: 0 for rule in rules}
+        self._version = None
+
+    @property
+    def version(self):
+        """Hash of the lexer, tree and rule sources; changes whenever results could
+
+        The whole of this module is hashed, not just the rule classes, since
+        rules depend on its helpers and constants too.
+        """
+        if self._version is None:
+            h = hashlib.sha256()
+            for module in ('sql_lexer', 'sql_tree', __name__):
+                h.update(inspect.getsource(sys.modules[module]).encode('utf-8'))
+            for rule in self.rules:
+                h.update(inspect.getsource(type(rule)).encode('utf-8'))
+            self._version = h.hexdigest()[:16]
+        return self._version
+
+    def _call(self, rule, method, node, ctx):
+        if self.profile:
+            start = time.perf_counter()
+            method(node, ctx)
+            self.timings[rule.name] += time.perf_counter() - start
+            self.calls[rule.name] += 1
+        else:
+            method(node, ctx)
+
+    def _walk(self, children, ctx):
+        dispatch = self.dispatch
+        for i, node in enumerate(children):
+            ctx.siblings, ctx.index = children, i
+            if isinstance(node, Group):
+                for rule in dispatch.get('group', ()):
+                    self._call(rule, rule.visit, node, ctx)
+                self._walk(node.children, ctx)
+            else:
+                for key in (f'{node.type}:{node.norm}', f'type:{node.type}'):
+                    for rule in dispatch.get(key, ()):
+                        self._call(rule, rule.visit, node, ctx)
+
+    def run(self, script: Script) -> List[Finding]:
+        """Walk every statement once, dispatching to the subscribed rules"""
+        findings: List[Finding] = []
+        for statement in script.statements:
+            ctx = WalkContext(findings)
+            ctx.statement = statement
+            self._walk(statement.children, ctx)
+            for rule in self.finishers:
+                self._call(rule, rule.finish, statement, ctx)
+        return findings
+
+class RuleRegistry:
+    """Collects rule classes and builds per-dialect rule sets"""
+
+    def __init__(self):
+        self.rule_classes = []
+
+    def register(self, rule_class):
+        """Class decorator adding a rule to the registry"""
+        self.rule_classes.append(rule_class)
+        return rule_class
+
+    def rules_for(self, dialect):
+        return [cls() for cls in self.rule_classes
+                if cls.dialects is None or dialect in cls.dialects]
+
+    def build(self, dialect, profile=False):
+        return RuleSet(self.rules_for(dialect), profile=profile)
+
+DEFAULT_REGISTRY = RuleRegistry()
+register = DEFAULT_REGISTRY.register
+
+DATE_LITERAL = re.compile(r"'[\d-]+'")
+
+# Keywords that end a WHERE clause at the same nesting level
+CLAUSE_END = {'GROUP', 'ORDER', 'HAVING', 'QUALIFY', 'LIMIT', 'UNION', 'WINDOW', 'INTERSECT', 'EXCEPT'}
+COMPARISON_OPS = {'=', '<', '>', '<=', '>=', '<>', '!='}
+
+def dotted_name(nodes, i):
+    """Parts of a dotted name starting at nodes[i], e.g. my-project.dataset.table
+
+    Parts may contain hyphens; tokens must be contiguous (no whitespace).
+    """
+    parts = []
+    current = ''
+    end = None
+    while i < len(nodes) and not isinstance(nodes[i], Group):
+        t = nodes[i]
+        if end is not None and t.start != end:
+            break
+        if t.type in ('word', 'number', 'quoted_ident') or t.value == '-':
+            current += t.value
+        elif t.value == '.':
+            parts.append(current)
+            current = ''
+        else:
+            break
+        end = t.start + len(t.value)
+        i += 1
+    if current:
+        parts.append(current)
+    return parts
+
+# Syntax
+
+UNTERMINATED_MESSAGES = {
+    "'": "Unmatched single quotes",
+    '"': "Unmatched double-quoted identifier",
+    '`': "Unmatched backtick identifier",
+    '/*': "Unterminated block comment",
+    '$': "Unterminated dollar-quoted string",
+}
+
+@register
+class UnmatchedParentheses(Rule):
+    name = 'unmatched-parentheses'
+    severity = 'issue'
+
+    def finish(self, statement, ctx):
+        if statement.paren_errors:
+            ctx.report(self, "Unmatched parentheses", statement.paren_errors[0])
+
+@register
+class UnterminatedToken(Rule):
+    name = 'unterminated-token'
+    severity = 'issue'
+    node_types = ('type:error',)
+
+    def visit(self, node, ctx):
+        opener = '/*' if node.value.startswith('/*') else node.value[0]
+        ctx.report(self, UNTERMINATED_MESSAGES[opener], node)
+
+@register
+class SelectWithoutFrom(Rule):
+    name = 'select-without-from'
+
+    def finish(self, statement, ctx):
+        words = statement.words
+        if words['SELECT'] and not words['FROM']:
+            if not (words['DUAL'] or words['GENERATE_SERIES'] or any(w.startswith('SEQ') for w in words)):
+                ctx.report(self, "SELECT without FROM clause")
+
+# Snowflake
+
+@register
+class SnowflakeDateLiteral(Rule):
+    name = 'snowflake-date-literal'
+    severity = 'issue'
+    dialects = {'snowflake'}
+    node_types = ('word:WHERE',)
+
+    def visit(self, node, ctx):
+        column, op, literal = ctx.peek(1), ctx.peek(2), ctx.peek(3)
+        if (column is not None and getattr(column, 'type', None) == 'word'
+                and getattr(op, 'value', None) == '>'
+                and getattr(literal, 'type', None) == 'string' and DATE_LITERAL.fullmatch(literal.value)):
+            state = ctx.state_for(self)
+            if not state.get('reported'):
+                state['reported'] = True
+                ctx.report(self, "Consider using TO_DATE() or proper date casting for Snowflake", node)
+
+@register
+class SnowflakeVariantCast(Rule):
+    name = 'snowflake-variant-cast'
+    severity = 'issue'
+    dialects = {'snowflake'}
+
+    def finish(self, statement, ctx):
+        if statement.ops['::'] and not statement.words['VARIANT']:
+            ctx.report(self, "Using :: casting - ensure column is VARIANT type in Snowflake")
+
+# BigQuery
+
+@register
+class BigQueryTableReference(Rule):
+    name = 'bigquery-table-reference'
+    severity = 'issue'
+    dialects = {'bigquery'}
+    node_types = ('word:FROM',)
+
+    def visit(self, node, ctx):
+        state = ctx.state_for(self)
+        state.setdefault('first', node)
+        nxt = ctx.peek(1)
+        if isinstance(nxt, Group) or nxt is None:
+            return
+        if nxt.type == 'quoted_ident' and nxt.value.startswith('`'):
+            state['qualified'] = True
+        elif len(dotted_name(ctx.siblings, ctx.index + 1)) == 3:
+            state['qualified'] = True
+
+    def finish(self, statement, ctx):
+        state = ctx.state_for(self)
+        if statement.words['FROM'] and not state.get('qualified'):
+            ctx.report(self, "BigQuery requires project.dataset.table or backtick notation",
+                       state.get('first'))
+
+@register
+class BigQuerySafeCast(Rule):
+    name = 'bigquery-safe-cast'
+    severity = 'issue'
+    dialects = {'bigquery'}
+    node_types = ('word:CAST',)
+
+    def visit(self, node, ctx):
+        state = ctx.state_for(self)
+        if not state.get('reported'):
+            state['reported'] = True
+            ctx.report(self, "Consider SAFE_CAST in BigQuery to avoid errors with invalid data", node)
+
+# Redshift
+
+@register
+class RedshiftCopyFrom(Rule):
+    name = 'redshift-copy-from'
+    severity = 'issue'
+    dialects = {'redshift'}
+
+    def finish(self, statement, ctx):
+        if statement.words['COPY'] and not statement.words['FROM']:
+            ctx.report(self, "COPY command requires FROM clause in Redshift")
+
+@register
+class RedshiftDistribution(Rule):
+    name = 'redshift-distribution'
+    severity = 'issue'
+    dialects = {'redshift'}
+    node_types = ('word:CREATE',)
+
+    def visit(self, node, ctx):
+        nxt = ctx.peek(1)
+        if getattr(nxt, 'norm', None) == 'TABLE':
+            words = ctx.statement.words
+            if not words['DISTKEY'] and not words['DISTSTYLE']:
+                ctx.report(self, "Consider specifying DISTKEY or DISTSTYLE for Redshift table", node)
+
+# Anti-patterns
+
+@register
+class SelectStar(Rule):
+    name = 'select-star'
+    node_types = ('word:SELECT',)
+
+    def visit(self, node, ctx):
+        if getattr(ctx.peek(1), 'value', None) == '*':
+            state = ctx.state_for(self)
+            if not state.get('reported'):
+                state['reported'] = True
+                ctx.report(self, "Using SELECT * - consider specifying columns explicitly", node)
+
+@register
+class DeleteWithoutWhere(Rule):
+    name = 'delete-without-where'
+
+    def finish(self, statement, ctx):
+        if statement.words['DELETE'] and not statement.words['WHERE']:
+            ctx.report(self, "DELETE without WHERE clause - will delete all rows!")
+
+@register
+class UpdateWithoutWhere(Rule):
+    name = 'update-without-where'
+
+    def finish(self, statement, ctx):
+        if statement.words['UPDATE'] and not statement.words['WHERE']:
+            ctx.report(self, "UPDATE without WHERE clause - will update all rows!")
+
+@register
+class DistinctUsage(Rule):
+    name = 'distinct-usage'
+
+    def finish(self, statement, ctx):
+        if statement.words['DISTINCT']:
+            ctx.report(self, "Using DISTINCT - ensure it's necessary as it can impact performance")
+
+@register
+class JoinCount(Rule):
+    name = 'join-count'
+
+    def finish(self, statement, ctx):
+        join_count = statement.words['JOIN']
+        if join_count > 3:
+            ctx.report(self, f"Query has {join_count} JOINs - ensure join order is optimized")
+
+@register
+class PositionalGroupBy(Rule):
+    name = 'positional-group-by'
+    node_types = ('word:GROUP',)
+
+    def visit(self, node, ctx):
+        by, first = ctx.peek(1), ctx.peek(2)
+        if getattr(by, 'norm', None) == 'BY' and getattr(first, 'type', None) == 'number':
+            state = ctx.state_for(self)
+            if not state.get('reported'):
+                state['reported'] = True
+                ctx.report(self, "Using positional GROUP BY - consider explicit column names for clarity", node)
+
+@register
+class FunctionOnFilterColumn(Rule):
+    """WHERE f(col) <op> ... hides col from partition pruning and clustering"""
+
+    name = 'function-on-filter-column'
+    node_types = ('word:WHERE',)
+
+    def visit(self, node, ctx):
+        siblings = ctx.siblings
+        for i in range(ctx.index + 1, len(siblings) - 2):
+            func, args, op = siblings[i], siblings[i + 1], siblings[i + 2]
+            if getattr(func, 'norm', None) in CLAUSE_END:
+                break
+            if (getattr(func, 'type', None) == 'word' and isinstance(args, Group)
+                    and getattr(op, 'value', None) in COMPARISON_OPS):
+                columns = [child for child in args.children if getattr(child, 'type', None) == 'word']
+                if columns:
+                    ctx.report(self, f"Function {func.value}() on filter column {columns[0].value} "
+                                     f"prevents partition pruning - filter on the raw column", func)
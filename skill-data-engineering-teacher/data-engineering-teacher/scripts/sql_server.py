@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Long-running SQL validation server for editors and notebooks.
+
+Speaks JSON-RPC 2.0, one message per line, over stdio or a local TCP
+socket. Rules are compiled once per dialect and documents are kept open
+between requests with their statement tree: an edit re-parses from the
+statement it starts in, and only statements whose text changed are run
+through the rules again.
+
+Methods:
+    initialize  {dialect}                        -> {dialects, rules, version}
+    open        {uri, text, dialect?}            -> {uri, version, diagnostics, elapsed_ms}
+    change      {uri, changes: [{range?, text}]} -> {uri, version, diagnostics, elapsed_ms}
+    close       {uri}                            -> null
+    validate    {text, dialect?}                 -> {diagnostics, elapsed_ms}
+    stats       {}                               -> {documents, cache}
+    shutdown    {}                               -> null (then the server exits)
+
+Ranges follow LSP: 0-based line and character, end exclusive. A change
+without a range replaces the whole document.
+"""
+
+import argparse
+import json
+import socketserver
+import sys
+import time
+from typing import Dict
+
+from sql_cache import MemoryCache
+from sql_tree import parse, reparse
+from validate_sql import SQLValidator, finding_record
+
+DIALECTS = ("snowflake", "bigquery", "redshift")
+
+# JSON-RPC error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+class RequestError(Exception):
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+def param(params, name, kind, required=True):
+    """params[name] checked against kind; None when optional and absent"""
+    value = params.get(name)
+    if value is None and not required:
+        return None
+    # bool is an int subclass but never a valid position
+    if not isinstance(value, kind) or (kind is int and isinstance(value, bool)):
+        raise RequestError(INVALID_PARAMS, f"{name} must be of type {kind.__name__}")
+    return value
+
+def check_changes(changes):
+    """Validate LSP content changes before any of them is applied"""
+    if not isinstance(changes, list):
+        raise RequestError(INVALID_PARAMS, "changes must be of type list")
+    for change in changes:
+        if not isinstance(change, dict):
+            raise RequestError(INVALID_PARAMS, "each change must be of type dict")
+        param(change, 'text', str)
+        change_range = param(change, 'range', dict, required=False)
+        if change_range is not None:
+            for end in ('start', 'end'):
+                position = param(change_range, end, dict)
+                for field in ('line', 'character'):
+                    if param(position, field, int) < 0:
+                        raise RequestError(INVALID_PARAMS, f"{field} must not be negative")
+    return changes
+
+def offset_at(text, line_starts, position):
+    """Offset of an LSP {line, character} position, clamped to the text"""
+    line = position.get('line', 0)
+    if line >= len(line_starts):
+        return len(text)
+    start = line_starts[line]
+    end = line_starts[line + 1] - 1 if line + 1 < len(line_starts) else len(text)
+    return min(start + position.get('character', 0), end)
+
+def line_offsets(text):
+    starts = [0]
+    index = text.find('\n')
+    while index != -1:
+        starts.append(index + 1)
+        index = text.find('\n', index + 1)
+    return starts
+
+def apply_changes(text, changes):
+    """Apply LSP-style content changes in order
+
+    Returns the new text and the offset before which nothing changed.
+    """
+    first_change = len(text)
+    for change in changes:
+        if 'range' not in change:
+            text = change['text']
+            first_change = 0
+            continue
+        starts = line_offsets(text)
+        start = offset_at(text, starts, change['range']['start'])
+        end = offset_at(text, starts, change['range']['end'])
+        text = text[:start] + change['text'] + text[end:]
+        first_change = min(first_change, start)
+    return text, first_change
+
+class Document:
+    def __init__(self, uri, text, dialect):
+        self.uri = uri
+        self.text = text
+        self.dialect = dialect
+        self.version = 0
+        self.script = parse(text)
+
+    def edit(self, changes):
+        self.text, first_change = apply_changes(self.text, changes)
+        self.script = reparse(self.script, self.text, first_change)
+        self.version += 1
+
+class ValidationServer:
+    """Open documents plus one warm validator per dialect"""
+
+    def __init__(self, dialect='snowflake', cache_size=10000):
+        self.default_dialect = dialect
+        self.cache = MemoryCache(cache_size)
+        self.validators: Dict[str, SQLValidator] = {}
+        self.documents: Dict[str, Document] = {}
+        self.running = True
+
+    def validator(self, dialect):
+        if dialect is not None and not isinstance(dialect, str):
+            raise RequestError(INVALID_PARAMS, "dialect must be of type str")
+        dialect = (dialect or self.default_dialect).lower()
+        if dialect not in DIALECTS:
+            raise RequestError(INVALID_PARAMS, f"Unknown dialect: {dialect}")
+        if dialect not in self.validators:
+            validator = SQLValidator(dialect=dialect, cache=self.cache)
+            validator.rules.version  # hashes rule sources; do it before the first edit
+            self.validators[dialect] = validator
+        return self.validators[dialect]
+
+    def diagnose(self, findings, start):
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        diagnostics = []
+        for finding in findings:
+            record = finding_record(None, finding)
+            del record['file']
+            diagnostics.append(record)
+        return diagnostics, round(elapsed_ms, 3)
+
+    def document(self, params):
+        uri = param(params, 'uri', str)
+        if uri not in self.documents:
+            raise RequestError(INVALID_PARAMS, f"Document not open: {uri}")
+        return self.documents[uri]
+
+    def publish(self, document, start):
+        findings = self.validator(document.dialect).validate_script(document.script)
+        diagnostics, elapsed_ms = self.diagnose(findings, start)
+        return {
+            'uri': document.uri,
+            'version': document.version,
+            'diagnostics': diagnostics,
+            'elapsed_ms': elapsed_ms
+        }
+
+    # Methods
+
+    def initialize(self, params):
+        dialect = param(params, 'dialect', str, required=False)
+        validator = self.validator(dialect)
+        if dialect:
+            self.default_dialect = dialect.lower()
+        return {
+            'dialects': list(DIALECTS),
+            'rules': [{'name': rule.name, 'severity': rule.severity} for rule in validator.rules.rules],
+            'version': validator.rules.version
+        }
+
+    def open(self, params):
+        uri = param(params, 'uri', str)
+        text = param(params, 'text', str)
+        start = time.perf_counter()
+        dialect = param(params, 'dialect', str, required=False) or self.default_dialect
+        self.validator(dialect)
+        document = Document(uri, text, dialect)
+        self.documents[document.uri] = document
+        return self.publish(document, start)
+
+    def change(self, params):
+        start = time.perf_counter()
+        document = self.document(params)
+        document.edit(check_changes(params.get('changes', [])))
+        return self.publish(document, start)
+
+    def close(self, params):
+        self.documents.pop(param(params, 'uri', str), None)
+        return None
+
+    def validate(self, params):
+        text = param(params, 'text', str)
+        start = time.perf_counter()
+        findings = self.validator(params.get('dialect')).validate_detailed(text)
+        diagnostics, elapsed_ms = self.diagnose(findings, start)
+        return {'diagnostics': diagnostics, 'elapsed_ms': elapsed_ms}
+
+    def stats(self, params):
+        return {'documents': len(self.documents), 'cache': self.cache.stats()}
+
+    def shutdown(self, params):
+        self.running = False
+        return None
+
+    METHODS = ('initialize', 'open', 'change', 'close', 'validate', 'stats', 'shutdown')
+
+    def handle(self, message):
+        """Handle one JSON-RPC message; returns the response dict or None for notifications"""
+        request_id = None
+        try:
+            try:
+                request = json.loads(message)
+            except json.JSONDecodeError as e:
+                raise RequestError(PARSE_ERROR, f"Invalid JSON: {e}")
+            if not isinstance(request, dict) or 'method' not in request:
+                raise RequestError(INVALID_REQUEST, "Expected an object with a method")
+            request_id = request.get('id')
+            method = request['method']
+            if method not in self.METHODS:
+                raise RequestError(METHOD_NOT_FOUND, f"Unknown method: {method}")
+            params = request.get('params') or {}
+            if not isinstance(params, dict):
+                raise RequestError(INVALID_PARAMS, "params must be an object")
+            result = getattr(self, method)(params)
+            response = {'jsonrpc': '2.0', 'id': request_id, 'result': result}
+        except RequestError as e:
+            response = {'jsonrpc': '2.0', 'id': request_id, 'error': {'code': e.code, 'message': str(e)}}
+        except Exception as e:
+            # A bug in one request must not take down the server
+            response = {'jsonrpc': '2.0', 'id': request_id,
+                        'error': {'code': INTERNAL_ERROR, 'message': f"Internal error: {type(e).__name__}: {e}"}}
+        # Requests without an id are notifications and get no reply
+        if request_id is None and 'result' in response:
+            return None
+        return response
+
+    def serve(self, reader, writer):
+        """Read messages line by line until shutdown or end of input"""
+        for line in reader:
+            if not line.strip():
+                continue
+            response = self.handle(line)
+            if response is not None:
+                writer.write(json.dumps(response) + "\n")
+                writer.flush()
+            if not self.running:
+                break
+
+class SocketWriter:
+    """Text writer over a socket's binary stream"""
+
+    def __init__(self, wfile):
+        self.wfile = wfile
+
+    def write(self, data):
+        self.wfile.write(data.encode('utf-8'))
+
+    def flush(self):
+        self.wfile.flush()
+
+def serve_tcp(server, host, port):
+    """Serve connections one at a time on a local socket until shutdown"""
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            reader = (line.decode('utf-8') for line in self.rfile)
+            server.serve(reader, SocketWriter(self.wfile))
+
+    socketserver.TCPServer.allow_reuse_address = True
+    with socketserver.TCPServer((host, port), Handler) as tcp:
+        print(f"INFO: Listening on {host}:{tcp.server_address[1]}", file=sys.stderr)
+        while server.running:
+            tcp.handle_request()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve SQL validation over JSON-RPC (stdio or local socket)")
+    parser.add_argument("--dialect", default="snowflake", choices=list(DIALECTS),
+                       help="Default dialect for documents that do not name one")
+    parser.add_argument("--port", type=int,
+                       help="Listen on this local TCP port instead of stdio")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to bind with --port")
+    parser.add_argument("--cache-size", type=int, default=10000,
+                       help="Statements kept warm in memory")
+
+    args = parser.parse_args()
+
+    server = ValidationServer(dialect=args.dialect, cache_size=args.cache_size)
+    server.validator(args.dialect)
+    if args.port is not None:
+        serve_tcp(server, args.host, args.port)
+    else:
+        server.serve(sys.stdin, sys.stdout)
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Statement tree built from the SQL token stream.
+
+The tree is deliberately shallow: a script holds statements (split on
+top-level semicolons), a statement holds tokens and parenthesized groups,
+and groups nest. That is enough structure for rules to reason about
+clauses, function arguments and subqueries without a full SQL grammar.
+"""
+
+from collections import Counter
+from typing import List, Optional, Sequence, Union
+
+from sql_lexer import Token, tokenize
+
+class Group:
+    """A parenthesized sequence of tokens and nested groups"""
+
+    def __init__(self, open_token: Token):
+        self.open = open_token
+        self.close: Optional[Token] = None
+        self.children: List[Union[Token, 'Group']] = []
+
+    @property
+    def start(self):
+        return self.open.start
+
+    @property
+    def line(self):
+        return self.open.line
+
+    @property
+    def col(self):
+        return self.open.col
+
+class Statement:
+    """One statement: its children plus counters gathered while parsing"""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.children: List[Union[Token, Group]] = []
+        self.tokens: List[Token] = []
+        self.words: Counter = Counter()
+        self.ops: Counter = Counter()
+        self.paren_errors: List[Token] = []
+
+    @property
+    def first(self) -> Optional[Token]:
+        return self.tokens[0] if self.tokens else None
+
+    @property
+    def end(self) -> int:
+        last = self.tokens[-1]
+        return last.start + len(last.value)
+
+class Script:
+    """All statements of a query or file"""
+
+    def __init__(self, source: str, statements: List[Statement]):
+        self.source = source
+        self.statements = statements
+
+def parse(sql: str, start: int = 0, keep: Sequence[Statement] = ()) -> Script:
+    """Tokenize sql and build the statement tree in the same pass
+
+    `keep` are already-parsed statements ending before `start`; parsing
+    resumes at `start` and appends to them.
+    """
+    statements = list(keep)
+    statement = Statement(len(statements))
+    stack: List[Group] = []
+
+    def close_statement():
+        nonlocal statement
+        # Groups still open at the end of a statement are unbalanced
+        statement.paren_errors.extend(group.open for group in stack)
+        stack.clear()
+        if statement.tokens:
+            statements.append(statement)
+        statement = Statement(len(statements))
+
+    for token in tokenize(sql, start=start):
+        if token.type == 'op' and token.value == ';' and not stack:
+            close_statement()
+            continue
+
+        statement.tokens.append(token)
+        if token.type == 'word':
+            statement.words[token.norm] += 1
+        elif token.type == 'op':
+            statement.ops[token.value] += 1
+
+        target = stack[-1].children if stack else statement.children
+        if token.type == 'op' and token.value == '(':
+            group = Group(token)
+            target.append(group)
+            stack.append(group)
+        elif token.type == 'op' and token.value == ')':
+            if stack:
+                stack.pop().close = token
+            else:
+                statement.paren_errors.append(token)
+        else:
+            target.append(token)
+
+    close_statement()
+    return Script(sql, statements)
+
+def reparse(script: Script, sql: str, edit_start: int) -> Script:
+    """Parse sql after an edit at edit_start, reusing statements before it
+
+    sql must equal script.source up to edit_start. The last statement
+    ending before the edit is re-parsed too, since the edit may have
+    removed its terminating semicolon.
+    """
+    keep = [s for s in script.statements if s.end < edit_start]
+    if keep:
+        keep.pop()
+    return parse(sql, keep[-1].end if keep else 0, keep)
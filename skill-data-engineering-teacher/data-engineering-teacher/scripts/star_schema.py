@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+Build a star schema from the sample datasets and benchmark it against them.
+
+Loads the datasets (or generate_data.py output) twice into SQLite:
+
+- normalized: the source tables as they are, joined on their text
+  natural keys, with dates as ISO strings
+- star: fact_sales with integer surrogate keys into dim_date,
+  dim_customer, dim_product and dim_store
+
+Surrogate keys are assigned with hash maps from natural key to key. Each
+fact chunk is keyed column by column with one map() of dict lookups per
+dimension, not a lookup query per row. Natural keys missing from their
+dimension (the sample sales reference products P106-P111 that are not in
+the catalog, and there is no stores dataset) become inferred members with
+'Unknown' attributes, and empty keys map to the Unknown member (key 0).
+dim_date is a full calendar with precomputed attributes and smart
+YYYYMMDD keys.
+
+The same analytic questions then run against both schemas. The script
+reports timings, result rows, whether the answers agree, and the storage
+each schema takes.
+"""
+
+import argparse
+import sqlite3
+import time
+from datetime import date, timedelta
+from itertools import islice
+from operator import itemgetter
+from pathlib import Path
+from typing import Dict, List, NamedTuple
+
+from json_stream import peak_memory
+from sample_data import DATASET_DIR, convert, infer_schema, iter_rows, table_files
+
+CHUNK_ROWS = 50000
+UNKNOWN_KEY = 0
+UNKNOWN = 'Unknown'
+FACT_SOURCE = 'retail_sales'
+MEASURES = ['quantity', 'unit_price', 'discount_amount', 'tax_amount', 'total_amount']
+
+class Dimension(NamedTuple):
+    name: str
+    source: str          # source table
+    natural_key: str     # also the fact column referencing it
+    surrogate_key: str
+    attributes: List[str]
+
+DIMENSIONS = [
+    Dimension('dim_customer', 'customer_data', 'customer_id', 'customer_key',
+              ['customer_name', 'city', 'state', 'loyalty_tier', 'signup_date']),
+    Dimension('dim_product', 'product_catalog', 'product_id', 'product_key',
+              ['product_name', 'category', 'subcategory', 'brand', 'unit_price']),
+    Dimension('dim_store', 'stores', 'store_id', 'store_key', ['store_name', 'city', 'state', 'region']),
+]
+
+MONTH_NAMES = ['January', 'February', 'March', 'April', 'May', 'June', 'July', 'August', 'September',
+               'October', 'November', 'December']
+DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+# (title, source tables needed, star query, normalized query)
+QUERIES = [
+    ("Revenue by month and category", {'product_catalog'},
+     """SELECT d.year_month, p.category, SUM(f.quantity) AS units, ROUND(SUM(f.total_amount), 2) AS revenue
+        FROM fact_sales f
+        JOIN dim_date d ON d.date_key = f.date_key
+        JOIN dim_product p ON p.product_key = f.product_key
+        GROUP BY d.year_month, p.category ORDER BY 1, 2""",
+     """SELECT substr(s.transaction_date, 1, 7), COALESCE(p.category, 'Unknown'), SUM(s.quantity),
+               ROUND(SUM(s.total_amount), 2)
+        FROM retail_sales s
+        LEFT JOIN product_catalog p ON p.product_id = s.product_id
+        GROUP BY 1, 2 ORDER BY 1, 2"""),
+    ("Customers and revenue by state and tier", {'customer_data'},
+     """SELECT c.state, c.loyalty_tier, COUNT(DISTINCT f.customer_key) AS customers,
+               ROUND(SUM(f.total_amount), 2) AS revenue
+        FROM fact_sales f
+        JOIN dim_customer c ON c.customer_key = f.customer_key
+        GROUP BY c.state, c.loyalty_tier ORDER BY 1, 2""",
+     """SELECT COALESCE(c.state, 'Unknown'), COALESCE(c.loyalty_tier, 'Unknown'), COUNT(DISTINCT s.customer_id),
+               ROUND(SUM(s.total_amount), 2)
+        FROM retail_sales s
+        LEFT JOIN customer_data c ON c.customer_id = s.customer_id
+        GROUP BY 1, 2 ORDER BY 1, 2"""),
+    ("Weekend vs weekday revenue by brand", {'product_catalog'},
+     """SELECT p.brand, d.is_weekend, COUNT(*) AS transactions, ROUND(SUM(f.total_amount), 2) AS revenue
+        FROM fact_sales f
+        JOIN dim_date d ON d.date_key = f.date_key
+        JOIN dim_product p ON p.product_key = f.product_key
+        GROUP BY p.brand, d.is_weekend ORDER BY 1, 2""",
+     """SELECT COALESCE(p.brand, 'Unknown'), strftime('%w', s.transaction_date) IN ('0', '6'), COUNT(*),
+               ROUND(SUM(s.total_amount), 2)
+        FROM retail_sales s
+        LEFT JOIN product_catalog p ON p.product_id = s.product_id
+        GROUP BY 1, 2 ORDER BY 1, 2"""),
+    ("Top 10 products by first-quarter revenue", {'product_catalog'},
+     """SELECT p.product_id, p.product_name, ROUND(SUM(f.total_amount), 2) AS revenue
+        FROM fact_sales f
+        JOIN dim_date d ON d.date_key = f.date_key
+        JOIN dim_product p ON p.product_key = f.product_key
+        WHERE d.quarter = 1
+        GROUP BY p.product_id, p.product_name ORDER BY 3 DESC, 1 LIMIT 10""",
+     """SELECT s.product_id, COALESCE(p.product_name, 'Unknown'), ROUND(SUM(s.total_amount), 2)
+        FROM retail_sales s
+        LEFT JOIN product_catalog p ON p.product_id = s.product_id
+        WHERE substr(s.transaction_date, 6, 2) IN ('01', '02', '03')
+        GROUP BY s.product_id ORDER BY 3 DESC, 1 LIMIT 10"""),
+    ("Revenue by store region and quarter", {'stores'},
+     """SELECT st.region, d.year, d.quarter, ROUND(SUM(f.total_amount), 2) AS revenue
+        FROM fact_sales f
+        JOIN dim_date d ON d.date_key = f.date_key
+        JOIN dim_store st ON st.store_key = f.store_key
+        GROUP BY st.region, d.year, d.quarter ORDER BY 1, 2, 3""",
+     """SELECT COALESCE(st.region, 'Unknown'), CAST(substr(s.transaction_date, 1, 4) AS INTEGER),
+               (CAST(substr(s.transaction_date, 6, 2) AS INTEGER) + 2) / 3, ROUND(SUM(s.total_amount), 2)
+        FROM retail_sales s
+        LEFT JOIN stores st ON st.store_id = s.store_id
+        GROUP BY 1, 2, 3 ORDER BY 1, 2, 3"""),
+]
+
+def chunks(rows, size=CHUNK_ROWS):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+def table_rows(files):
+    return (row for path in files for row in iter_rows(path))
+
+# Normalized
+
+def load_normalized(conn, tables) -> None:
+    """Each source table as it is, its first column (the natural key) as primary key"""
+    for name, files in tables.items():
+        schema = None
+        for chunk in chunks(table_rows(files)):
+            if schema is None:
+                schema = infer_schema(chunk)
+                columns = ', '.join(f'"{column}" {sql_type}' + (' PRIMARY KEY' if i == 0 else '')
+                                    for i, (column, sql_type) in enumerate(schema.items()))
+                conn.execute(f'DROP TABLE IF EXISTS "{name}"')
+                conn.execute(f'CREATE TABLE "{name}" ({columns})')
+            conn.executemany(
+                f'INSERT OR IGNORE INTO "{name}" VALUES ({", ".join("?" * len(schema))})',
+                ([convert(row.get(column), sql_type) for column, sql_type in schema.items()] for row in chunk))
+    conn.commit()
+
+# Star
+
+def surrogate_keys(values, keys: Dict, inferred: List) -> List[int]:
+    """Surrogate key for each natural key: one pass of dict lookups for the whole column
+
+    Natural keys not in the dimension are added as inferred members (their
+    natural keys collected in `inferred`); empty ones get UNKNOWN_KEY.
+    """
+    mapped = list(map(keys.get, values))
+    if None in mapped:
+        for i, (value, key) in enumerate(zip(values, mapped)):
+            if key is None:
+                if value is None or value == '':
+                    mapped[i] = UNKNOWN_KEY
+                elif value in keys:   # inferred earlier in this chunk
+                    mapped[i] = keys[value]
+                else:
+                    mapped[i] = keys[value] = len(keys) + 1
+                    inferred.append(value)
+    return mapped
+
+def date_key(value):
+    """Smart key YYYYMMDD for an ISO date (or timestamp); UNKNOWN_KEY if it is not one"""
+    try:
+        day = date.fromisoformat(str(value)[:10])
+    except ValueError:
+        return UNKNOWN_KEY
+    return day.year * 10000 + day.month * 100 + day.day
+
+def build_dimension(conn, dimension, files) -> Dict:
+    """Create and load a dimension; returns {natural key: surrogate key}"""
+    columns = [dimension.natural_key] + dimension.attributes
+    conn.execute(f"CREATE TABLE {dimension.name} ({dimension.surrogate_key} INTEGER PRIMARY KEY, "
+                 f"{dimension.natural_key} TEXT NOT NULL UNIQUE, "
+                 f"{', '.join(dimension.attributes)})")
+    conn.execute(f"INSERT INTO {dimension.name} VALUES ({UNKNOWN_KEY}, '{UNKNOWN}'"
+                 f"{f', {chr(39)}{UNKNOWN}{chr(39)}' * len(dimension.attributes)})")
+    keys = {}
+    insert = f"INSERT INTO {dimension.name} VALUES ({', '.join('?' * (len(columns) + 1))})"
+    for chunk in chunks(table_rows(files)):
+        members = []
+        for row in chunk:
+            natural = row.get(dimension.natural_key)
+            if natural in (None, '') or natural in keys:
+                continue
+            keys[natural] = len(keys) + 1
+            members.append([keys[natural]] + [row.get(column) for column in columns])
+        conn.executemany(insert, members)
+    return keys
+
+def build_date_dimension(conn, first, last):
+    """dim_date: one row per calendar day from first to last"""
+    conn.execute("""CREATE TABLE dim_date (date_key INTEGER PRIMARY KEY, full_date TEXT NOT NULL UNIQUE,
+        year INTEGER, quarter INTEGER, month INTEGER, month_name TEXT, year_month TEXT, day_of_month INTEGER,
+        day_of_week INTEGER, day_name TEXT, is_weekend INTEGER)""")
+    conn.execute(f"INSERT INTO dim_date (date_key, full_date) VALUES ({UNKNOWN_KEY}, '{UNKNOWN}')")
+    days = (first + timedelta(days=offset) for offset in range((last - first).days + 1))
+    conn.executemany("INSERT INTO dim_date VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", (
+        (day.year * 10000 + day.month * 100 + day.day, day.isoformat(), day.year, (day.month + 2) // 3,
+         day.month, MONTH_NAMES[day.month - 1], day.isoformat()[:7], day.day, day.isoweekday(),
+         DAY_NAMES[day.weekday()], int(day.weekday() >= 5))
+        for day in days))
+
+def build_star(conn, tables) -> Dict[str, int]:
+    """Create the star schema from source tables; returns {dimension: inferred members added}"""
+    keys = {}
+    for dimension in DIMENSIONS:
+        keys[dimension.name] = build_dimension(conn, dimension, tables.get(dimension.source, []))
+
+    conn.execute(f"""CREATE TABLE fact_sales (transaction_id INTEGER PRIMARY KEY, date_key INTEGER NOT NULL,
+        {', '.join(f'{d.surrogate_key} INTEGER NOT NULL' for d in DIMENSIONS)},
+        quantity INTEGER, unit_price REAL, discount_amount REAL, tax_amount REAL, total_amount REAL)""")
+    inferred = {dimension.name: [] for dimension in DIMENSIONS}
+    date_keys = {}
+    measures = itemgetter(*MEASURES)
+    insert = f"INSERT OR IGNORE INTO fact_sales VALUES ({', '.join('?' * (2 + len(DIMENSIONS) + len(MEASURES)))})"
+    for chunk in chunks(table_rows(tables[FACT_SOURCE])):
+        # Column at a time: one map() per key column over the chunk
+        ids = [row['transaction_id'] for row in chunk]
+        dates = [row['transaction_date'] for row in chunk]
+        for value in set(dates).difference(date_keys):
+            date_keys[value] = date_key(value)
+        key_columns = [list(map(date_keys.__getitem__, dates))]
+        for dimension in DIMENSIONS:
+            naturals = [row.get(dimension.natural_key) for row in chunk]
+            key_columns.append(surrogate_keys(naturals, keys[dimension.name], inferred[dimension.name]))
+        conn.executemany(insert, (
+            (int(transaction_id), *row_keys, *[None if v == '' else v for v in measures(row)])
+            for transaction_id, row_keys, row in zip(ids, zip(*key_columns), chunk)))
+
+    for dimension in DIMENSIONS:
+        members = inferred[dimension.name]
+        conn.executemany(
+            f"INSERT INTO {dimension.name} VALUES ({', '.join('?' * (len(dimension.attributes) + 2))})",
+            ([keys[dimension.name][natural], natural] + [UNKNOWN] * len(dimension.attributes)
+             for natural in members))
+
+    valid = [key for key in date_keys.values() if key != UNKNOWN_KEY]
+    if valid:
+        build_date_dimension(conn, date(min(valid) // 10000, min(valid) // 100 % 100, min(valid) % 100),
+                             date(max(valid) // 10000, max(valid) // 100 % 100, max(valid) % 100))
+    else:
+        build_date_dimension(conn, date.today(), date.today() - timedelta(days=1))
+    conn.commit()
+    return {name: len(members) for name, members in inferred.items()}
+
+# Benchmark
+
+class QueryResult(NamedTuple):
+    title: str
+    rows: int
+    star_seconds: float
+    normalized_seconds: float
+    match: bool
+
+def run_query(conn, sql, repeats):
+    """(rows, best time in seconds over `repeats` runs)"""
+    best = float('inf')
+    rows = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        rows = conn.execute(sql).fetchall()
+        best = min(best, time.perf_counter() - start)
+    return rows, best
+
+def same_rows(a, b):
+    normalize = lambda rows: [tuple(round(v, 2) if isinstance(v, float) else v for v in row) for row in rows]
+    return normalize(a) == normalize(b)
+
+def table_sizes(conn) -> Dict[str, tuple]:
+    """{table: (rows, bytes including its indexes)}"""
+    sizes = {}
+    for table, in conn.execute("SELECT name FROM sqlite_schema WHERE type = 'table' ORDER BY name"):
+        size = conn.execute("SELECT COALESCE(SUM(d.pgsize), 0) FROM dbstat d JOIN sqlite_schema s "
+                            "ON s.name = d.name WHERE s.tbl_name = ?", (table,)).fetchone()[0]
+        sizes[table] = (conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0], size)
+    return sizes
+
+def print_sizes(label, sizes):
+    print(f"\n{label}:")
+    for table, (rows, size) in sizes.items():
+        print(f"  {table:<24}{rows:>14,} rows{size / 1e6:>10.1f} MB")
+    print(f"  {'total':<24}{'':>19}{sum(size for _, size in sizes.values()) / 1e6:>10.1f} MB")
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build a star schema from the sample datasets and compare queries with the normalized source")
+    parser.add_argument("--input", default=str(DATASET_DIR),
+                       help="Dataset directory or generate_data.py output (default: sample datasets)")
+    parser.add_argument("--output", help="Save the star schema to this SQLite file")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per query; the best is reported (default: 3)")
+
+    args = parser.parse_args()
+
+    tables = table_files(args.input)
+    if FACT_SOURCE not in tables:
+        print(f"ERROR: No {FACT_SOURCE} dataset in {args.input}")
+        return 1
+    if args.repeat < 1:
+        print("ERROR: --repeat must be positive")
+        return 1
+    needed = {FACT_SOURCE} | {dimension.source for dimension in DIMENSIONS}
+    tables = {name: files for name, files in tables.items() if name in needed}
+
+    print("=" * 80)
+    print(f"Star schema vs normalized source: {args.input}")
+    print("=" * 80)
+    try:
+        normalized = sqlite3.connect(':memory:')
+        started = time.perf_counter()
+        load_normalized(normalized, tables)
+        normalized_seconds = time.perf_counter() - started
+
+        star = sqlite3.connect(':memory:')
+        started = time.perf_counter()
+        inferred = build_star(star, tables)
+        star_seconds = time.perf_counter() - started
+    except (OSError, ValueError, KeyError, sqlite3.Error) as e:
+        print(f"ERROR: {e}")
+        return 1
+
+    print(f"Normalized load {normalized_seconds:.2f}s, star build {star_seconds:.2f}s")
+    for dimension in DIMENSIONS:
+        if dimension.source not in tables:
+            print(f"INFO: No {dimension.source} dataset; {dimension.name} has only inferred members")
+        elif inferred[dimension.name]:
+            print(f"INFO: {inferred[dimension.name]:,} {dimension.natural_key} values missing from "
+                  f"{dimension.source} added to {dimension.name} as inferred members")
+    print_sizes("Normalized", table_sizes(normalized))
+    print_sizes("Star", table_sizes(star))
+
+    results = []
+    for title, sources, star_sql, normalized_sql in QUERIES:
+        if not sources <= set(tables):
+            print(f"INFO: Skipping '{title}': needs {', '.join(sorted(sources - set(tables)))}")
+            continue
+        star_rows, star_time = run_query(star, star_sql, args.repeat)
+        normalized_rows, normalized_time = run_query(normalized, normalized_sql, args.repeat)
+        results.append(QueryResult(title, len(star_rows), star_time, normalized_time,
+                                   same_rows(star_rows, normalized_rows)))
+
+    print(f"\n{'Query':<42}{'Rows':>6}{'Star ms':>10}{'Normalized ms':>15}{'Speedup':>9}  Match")
+    print("-" * 89)
+    for result in results:
+        print(f"{result.title:<42}{result.rows:>6,}{result.star_seconds * 1000:>10.2f}"
+              f"{result.normalized_seconds * 1000:>15.2f}"
+              f"{result.normalized_seconds / max(result.star_seconds, 1e-9):>8.1f}x  "
+              f"{'yes' if result.match else 'NO'}")
+    print(f"\nPeak memory {peak_memory()}")
+
+    if args.output:
+        Path(args.output).unlink(missing_ok=True)
+        target = sqlite3.connect(args.output)
+        star.backup(target)
+        target.close()
+        print(f"Star schema saved to {args.output}")
+    print("=" * 80)
+    return 0 if all(result.match for result in results) else 1
+
+if __name__ == "__main__":
+    exit(main())
@@ -4,7 +4,18 @@ Validate SQL syntax for common cloud data warehouses.
 """
 
 import argparse
-import re
+import glob
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from sql_cache import (CACHE_PATH, DEFAULT_MAX_ENTRIES, ValidationCache, decode_document_findings,
+                       decode_findings, document_key, encode_document_findings, encode_findings,
+                       statement_key)
+from sql_rules import DEFAULT_REGISTRY, Finding
+from sql_tree import Script, parse
 
 class SQLValidator:
     """Basic SQL syntax validator for cloud warehouses."""
@@ -24,133 +35,282 @@ class SQLValidator:
         'ANALYZE', 'VACUUM'
     }
     
-    def __init__(self, dialect='snowflake'):
+    def __init__(self, dialect='snowflake', profile=False, cache=None):
         self.dialect = dialect.lower()
+        self.rules = DEFAULT_REGISTRY.build(self.dialect, profile=profile)
+        self._rank = {rule.name: i for i, rule in enumerate(self.rules.rules)}
+        self.cache = cache
         
-    def validate(self, query):
-        """Validate SQL query and return issues."""
-        issues = []
-        warnings = []
-        
-        # Basic syntax checks
-        if not query.strip():
-            issues.append("Empty query")
-            return issues, warnings
-            
-        # Check for common syntax errors
-        if query.count('(') != query.count(')'):
-            issues.append("Unmatched parentheses")
-            
-        if query.count("'") % 2 != 0:
-            issues.append("Unmatched single quotes")
-            
-        # Check for SELECT without FROM (except for special cases)
-        if 'SELECT' in query.upper() and 'FROM' not in query.upper():
-            if not any(x in query.upper() for x in ['DUAL', 'GENERATE_SERIES', 'SEQ']):
-                warnings.append("SELECT without FROM clause")
-        
-        # Dialect-specific checks
-        if self.dialect == 'snowflake':
-            issues.extend(self._check_snowflake(query))
-        elif self.dialect == 'bigquery':
-            issues.extend(self._check_bigquery(query))
-        elif self.dialect == 'redshift':
-            issues.extend(self._check_redshift(query))
-            
-        # Common anti-patterns
-        warnings.extend(self._check_anti_patterns(query))
+    def validate_detailed(self, query):
+        """Validate SQL query and return findings with rule, severity and position.
         
-        return issues, warnings
+        The query is parsed once into a statement tree and every registered
+        rule for the dialect is dispatched from a single walk of it.
+        """
+        if self.cache is not None:
+            return self._validate_cached(query)
+        script = parse(query)
+        if not script.statements:
+            return [Finding('empty-query', 'issue', "Empty query", 0, 1, 1)]
+        return self.rules.run(script)
     
-    def _check_snowflake(self, query):
-        """Snowflake-specific validation."""
-        issues = []
+    def _validate_cached(self, query):
+        """Validate with the cache, starting from the whole-document entry
         
-        # Check for DATE formatting
-        if re.search(r"WHERE\s+\w+\s*>\s*'[\d-]+'", query, re.IGNORECASE):
-            issues.append("Consider using TO_DATE() or proper date casting for Snowflake")
+        An unchanged document is answered from its own entry without
+        parsing; otherwise each statement is looked up separately.
+        """
+        doc_key = document_key(query, self.dialect, self.rules.version)
+        data = self.cache.get(doc_key)
+        if data is not None:
+            return decode_document_findings(data)
+        findings = self.validate_script(parse(query))
+        self.cache.put_many([(doc_key, encode_document_findings(findings))])
+        return findings
+    
+    def validate_script(self, script):
+        """Validate an already-parsed script
         
-        # Check for JSON handling
-        if '::' in query and 'VARIANT' not in query.upper():
-            issues.append("Using :: casting - ensure column is VARIANT type in Snowflake")
-            
-        return issues
-    
-    def _check_bigquery(self, query):
-        """BigQuery-specific validation."""
-        issues = []
+        With a cache, rules run only on statements whose results are not
+        cached, so an edit re-validates only the statements it touched.
+        """
+        if not script.statements:
+            return [Finding('empty-query', 'issue', "Empty query", 0, 1, 1)]
+        if self.cache is None:
+            return self.rules.run(script)
         
-        # Check for table naming
-        if re.search(r'FROM\s+[\w-]+\.[\w-]+\.[\w-]+', query):
-            pass  # Correct format: project.dataset.table
-        elif re.search(r'FROM\s+`[^`]+`', query):
-            pass  # Backtick notation
-        elif 'FROM' in query.upper():
-            issues.append("BigQuery requires project.dataset.table or backtick notation")
+        version = self.rules.version
+        keys = [statement_key(s, self.dialect, version) for s in script.statements]
+        cached = self.cache.get_many(keys)
         
-        # Check for SAFE functions
-        if 'CAST' in query.upper() and 'SAFE_CAST' not in query.upper():
-            issues.append("Consider SAFE_CAST in BigQuery to avoid errors with invalid data")
-            
-        return issues
-    
-    def _check_redshift(self, query):
-        """Redshift-specific validation."""
-        issues = []
+        misses = [s for s, key in zip(script.statements, keys) if key not in cached]
+        fresh = {s.index: [] for s in misses}
+        if misses:
+            for finding in self.rules.run(Script(script.source, misses)):
+                fresh[finding.statement].append(finding)
+            self.cache.put_many([
+                (keys[s.index], encode_findings(s, fresh[s.index])) for s in misses
+            ])
         
-        # Check for COPY command structure
-        if 'COPY' in query.upper() and 'FROM' not in query.upper():
-            issues.append("COPY command requires FROM clause in Redshift")
+        findings = []
+        for statement, key in zip(script.statements, keys):
+            if statement.index in fresh:
+                findings.extend(fresh[statement.index])
+            else:
+                findings.extend(decode_findings(statement, cached[key]))
+        return findings
+    
+    def validate(self, query):
+        """Validate SQL query and return issues.
         
-        # Check for distribution keys in CREATE TABLE
-        if 'CREATE TABLE' in query.upper():
-            if 'DISTKEY' not in query.upper() and 'DISTSTYLE' not in query.upper():
-                issues.append("Consider specifying DISTKEY or DISTSTYLE for Redshift table")
-                
-        return issues
-    
-    def _check_anti_patterns(self, query):
-        """Check for common SQL anti-patterns."""
+        Findings are reported per statement; here they are collapsed to one
+        message each, in rule order, as (issues, warnings).
+        """
+        findings = sorted(self.validate_detailed(query),
+                          key=lambda f: (self._rank.get(f.rule, -1), f.statement, f.line, f.col))
+        issues = []
         warnings = []
-        
-        # SELECT *
-        if re.search(r'SELECT\s+\*', query, re.IGNORECASE):
-            warnings.append("Using SELECT * - consider specifying columns explicitly")
-        
-        # No WHERE clause with DELETE or UPDATE
-        if 'DELETE' in query.upper() and 'WHERE' not in query.upper():
-            warnings.append("DELETE without WHERE clause - will delete all rows!")
-            
-        if 'UPDATE' in query.upper() and 'WHERE' not in query.upper():
-            warnings.append("UPDATE without WHERE clause - will update all rows!")
-        
-        # DISTINCT usage
-        if 'DISTINCT' in query.upper():
-            warnings.append("Using DISTINCT - ensure it's necessary as it can impact performance")
-        
-        # Multiple JOINs without explicit order
-        join_count = query.upper().count(' JOIN ')
-        if join_count > 3:
-            warnings.append(f"Query has {join_count} JOINs - ensure join order is optimized")
-        
-        # GROUP BY with column numbers
-        if re.search(r'GROUP BY\s+\d+', query, re.IGNORECASE):
-            warnings.append("Using positional GROUP BY - consider explicit column names for clarity")
-            
-        return warnings
+        for finding in findings:
+            target = issues if finding.severity == 'issue' else warnings
+            if finding.message not in target:
+                target.append(finding.message)
+        return issues, warnings
+    
+    def rule_timings(self):
+        """Per-rule (seconds, calls), slowest first; only filled when profiling"""
+        return sorted(((name, self.rules.timings[name], self.rules.calls[name])
+                       for name in self.rules.timings), key=lambda row: -row[1])
+
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+
+def expand_paths(patterns):
+    """Resolve files, directories (searched for *.sql) and glob patterns"""
+    files = []
+    seen = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = sorted(str(p) for p in Path(pattern).rglob('*.sql'))
+        elif glob.has_magic(pattern):
+            matches = sorted(glob.glob(pattern, recursive=True))
+        else:
+            matches = [pattern]
+        for match in matches:
+            if match not in seen:
+                seen.add(match)
+                files.append(match)
+    return files
+
+_worker_validator = None
+
+def _init_worker(dialect, cache_path=None, cache_size=DEFAULT_MAX_ENTRIES):
+    global _worker_validator
+    cache = ValidationCache(cache_path, cache_size) if cache_path else None
+    _worker_validator = SQLValidator(dialect=dialect, cache=cache)
+
+def validate_file(path):
+    """Validate every statement in one file; returns (path, findings)"""
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            sql = f.read()
+    except OSError as e:
+        return path, [Finding('read-error', 'issue', f"Cannot read file: {e.strerror}", 0, 1, 1)]
+    return path, _worker_validator.validate_detailed(sql)
+
+def validate_files(paths, dialect, workers=None, cache_path=None, cache_size=DEFAULT_MAX_ENTRIES):
+    """Yield (path, findings) per file, in input order
+
+    Files are spread over a process pool; a single worker (or a single
+    file) runs in-process. With cache_path, each worker shares the
+    on-disk validation cache.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(paths) <= 1:
+        _init_worker(dialect, cache_path, cache_size)
+        try:
+            yield from map(validate_file, paths)
+        finally:
+            if _worker_validator.cache is not None:
+                _worker_validator.cache.close()
+        return
+    chunksize = max(1, len(paths) // (workers * 8))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(dialect, cache_path, cache_size)) as executor:
+        yield from executor.map(validate_file, paths, chunksize=chunksize)
+    if cache_path:
+        # Pool workers exit without closing their cache; enforce the bound once here
+        with ValidationCache(cache_path, cache_size) as cache:
+            cache.evict()
+
+def finding_record(path, finding):
+    return {
+        'file': path,
+        'statement': finding.statement + 1,
+        'line': finding.line,
+        'column': finding.col,
+        'rule': finding.rule,
+        'severity': finding.severity,
+        'message': finding.message
+    }
+
+class Tally:
+    """Counts files and findings while results stream through a writer"""
+
+    def __init__(self):
+        self.files = 0
+        self.issues = 0
+        self.warnings = 0
+
+    def findings(self, results):
+        """Flatten (path, findings) results into (path, finding) pairs"""
+        for path, findings in results:
+            self.files += 1
+            for finding in findings:
+                if finding.severity == 'issue':
+                    self.issues += 1
+                else:
+                    self.warnings += 1
+                yield path, finding
+
+def severity_level(severity):
+    return 'error' if severity == 'issue' else 'warning'
+
+def write_jsonl(findings, out, dialect):
+    """One JSON object per finding"""
+    for path, finding in findings:
+        out.write(json.dumps(finding_record(path, finding)) + "\n")
+
+def write_sarif(findings, out, dialect):
+    """A SARIF 2.1.0 log with one result per finding"""
+    results = [{
+        'ruleId': finding.rule,
+        'level': severity_level(finding.severity),
+        'message': {'text': finding.message},
+        'locations': [{
+            'physicalLocation': {
+                'artifactLocation': {'uri': Path(path).as_posix()},
+                'region': {'startLine': finding.line, 'startColumn': finding.col}
+            }
+        }]
+    } for path, finding in findings]
+    rules = [{'id': rule.name, 'defaultConfiguration': {'level': severity_level(rule.severity)}}
+             for rule in DEFAULT_REGISTRY.rules_for(dialect)]
+    log = {
+        '$schema': SARIF_SCHEMA,
+        'version': '2.1.0',
+        'runs': [{
+            'tool': {'driver': {'name': 'validate_sql', 'rules': rules}},
+            'properties': {'dialect': dialect},
+            'results': results
+        }]
+    }
+    json.dump(log, out, indent=2)
+    out.write("\n")
+
+def write_text(findings, out, dialect):
+    """Compiler-style file:line:col: level: message lines"""
+    for path, finding in findings:
+        out.write(f"{path}:{finding.line}:{finding.col}: {severity_level(finding.severity)}: "
+                  f"{finding.message} [{finding.rule}]\n")
+
+WRITERS = {'text': write_text, 'jsonl': write_jsonl, 'sarif': write_sarif}
+
+def run_bulk(args):
+    paths = expand_paths(args.paths)
+    if not paths:
+        print("ERROR: No SQL files matched", file=sys.stderr)
+        return 2
+    
+    tally = Tally()
+    cache_path = None if args.no_cache else args.cache
+    results = validate_files(paths, args.dialect, args.workers, cache_path, args.cache_size)
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        WRITERS[args.format](tally.findings(results), out, args.dialect)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    
+    print(f"Validated {tally.files} files for {args.dialect.upper()}: "
+          f"{tally.issues} errors, {tally.warnings} warnings", file=sys.stderr)
+    return 1 if tally.issues else 0
 
 def main():
     parser = argparse.ArgumentParser(description="Validate SQL syntax for cloud data warehouses")
     parser.add_argument("--query", help="SQL query to validate")
     parser.add_argument("--file", help="File containing SQL query")
+    parser.add_argument("paths", nargs="*",
+                       help="SQL files, directories or glob patterns to validate in bulk")
     parser.add_argument("--dialect", default="snowflake",
                        choices=["snowflake", "bigquery", "redshift"],
                        help="SQL dialect to validate against")
+    parser.add_argument("--list-rules", action="store_true",
+                       help="List the rules registered for the dialect and exit")
+    parser.add_argument("--profile-rules", action="store_true",
+                       help="Report time spent in each rule")
+    parser.add_argument("--format", default="text", choices=["text", "jsonl", "sarif"],
+                       help="Output format for bulk mode")
+    parser.add_argument("--output", help="Write bulk results to this file instead of stdout")
+    parser.add_argument("--workers", type=int,
+                       help="Worker processes for bulk mode (default: CPU count)")
+    parser.add_argument("--cache", default=str(CACHE_PATH),
+                       help=f"Validation cache database (default: {CACHE_PATH})")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_MAX_ENTRIES,
+                       help="Maximum cached statements before LRU eviction")
+    parser.add_argument("--no-cache", action="store_true",
+                       help="Validate every statement without reading or writing the cache")
     
     args = parser.parse_args()
     
+    if args.list_rules:
+        for rule in DEFAULT_REGISTRY.rules_for(args.dialect):
+            print(f"{rule.name:<28} {rule.severity}")
+        return 0
+    
+    if args.paths:
+        return run_bulk(args)
+    
     if not args.query and not args.file:
-        parser.error("Must provide either --query or --file")
+        parser.error("Must provide either --query, --file or paths to validate")
     
     if args.file:
         with open(args.file, 'r') as f:
@@ -158,7 +318,7 @@ def main():
     else:
         query = args.query
     
-    validator = SQLValidator(dialect=args.dialect)
+    validator = SQLValidator(dialect=args.dialect, profile=args.profile_rules)
     issues, warnings = validator.validate(query)
     
     print(f"\nValidating SQL for {args.dialect.upper()}")
@@ -181,6 +341,11 @@ def main():
     
     print("\n" + "="*80)
     
+    if args.profile_rules:
+        print("\nRULE TIMINGS:")
+        for name, seconds, calls in validator.rule_timings():
+            print(f"  {name:<28} {seconds * 1000:8.3f} ms  {calls} calls")
+    
     # Return exit code based on issues
     return 1 if issues else 0
 
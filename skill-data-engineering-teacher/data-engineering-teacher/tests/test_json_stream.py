@@ -0,0 +1,93 @@
+import builtins
+import io
+import json
+from pathlib import Path
+
+import pytest
+
+import json_stream
+from json_stream import iter_json, read_events
+
+SAMPLE_EVENTS = Path(__file__).resolve().parent.parent / "assets" / "sample-datasets" / "order_events.json"
+
+VALUES = [
+    {"id": 1, "amount": 3.25e10, "tags": ["a", "b"], "nested": {"x": -0.5, "y": None}},
+    12345,
+    -7.125e-3,
+    "split \"quoted\" text with \\ and é",
+    True,
+    False,
+    None,
+    [],
+    {},
+    [1, [2, [3]], {"k": 1e5}],
+    0,
+]
+
+def chunked(text, size):
+    return list(iter_json(io.StringIO(text), chunk_size=size))
+
+@pytest.mark.parametrize("size", range(1, 24))
+def test_array_split_at_every_chunk_boundary(size):
+    text = json.dumps(VALUES)
+    assert chunked(text, size) == VALUES
+    assert chunked(" \n" + json.dumps(VALUES, indent=2) + "\n ", size) == VALUES
+
+@pytest.mark.parametrize("size", range(1, 24))
+def test_ndjson_split_at_every_chunk_boundary(size):
+    text = "\n".join(json.dumps(value) for value in VALUES) + "\n"
+    assert chunked(text, size) == VALUES
+
+@pytest.mark.parametrize("text,expected", [
+    ("3.25e10", [3.25e10]),
+    ("123456 7", [123456, 7]),
+    ("[-1.5e-3,42]", [-1.5e-3, 42]),
+    ("[1000000]", [1000000]),
+])
+def test_numbers_cut_mid_way(text, expected):
+    for size in range(1, len(text) + 1):
+        assert chunked(text, size) == expected, size
+
+@pytest.mark.parametrize("text", ["[1, 2] 3", "[1, 2]]", "[1, 2] [3]", '[{"a": 1}]x'])
+def test_trailing_data_after_array_is_rejected(text):
+    for size in (1, 3, 1 << 20):
+        with pytest.raises(ValueError, match="Trailing data"):
+            chunked(text, size)
+
+def test_whitespace_after_array_is_allowed():
+    assert chunked("[1, 2]  \n\t\n", 2) == [1, 2]
+
+@pytest.mark.parametrize("text", ["[1,,2]", "[,]", "[,1]", "[1 2]", "[1,]", "[1, ]", '[{"a": 1} {"b": 2}]'])
+def test_bad_array_separators_are_rejected(text):
+    for size in (1, 3, 1 << 20):
+        with pytest.raises(ValueError, match="Malformed JSON"):
+            chunked(text, size)
+
+@pytest.mark.parametrize("size", (1, 3, 1 << 20))
+def test_empty_array_and_spaced_commas(size):
+    assert chunked("[ ]", size) == []
+    assert chunked("[ 1 ,\n 2 ]", size) == [1, 2]
+
+@pytest.mark.parametrize("text", ["[1, 2", '[{"a": 1}', '{"a": '])
+def test_truncated_input_is_rejected(text):
+    with pytest.raises(ValueError):
+        chunked(text, 2)
+
+def test_sample_events_match_json_load():
+    with open(SAMPLE_EVENTS, encoding='utf-8') as f:
+        expected = json.load(f)
+    events = [event for batch in read_events(SAMPLE_EVENTS, batch_size=7, flat=False, chunk_size=64)
+              for event in batch]
+    assert events == expected
+
+def test_peak_memory_without_resource_module(monkeypatch):
+    real_import = builtins.__import__
+
+    def no_resource(name, *args, **kwargs):
+        if name == 'resource':
+            raise ImportError(name)
+        return real_import(name, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, '__import__', no_resource)
+    assert json_stream.peak_rss_mb() is None
+    assert json_stream.peak_memory() == 'n/a'
@@ -0,0 +1,59 @@
+import re
+
+import pytest
+
+from sql_cache import MemoryCache, ValidationCache
+from test_sql_lexer import exercise_sql
+from validate_sql import SQLValidator
+
+DIALECTS = ("snowflake", "bigquery", "redshift")
+
+# Dotted names, whose rules depend on token adjacency
+DOTTED_SQL = [
+    "SELECT a FROM proj.ds.tbl",
+    "SELECT o.id FROM my-project.sales.orders AS o JOIN db.sch.t ON o.id = t.id",
+]
+
+def variants(sql):
+    """Edits that change whitespace, comments or token adjacency but not token values"""
+    return [
+        sql,
+        "\n\n" + sql.replace("\n", "\n\n"),
+        re.sub(r"\s+", " ", sql),
+        re.sub(r"\s*\.\s*", " . ", sql),
+        re.sub(r"\s*,\s*", ",", sql),
+        sql.replace(" ", " /* note */ "),
+        sql,
+    ]
+
+@pytest.fixture(params=["memory", "sqlite"])
+def cache(request, tmp_path):
+    if request.param == "memory":
+        yield MemoryCache()
+    else:
+        cache = ValidationCache(tmp_path / "cache.sqlite3")
+        yield cache
+        cache.close()
+
+@pytest.mark.parametrize("dialect", DIALECTS)
+def test_cached_results_match_uncached(dialect, cache):
+    cached = SQLValidator(dialect=dialect, cache=cache)
+    uncached = SQLValidator(dialect=dialect)
+    for sql in [param.values[0] for param in exercise_sql()] + DOTTED_SQL:
+        for text in variants(sql):
+            assert cached.validate_detailed(text) == uncached.validate_detailed(text), text
+    assert cache.hits > 0
+
+def test_token_adjacency_is_part_of_the_key():
+    cached = SQLValidator(dialect="bigquery", cache=MemoryCache())
+    assert cached.validate_detailed("SELECT a FROM proj.ds.tbl") == []
+    findings = cached.validate_detailed("SELECT a FROM proj . ds . tbl")
+    assert [f.rule for f in findings] == ["bigquery-table-reference"]
+
+def test_cache_persists_between_runs(tmp_path):
+    sql = "SELECT a FROM proj . ds . tbl;\nSELECT b FROM proj.ds.tbl"
+    expected = SQLValidator(dialect="bigquery").validate_detailed(sql)
+    for _ in range(2):
+        with ValidationCache(tmp_path / "cache.sqlite3") as cache:
+            assert SQLValidator(dialect="bigquery", cache=cache).validate_detailed(sql) == expected
+    assert cache.hits == 1
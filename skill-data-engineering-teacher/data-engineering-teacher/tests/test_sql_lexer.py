@@ -0,0 +1,62 @@
+import re
+from pathlib import Path
+
+import pytest
+
+from generate_exercise import EXERCISES
+from sql_lexer import tokenize
+
+REFERENCES_DIR = Path(__file__).resolve().parent.parent / "references"
+SQL_BLOCK = re.compile(r"```sql\n(.*?)```", re.DOTALL)
+
+def exercise_sql():
+    """Every exercise solution plus the SQL examples in the references"""
+    cases = []
+    for topic, levels in EXERCISES.items():
+        for level, exercises in levels.items():
+            for number, exercise in enumerate(exercises, 1):
+                cases.append(pytest.param(exercise['solution'], id=f"{topic}-{level}-{number}"))
+    for path in sorted(REFERENCES_DIR.glob("*.md")):
+        for number, block in enumerate(SQL_BLOCK.findall(path.read_text(encoding='utf-8')), 1):
+            cases.append(pytest.param(block, id=f"{path.stem}-{number}"))
+    return cases
+
+EDGE_CASES = [
+    "SELECT 'it''s', \"a\"\"b\", `t` FROM x -- trailing",
+    "SELECT $$body; with ; semicolons$$, $tag$x$tag$ /* c\n */ FROM t",
+    "SELECT 1.5e-3, .5, :name, @var, $1, a::int, j->>'k' FROM t",
+    "SELECT 'unterminated",
+    "SELECT /* unterminated\ncomment",
+]
+
+@pytest.mark.parametrize("sql", exercise_sql() + EDGE_CASES)
+def test_tokens_round_trip_to_source(sql):
+    tokens = list(tokenize(sql, keep_comments=True))
+    assert tokens
+
+    pos = 0
+    rebuilt = []
+    for token in tokens:
+        gap = sql[pos:token.start]
+        assert gap.strip() == '', f"non-whitespace skipped before {token}"
+        assert sql[token.start:token.start + len(token.value)] == token.value
+
+        line = sql.count('\n', 0, token.start) + 1
+        col = token.start - (sql.rfind('\n', 0, token.start) + 1) + 1
+        assert (token.line, token.col) == (line, col)
+
+        rebuilt.append(gap + token.value)
+        pos = token.start + len(token.value)
+
+    assert sql[pos:].strip() == ''
+    assert ''.join(rebuilt) + sql[pos:] == sql
+
+@pytest.mark.parametrize("sql", exercise_sql())
+def test_exercise_sql_has_no_error_tokens(sql):
+    assert [t for t in tokenize(sql) if t.type == 'error'] == []
+
+def test_resume_matches_full_scan():
+    sql = EXERCISES['dimensional-modeling']['beginner'][0]['solution']
+    tokens = list(tokenize(sql))
+    middle = tokens[len(tokens) // 2]
+    assert list(tokenize(sql, start=middle.start)) == tokens[len(tokens) // 2:]
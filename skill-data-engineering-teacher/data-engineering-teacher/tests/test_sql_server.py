@@ -0,0 +1,103 @@
+import io
+import json
+import random
+
+import pytest
+
+from sql_server import INTERNAL_ERROR, INVALID_PARAMS, ValidationServer, apply_changes
+from sql_tree import Group, parse, reparse
+from test_sql_lexer import exercise_sql
+
+def shape(nodes):
+    """Comparable form of a statement's tree"""
+    return [('group', node.open, node.close, shape(node.children)) if isinstance(node, Group) else node
+            for node in nodes]
+
+def script_shape(script):
+    return [(s.index, s.tokens, s.words, s.ops, s.paren_errors, shape(s.children))
+            for s in script.statements]
+
+def random_edit(rng, text):
+    """Insert, delete or replace a short span, favouring characters that change structure"""
+    start = rng.randrange(len(text) + 1)
+    end = min(len(text), start + rng.choice([0, 0, 1, 3, 10]))
+    insert = ''.join(rng.choice([';', '(', ')', "'", '"', '-', '*', '/', ' ', '\n', 'x', '1', '$'])
+                     for _ in range(rng.choice([0, 1, 2, 4])))
+    return text[:start] + insert + text[end:], start
+
+@pytest.mark.parametrize("sql", [p.values[0] for p in exercise_sql()][:20])
+def test_reparse_matches_full_parse(sql):
+    rng = random.Random(sql)
+    text = ';\n'.join([sql] * 3)
+    script = parse(text)
+    for _ in range(50):
+        text, edit_start = random_edit(rng, text)
+        script = reparse(script, text, edit_start)
+        assert script_shape(script) == script_shape(parse(text))
+
+def request(server, method, params, request_id=1):
+    return server.handle(json.dumps({'jsonrpc': '2.0', 'id': request_id, 'method': method, 'params': params}))
+
+@pytest.mark.parametrize("method,params", [
+    ('validate', {'text': 5}),
+    ('validate', {'text': 'SELECT 1', 'dialect': 7}),
+    ('open', {'uri': 'a.sql', 'text': ['SELECT 1']}),
+    ('open', {'uri': 3, 'text': 'SELECT 1'}),
+    ('change', {'uri': 'doc.sql', 'changes': 'SELECT 2'}),
+    ('change', {'uri': 'doc.sql', 'changes': [{'text': 5}]}),
+    ('change', {'uri': 'doc.sql', 'changes': [{'text': 'x', 'range': {'start': {'line': 0}}}]}),
+    ('change', {'uri': 'doc.sql', 'changes': [
+        {'text': 'x', 'range': {'start': {'line': 0, 'character': '1'}, 'end': {'line': 0, 'character': 1}}}]}),
+    ('close', {'uri': ['doc.sql']}),
+    ('initialize', {'dialect': 5}),
+    ('initialize', {'dialect': 'oracle'}),
+])
+def test_bad_params_return_invalid_params(method, params):
+    server = ValidationServer()
+    request(server, 'open', {'uri': 'doc.sql', 'text': 'SELECT a FROM t'})
+
+    response = request(server, method, params, request_id=2)
+    assert response['error']['code'] == INVALID_PARAMS
+
+    # The server and the open document are unaffected
+    assert server.running and server.default_dialect == 'snowflake'
+    assert server.documents['doc.sql'].text == 'SELECT a FROM t'
+    assert 'result' in request(server, 'validate', {'text': 'SELECT a FROM t'}, request_id=3)
+
+def test_server_keeps_running_after_errors():
+    lines = [
+        json.dumps({'jsonrpc': '2.0', 'id': 1, 'method': 'validate', 'params': {'text': 5}}),
+        'not json',
+        json.dumps({'jsonrpc': '2.0', 'id': 2, 'method': 'validate', 'params': {'text': 'SELECT * FROM t'}}),
+        json.dumps({'jsonrpc': '2.0', 'id': 3, 'method': 'shutdown'}),
+    ]
+    out = io.StringIO()
+    ValidationServer().serve(iter(line + '\n' for line in lines), out)
+    responses = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [r.get('id') for r in responses] == [1, None, 2, 3]
+    assert responses[0]['error']['code'] == INVALID_PARAMS
+    assert [d['rule'] for d in responses[2]['result']['diagnostics']] == ['select-star']
+
+def test_unexpected_exception_returns_internal_error(monkeypatch):
+    server = ValidationServer()
+
+    def broken(params):
+        raise ValueError("boom")
+
+    monkeypatch.setattr(server, 'stats', broken)
+    response = request(server, 'stats', {})
+    assert response['error']['code'] == INTERNAL_ERROR
+    assert 'boom' in response['error']['message']
+    assert 'result' in request(server, 'validate', {'text': 'SELECT 1'})
+
+def test_edited_document_matches_fresh_validation():
+    server = ValidationServer()
+    text = "SELECT a FROM t;\nSELECT * FROM u WHERE b = NULL;\nSELECT c FROM v"
+    request(server, 'open', {'uri': 'doc.sql', 'text': text})
+    changes = [
+        {'range': {'start': {'line': 1, 'character': 7}, 'end': {'line': 1, 'character': 8}}, 'text': 'b'},
+        {'range': {'start': {'line': 0, 'character': 15}, 'end': {'line': 0, 'character': 16}}, 'text': ''},
+    ]
+    result = request(server, 'change', {'uri': 'doc.sql', 'changes': changes})['result']
+    text, _ = apply_changes(text, changes)
+    assert result['diagnostics'] == request(server, 'validate', {'text': text})['result']['diagnostics']